@@ -1,20 +1,38 @@
 from __future__ import annotations
+import hashlib, inspect
 from typing import Dict, Callable, Optional, List
 from bs4 import BeautifulSoup
 import pandas as pd
 
 ParserFn = Callable[[BeautifulSoup], pd.DataFrame]
 REGISTRY: Dict[str, ParserFn] = {}
+VERSIONS: Dict[str, int] = {}
 
-def register(name: str):
+def register(name: str, version: int = 1):
+    """Bump `version` when a parser's output changes for reasons its own
+    source does not show (e.g. a helper it calls)."""
     def deco(fn: ParserFn):
         REGISTRY[name] = fn
+        VERSIONS[name] = version
         return fn
     return deco
 
 def available_parsers() -> List[str]:
     return sorted(REGISTRY.keys())
 
+def parser_version(key: str) -> str:
+    """Cache tag of parser `key` ("auto": of the detection and every parser):
+    registered version + hash of the source, so editing a parser invalidates
+    its cached results without a bump."""
+    keys = available_parsers() if key == "auto" else [key]
+    h = hashlib.sha1()
+    if key == "auto":
+        h.update(inspect.getsource(auto_detect_parser).encode("utf-8"))
+    for k in keys:
+        h.update(f"{k}:{VERSIONS[k]}:".encode("utf-8"))
+        h.update(inspect.getsource(REGISTRY[k]).encode("utf-8"))
+    return h.hexdigest()[:16]
+
 def auto_detect_parser(soup: BeautifulSoup) -> Optional[str]: #need to modify
     # Equipment-style indicators
     if soup.select_one("span.uniqueName, span.uniqueTypeLine, a.whiteitem"):
@@ -1,7 +1,6 @@
-import argparse, csv
+import argparse, csv, time
 from pathlib import Path
-import pandas as pd
-from scraper import process_one, OUT_DIR
+from scraper import process_many, fetch_all, OUT_DIR, FETCH_JOBS, HOST_INTERVAL_S
 
 def read_inputs_csv(path: str):
     items = []
@@ -18,26 +17,44 @@ def main():
     ap.add_argument("--config", default="config/input.csv", help="CSV with columns: type,source")
     ap.add_argument("--fetch", action="store_true", help="Allow fetching URLs (otherwise use cache/local only)")
     ap.add_argument("--overwrite", action="store_true", help="Force re-fetch URLs to cache")
+    ap.add_argument("--max-age", type=float, default=None, metavar="DAYS",
+                    help="Re-fetch cached pages older than this (default: cached pages never expire)")
+    ap.add_argument("--jobs", type=int, default=FETCH_JOBS, help=f"Pages fetched at once (default: {FETCH_JOBS})")
+    ap.add_argument("--host-interval", type=float, default=HOST_INTERVAL_S, metavar="SECONDS",
+                    help=f"Min. delay between two requests to the same host (default: {HOST_INTERVAL_S})")
+    ap.add_argument("--no-browser", action="store_true", help="Plain HTTP GET instead of headless Chromium (no JavaScript)")
+    ap.add_argument("--parse-jobs", type=int, default=None, help="Parser processes (default: one per CPU)")
     ap.add_argument("--out", default=str(OUT_DIR / "items.csv"))
     args = ap.parse_args()
 
     inputs = read_inputs_csv(args.config)
-    frames = []
-    for typ, src in inputs:
+    if args.fetch:
+        # fetch every URL up front (one browser, --jobs pages at a time), then parse from the cache
+        urls = [src for _, src in inputs if src.lower().startswith(("http://", "https://"))]
+        t0 = time.perf_counter()
         try:
-            if args.fetch and args.overwrite and src.lower().startswith(("http://","https://")):
-                # optional eager refresh — reuses process_one which will fetch if needed anyway
-                pass
-            df = process_one(src, parser_key=typ, allow_fetch=args.fetch)
-            frames.append(df)
-            print(f"OK: {typ:10s}  {src}  -> {len(df)} rows")
-        except Exception as e:
-            print(f"FAIL: {typ:10s}  {src}  -> {e}")
+            fetched = fetch_all(urls, jobs=args.jobs, host_interval_s=args.host_interval,
+                                max_age_s=args.max_age * 86400 if args.max_age is not None else None,
+                                overwrite=args.overwrite, browser=not args.no_browser)
+        except Exception as e:  # no browser: parse whatever is cached
+            fetched = {u: e for u in urls}
+        failed = {u: r for u, r in fetched.items() if isinstance(r, Exception)}
+        for url, e in failed.items():
+            print(f"FETCH FAIL: {url}  -> {e}")
+        print(f"Fetched/cached {len(fetched) - len(failed)} of {len(fetched)} URLs in {time.perf_counter() - t0:.1f}s")
 
-    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
-    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(args.out, index=False, encoding="utf-8")
-    print(f"✅ Wrote {len(out)} rows to {args.out}")
+    # parse results are cached per (HTML, parser, parser version): unchanged pages are not re-parsed
+    def report(typ, src, rows, cached):
+        if isinstance(rows, Exception):
+            print(f"FAIL: {typ:10s}  {src}  -> {rows}")
+        else:
+            print(f"OK: {typ:10s}  {src}  -> {rows} rows" + ("  (cached)" if cached else ""))
+
+    t0 = time.perf_counter()
+    results = process_many(inputs, Path(args.out), jobs=args.parse_jobs, on_result=report)
+    ok = [r for r in results if not isinstance(r[2], Exception)]
+    print(f"✅ Wrote {sum(r[2] for r in ok)} rows to {args.out} "
+          f"({len(ok)} pages, {sum(not r[3] for r in ok)} parsed, {time.perf_counter() - t0:.1f}s)")
 
 if __name__ == "__main__":
     main()
@@ -1,24 +1,35 @@
 from __future__ import annotations
 from pathlib import Path
-import re, time
+import asyncio, hashlib, inspect, json, os, re, time, urllib.request
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, Iterable, List
+from urllib.parse import urlsplit
 from bs4 import BeautifulSoup
 import pandas as pd
 
-from parsers import REGISTRY, available_parsers, auto_detect_parser
+import helpers_item_class
+from parsers import REGISTRY, available_parsers, auto_detect_parser, parser_version
 from helpers_item_class import infer_item_class_from_source, infer_item_class_from_html
 
 try:
-    from playwright.sync_api import sync_playwright
+    from playwright.async_api import async_playwright
     HAS_PW = True
 except Exception:
     HAS_PW = False
 
 CACHE_DIR = Path("cache")
+PARSE_CACHE_DIR = CACHE_DIR / "parsed"   # one pickled DataFrame per (page, parser) result
 OUT_DIR = Path("out")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+USER_AGENT = "PoEFilterProject/1.0 (+cache)"
+FETCH_JOBS = 4            # pages fetched at once
+HOST_INTERVAL_S = 1.0     # min. seconds between two requests to the same host
+FETCH_RETRIES = 2
+RETRY_BACKOFF_S = 2.0     # pause before the first retry of a page, doubled for each further one
+PAGE_TIMEOUT_S = 60
+
 def _slugify(s: str) -> str:
     s = s.strip().lower()
     s = re.sub(r"^https?://", "", s)
@@ -26,30 +37,163 @@ def _slugify(s: str) -> str:
     s = s.strip("_")
     return s or "page"
 
+def cache_path(url: str) -> Path:
+    return CACHE_DIR / (_slugify(url).replace("/", "_") + ".html")
+
+def is_fresh(path: Path, max_age_s: Optional[float]) -> bool:
+    """Cached and, with a max age, fetched less than max_age_s seconds ago."""
+    try:
+        age = time.time() - path.stat().st_mtime
+    except OSError:
+        return False
+    return max_age_s is None or age < max_age_s
+
+def _write_cache(path: Path, html: str):
+    # atomic: an interrupted run never leaves a truncated page in the cache
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(html, encoding="utf-8")
+    os.replace(tmp, path)
+
+class BrowserPages:
+    """One headless Chromium with `size` reusable pages (async context manager)."""
+    def __init__(self, size: int, user_agent: str = USER_AGENT, timeout_s: float = PAGE_TIMEOUT_S):
+        self.size, self.user_agent, self.timeout_s = size, user_agent, timeout_s
+
+    async def __aenter__(self):
+        if not HAS_PW:
+            raise RuntimeError("Playwright not installed. `pip install playwright && playwright install`")
+        self._pw = await async_playwright().start()
+        try:
+            self._browser = await self._pw.chromium.launch(headless=True)
+            ctx = await self._browser.new_context(user_agent=self.user_agent)
+            self._pages = asyncio.Queue()
+            for _ in range(self.size):
+                self._pages.put_nowait(await ctx.new_page())
+        except BaseException:
+            await self._pw.stop()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        try:
+            await self._browser.close()
+        finally:
+            await self._pw.stop()
+
+    async def get(self, url: str) -> str:
+        page = await self._pages.get()
+        try:
+            await page.goto(url, wait_until="networkidle", timeout=self.timeout_s * 1000)
+            return await page.content()
+        finally:
+            self._pages.put_nowait(page)
+
+class HttpPages:
+    """Plain GET, no JavaScript: for pages that render server-side and for
+    trying the fetcher against a local HTTP server without a browser."""
+    def __init__(self, size: int, user_agent: str = USER_AGENT, timeout_s: float = PAGE_TIMEOUT_S):
+        self.user_agent, self.timeout_s = user_agent, timeout_s
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    def _get(self, url: str) -> str:
+        req = urllib.request.Request(url, headers={"User-Agent": self.user_agent})
+        with urllib.request.urlopen(req, timeout=self.timeout_s) as resp:
+            return resp.read().decode(resp.headers.get_content_charset() or "utf-8", errors="replace")
+
+    async def get(self, url: str) -> str:
+        return await asyncio.to_thread(self._get, url)
+
+class HostRateLimiter:
+    """Spaces the requests to each host at least `interval_s` apart."""
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self._next = {}  # host -> earliest start of its next request (loop time)
+
+    async def ready(self, url: str):
+        """Sleep until the host may be requested again (reserves nothing)."""
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(max(0.0, self._next.get(urlsplit(url).netloc, 0.0) - loop.time()))
+
+    def take(self, url: str) -> bool:
+        """Claim the host's turn now, if it is due; single event loop, no lock needed."""
+        now = asyncio.get_running_loop().time()
+        host = urlsplit(url).netloc
+        if now < self._next.get(host, 0.0):
+            return False
+        self._next[host] = now + self.interval_s
+        return True
+
+async def fetch_many(urls: Iterable[str], jobs: int = FETCH_JOBS, host_interval_s: float = HOST_INTERVAL_S,
+                     max_age_s: Optional[float] = None, overwrite: bool = False, browser: bool = True,
+                     retries: int = FETCH_RETRIES, retry_backoff_s: float = RETRY_BACKOFF_S) -> dict:
+    """Cache every URL (see cache_path), `jobs` at a time, through one
+    browser. Pages cached less than max_age_s ago (any age without it) are
+    not fetched unless overwrite. A URL waits for its host's turn before it
+    takes one of the `jobs` slots, so a run of pages from one host does not
+    idle the others; failed attempts are retried after an exponential
+    backoff. Returns url -> cache Path, or the Exception of its last attempt."""
+    urls = list(dict.fromkeys(urls))
+    results = {u: cache_path(u) for u in urls if not overwrite and is_fresh(cache_path(u), max_age_s)}
+    todo = [u for u in urls if u not in results]
+    if not todo:
+        return results
+
+    limiter = HostRateLimiter(host_interval_s)
+    slots = asyncio.Semaphore(jobs)
+    pages_cls = BrowserPages if browser else HttpPages
+
+    async def turn(url: str):
+        # returns holding a slot and the host's turn
+        while True:
+            await limiter.ready(url)
+            await slots.acquire()
+            if limiter.take(url):
+                return
+            slots.release()   # another page of the host went first: wait for the next turn
+
+    async with pages_cls(min(jobs, len(todo))) as pages:
+        async def one(url: str):
+            for attempt in range(retries + 1):
+                if attempt:
+                    await asyncio.sleep(retry_backoff_s * 2 ** (attempt - 1))
+                await turn(url)
+                try:
+                    html = await pages.get(url)
+                except Exception as e:
+                    results[url] = e
+                    continue
+                finally:
+                    slots.release()
+                path = cache_path(url)
+                _write_cache(path, html)
+                results[url] = path
+                return
+        await asyncio.gather(*(one(u) for u in todo))
+    return results
+
+def fetch_all(urls: Iterable[str], **kwargs) -> dict:
+    """Synchronous fetch_many()."""
+    return asyncio.run(fetch_many(urls, **kwargs))
+
 def fetch_and_cache(url: str, overwrite: bool=False, wait_s: float=0.0) -> Path:
-    if not HAS_PW:
-        raise RuntimeError("Playwright not installed. `pip install playwright && playwright install`")
-    path = CACHE_DIR / (_slugify(url).replace("/", "_") + ".html")
-    if path.exists() and not overwrite:
-        return path
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        ctx = browser.new_context(user_agent="PoEFilterProject/1.0 (+cache)")
-        page = ctx.new_page()
-        page.goto(url, wait_until="networkidle")
-        html = page.content()
-        path.write_text(html, encoding="utf-8")
-        browser.close()
+    result = fetch_all([url], jobs=1, overwrite=overwrite)[url]
+    if isinstance(result, Exception):
+        raise result
     if wait_s:
         time.sleep(wait_s)
-    return path
+    return result
 
 def load_html(source: str, allow_fetch: bool) -> str:
     if re.match(r"^https?://", source, re.I):
-        cache_path = fetch_and_cache(source) if allow_fetch else CACHE_DIR / (_slugify(source).replace("/", "_") + ".html")
-        if not cache_path.exists():
+        path = fetch_and_cache(source) if allow_fetch else cache_path(source)
+        if not path.exists():
             raise FileNotFoundError(f"No cached file for URL: {source}")
-        return cache_path.read_text(encoding="utf-8", errors="ignore")
+        return path.read_text(encoding="utf-8", errors="ignore")
     return Path(source).read_text(encoding="utf-8", errors="ignore")
 
 def parse_dispatch(html: str, source: str, parser_key: Optional[str]) -> pd.DataFrame:
@@ -74,3 +218,118 @@ def parse_dispatch(html: str, source: str, parser_key: Optional[str]) -> pd.Data
 def process_one(source: str, parser_key: Optional[str], allow_fetch: bool) -> pd.DataFrame:
     html = load_html(source, allow_fetch=allow_fetch)
     return parse_dispatch(html, source, parser_key)
+
+# --- Cached, parallel parsing ---
+
+# parse_dispatch picks the parser and fills the `class` column, with the item_class helpers
+_DISPATCH_HASH = hashlib.sha1(inspect.getsource(parse_dispatch).encode("utf-8")
+                              + Path(helpers_item_class.__file__).read_bytes()).hexdigest()[:16]
+
+def parse_cache_path(html: str, source: str, parser_key: Optional[str]) -> Path:
+    """Cache file of parse_dispatch(html, source, parser_key): keyed by the
+    HTML content hash, the parser key and its version (parsers.parser_version),
+    the source (item_class is inferred from it), and the source of
+    parse_dispatch and of the item_class helpers."""
+    key = parser_key or "auto"
+    h = hashlib.sha1()
+    for part in (hashlib.sha1(html.encode("utf-8")).hexdigest(), key, parser_version(key),
+                 source, _DISPATCH_HASH):
+        h.update(part.encode("utf-8") + b"\0")
+    return PARSE_CACHE_DIR / f"{h.hexdigest()}.pkl"
+
+def _meta_path(path: Path) -> Path:
+    return path.with_suffix(".json")
+
+def _read_meta(path: Path) -> Optional[dict]:
+    """{"rows", "columns"} of the cached frame at `path`, or None when it is
+    not (completely) cached."""
+    try:
+        meta = json.loads(_meta_path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return meta if path.exists() else None
+
+def _parse_to_cache(html: str, source: str, parser_key: Optional[str], path: Path) -> dict:
+    """Worker: parse one page and store the frame at `path` plus its row count
+    and columns in a sidecar, written last (both atomically)."""
+    df = parse_dispatch(html, source, parser_key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_pickle(tmp)
+    os.replace(tmp, path)
+    meta = {"rows": len(df), "columns": [str(c) for c in df.columns]}
+    tmp = path.with_name(path.name + ".json.tmp")
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, _meta_path(path))
+    return meta
+
+def process_many(inputs: List[tuple[str, str]], out_path: Path, jobs: Optional[int] = None,
+                 on_result=None) -> List[tuple]:
+    """Parse every (parser_key, source) of `inputs` (URLs from the cache
+    only) and write all rows, in input order, as one CSV at out_path.
+
+    Pages whose HTML, parser and parser version match a cached result are
+    not parsed again; the others are parsed in a process pool of `jobs`
+    workers. The CSV is streamed from the cached frames one page at a time.
+    Returns (parser_key, source, rows or the Exception, cached) per input,
+    also passed to on_result() as each one is ready, in input order."""
+    plan, todo, metas = [], {}, {}
+    for typ, src in inputs:
+        try:
+            html = load_html(src, allow_fetch=False)
+            path = parse_cache_path(html, src, typ)
+        except Exception as e:
+            plan.append((typ, src, e))
+            continue
+        plan.append((typ, src, path))
+        if path in metas or path in todo:
+            continue
+        meta = _read_meta(path)
+        if meta is None:
+            todo[path] = (html, src, typ)
+        else:
+            metas[path] = meta
+
+    results, frames = [], []
+    pool = ProcessPoolExecutor(jobs) if len(todo) > 1 and jobs != 1 else None
+    try:
+        if pool:
+            futures = {path: pool.submit(_parse_to_cache, html, src, typ, path)
+                       for path, (html, src, typ) in todo.items()}
+        for typ, src, path in plan:
+            cached = isinstance(path, Path) and path not in todo
+            try:
+                if isinstance(path, Exception):
+                    raise path
+                if path not in metas:
+                    metas[path] = futures[path].result() if pool else _parse_to_cache(*todo[path], path)
+                rows = metas[path]["rows"]
+                frames.append((path, metas[path]["columns"]))
+            except Exception as e:
+                rows = e
+            results.append((typ, src, rows, cached))
+            if on_result:
+                on_result(*results[-1])
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    _write_csv(frames, Path(out_path))
+    return results
+
+def _write_csv(frames: List[tuple[Path, List[str]]], out_path: Path):
+    """Concatenate the cached frames of `frames` ((path, columns) each) into
+    one CSV (columns: union in first-seen order, as pd.concat), reading each
+    frame once and holding one at a time."""
+    columns = []
+    for _, cols in frames:
+        for c in cols:
+            if c not in columns:
+                columns.append(c)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        f.write(pd.DataFrame(columns=columns).to_csv(index=False))
+        for path, _ in frames:
+            pd.read_pickle(path).reindex(columns=columns).to_csv(f, header=False, index=False)
+    os.replace(tmp, out_path)
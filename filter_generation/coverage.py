@@ -0,0 +1,214 @@
+"""Whole-catalog coverage and shadowing report for generated filters.
+
+Every base of the item catalog (BaseTypes.csv plus the bases only known to
+data/items_db.json) is dropped under a grid of rarity x item level x sockets
+and pushed through each strictness variant of the generated filter with the
+drop simulator (simulate.py FilterSimulator). Per variant it reports:
+
+  * unmatched bases — grid drops that reach no block, or only the
+    footer.filter catch-all (the "unknown items" net);
+  * dead blocks — blocks no drop reaches first. A dead block that would match
+    some drops on its own is *shadowed*, and the blocks that took those drops
+    are listed; one no catalog drop matches at all is *unreachable* (a base
+    missing from the catalog, or conditions the grid does not vary);
+  * drops won per category (generate.py's per-file banners), shown / hidden.
+
+Each item level of the grid is simulated in a zone of that area level. Item
+levels below a base's drop level are clamped up to it, sockets are only given
+to bases that can have them (capped by width x height).
+
+Usage:
+  python coverage.py                                   # all 7 strictness levels
+  python coverage.py --strictness soft strict --mode ruthless
+  python coverage.py --filter ../data/from_filter_blade/3.28/FilterBlade_0_Soft.filter
+  python coverage.py --rarity Normal Rare --item-level 1 68 86 --sockets 0 6 --json report.json
+"""
+import argparse
+import csv
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation.filter_parser import generated_labels, parse_file  # noqa: E402
+from filter_generation.simulate import BASE_TYPES_CSV, FilterSimulator, ItemBatch  # noqa: E402
+from filter_generation.variants import STRICTNESS_LEVELS, render_variants  # noqa: E402
+
+ITEMS_DB = PROJECT_ROOT / "data" / "items_db.json"
+FOOTER_FILE = SCRIPT_DIR / "data" / "footer.filter"
+
+
+def load_catalog() -> list[dict]:
+    """name, class, dropLevel, width, height, socketable — CSV first, then items_db extras."""
+    bases = {}
+    with open(BASE_TYPES_CSV, "r", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            name, cls = (row.get("BaseType") or "").strip(), (row.get("Class") or "").strip()
+            if not name or not cls or name in bases:
+                continue
+            bases[name] = {"name": name, "class": cls, "dropLevel": int(row["DropLevel"] or 1),
+                           "width": int(row["Width"] or 1), "height": int(row["Height"] or 1),
+                           "socketable": bool(row.get("Sockets"))}
+    if ITEMS_DB.exists():
+        for it in json.loads(ITEMS_DB.read_text(encoding="utf-8")).get("items", []):
+            name, cls = it.get("name"), it.get("item_class")
+            if not name or not cls or name in bases:
+                continue
+            bases[name] = {"name": name, "class": cls, "dropLevel": it.get("drop_level") or 1,
+                           "width": it.get("width") or 1, "height": it.get("height") or 1,
+                           "socketable": False}
+    return list(bases.values())
+
+
+def grid_items(catalog: list[dict], rarities: list[str], item_level: int, sockets: list[int]) -> list[dict]:
+    """One drop per (base, rarity, socket count) at this item level; duplicates collapse."""
+    items = []
+    for base in catalog:
+        ilvl = max(item_level, base["dropLevel"])
+        counts = sorted({min(n, 6, base["width"] * base["height"]) if base["socketable"] else 0 for n in sockets})
+        for rarity in rarities:
+            for n in counts:
+                item = {"name": base["name"], "class": base["class"], "itemLevel": ilvl,
+                        "dropLevel": base["dropLevel"], "rarity": rarity,
+                        "width": base["width"], "height": base["height"]}
+                if n:
+                    item["sockets"] = "RGB" * (n // 3) + "RGB"[:n % 3]
+                    item["linkedSockets"] = n
+                items.append(item)
+    return items
+
+
+def analyze(path: Path, catalog: list[dict], rarities: list[str], item_levels: list[int],
+            sockets: list[int], footer_blocks: int) -> dict:
+    sim = FilterSimulator.from_file(path)
+    n_blocks = len(sim.blocks)
+    footer = set(range(n_blocks - footer_blocks, n_blocks))
+    labels = [label[0] if label else "" for label in generated_labels(parse_file(path))]
+    for b in footer:
+        labels[b] = "(footer)"
+
+    hits = [0] * n_blocks
+    unmatched = Counter()
+    no_block = 0
+    runs = []  # (batch, area_level, groups, results) kept for the shadowing pass
+    total = 0
+    for ilvl in item_levels:
+        items = grid_items(catalog, rarities, ilvl, sockets)
+        batch = ItemBatch(items)
+        groups = sim.group_rows(batch)
+        results = sim.run(batch, ilvl)
+        runs.append((batch, ilvl, groups, results))
+        total += len(items)
+        for item, res in zip(items, results):
+            b = res.get("matchedBlock")
+            if b is None or b in footer:
+                unmatched[(item["class"], item["name"])] += 1
+            if b is None:
+                no_block += 1
+            else:
+                hits[b] += 1
+
+    categories = {}
+    for b, block in enumerate(sim.blocks):
+        counts = categories.setdefault(labels[b] or "(no category)", {"shown": 0, "hidden": 0})
+        counts["shown" if block["command"] == "Show" else "hidden"] += hits[b]
+    if no_block:
+        categories["(no block)"] = {"shown": no_block, "hidden": 0}
+
+    dead, unreachable = [], []
+    for b, block in enumerate(sim.blocks):
+        if hits[b] or b in footer or block["continue"]:
+            continue
+        shadowed_by = Counter()
+        for batch, ilvl, groups, results in runs:
+            for i in sim.matching_rows(batch, b, ilvl, groups):
+                shadowed_by[results[i].get("matchedBlock")] += 1
+        entry = {"block": b, "line": block["line"], "command": block["command"],
+                 "header": _header_text(block)}
+        if shadowed_by:
+            entry["shadowedBy"] = [{"block": w, "line": sim.blocks[w]["line"],
+                                    "header": _header_text(sim.blocks[w]), "drops": c}
+                                   for w, c in shadowed_by.most_common()]
+            dead.append(entry)
+        else:
+            unreachable.append(entry)
+
+    return {
+        "filter": str(path),
+        "blocks": n_blocks,
+        "drops": total,
+        "unmatched": [{"class": cls, "name": name, "drops": c} for (cls, name), c in sorted(unmatched.items())],
+        "shadowed": dead,
+        "unreachable": unreachable,
+        "categories": categories,
+    }
+
+
+def _header_text(block: dict) -> str:
+    header = block["header"]
+    return f"[{header[0]:05d}] {header[1]}" if header else ""
+
+
+def print_report(name: str, report: dict, limit: int):
+    unmatched = report["unmatched"]
+    print(f"== {name}: {report['blocks']} blocks, {report['drops']} drops, "
+          f"{len(unmatched)} unmatched bases, {len(report['shadowed'])} shadowed + "
+          f"{len(report['unreachable'])} unreachable blocks")
+    for entry in unmatched[:limit]:
+        print(f"  unmatched  {entry['class']} / {entry['name']} ({entry['drops']} drops)")
+    if len(unmatched) > limit:
+        print(f"  ... {len(unmatched) - limit} more unmatched")
+    for entry in report["shadowed"][:limit]:
+        top = entry["shadowedBy"][0]
+        print(f"  shadowed   line {entry['line']} {entry['header']} <- line {top['line']} {top['header']} "
+              f"({sum(s['drops'] for s in entry['shadowedBy'])} drops)")
+    if len(report["shadowed"]) > limit:
+        print(f"  ... {len(report['shadowed']) - limit} more shadowed")
+    for entry in report["unreachable"][:limit]:
+        print(f"  unreachable line {entry['line']} {entry['header']}")
+    if len(report["unreachable"]) > limit:
+        print(f"  ... {len(report['unreachable']) - limit} more unreachable")
+    for label, counts in report["categories"].items():
+        print(f"  {counts['shown']:>7} shown {counts['hidden']:>7} hidden  {label}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog coverage / dead-block report for generated filters.")
+    parser.add_argument("--filter", nargs="+", help="Analyze these .filter files instead of generating variants.")
+    parser.add_argument("--strictness", nargs="+", default=STRICTNESS_LEVELS, choices=STRICTNESS_LEVELS)
+    parser.add_argument("--mode", default="standard", choices=["standard", "ruthless"])
+    parser.add_argument("--language", default="ch", choices=["ch", "en"])
+    parser.add_argument("--rarity", nargs="+", default=["Normal", "Magic", "Rare", "Unique"])
+    parser.add_argument("--item-level", nargs="+", type=int, default=[1, 68, 83, 86])
+    parser.add_argument("--sockets", nargs="+", type=int, default=[0, 6])
+    parser.add_argument("--limit", type=int, default=20, help="Lines per section in the text report.")
+    parser.add_argument("--json", help="Also write the full report as JSON here.")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    catalog = load_catalog()
+    reports = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.filter:
+            # Foreign filters: no footer.filter appended, every block is the filter's own.
+            targets = [(Path(p).name, Path(p), 0) for p in args.filter]
+        else:
+            footer_blocks = len(parse_file(FOOTER_FILE)) if FOOTER_FILE.exists() else 0
+            paths = render_variants(args.mode, args.language, Path(tmp))
+            targets = [(f"{args.mode}/{args.language}/{s}", paths[s], footer_blocks) for s in args.strictness]
+        for name, path, footer_blocks in targets:
+            reports[name] = analyze(path, catalog, args.rarity, args.item_level, args.sockets, footer_blocks)
+            print_report(name, reports[name], args.limit)
+    print(f"{len(catalog)} catalog bases, {len(reports)} filters in {time.perf_counter() - t0:.1f}s",
+          file=sys.stderr)
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,51 +6,249 @@ Run from anywhere; output goes to webapp/frontend/public/demo_data/.
 
 Supersedes webapp/backend/setup_demo.py (which duplicated backend logic).
 
+The mappings/tiers, shared config, items db and bonus info are split into
+content-addressed chunks under demo_data/chunks/ (`<sha256[:16]>.json`) and
+indexed by demo_data/manifest.json. The client fetches the manifest first and
+then only the chunks it needs; an unchanged chunk keeps its URL across
+deployments, so browsers keep it cached (see public/_headers).
+
+The export is incremental. Outputs are grouped by the inputs they read (one
+group per mapping/tier category, the shared config, and everything served by
+the backend loaders); .demo_data_state.json records the input hashes of each
+group, and only groups whose inputs changed are rebuilt. Sound files are
+copied only when new or changed, and files no longer produced are removed.
+A no-op run imports the backend (its loaded modules are code inputs) but
+loads no data. `--full` wipes and rebuilds.
+
 NOTE: json is written WITHOUT sort_keys — tier_definition key order drives
 generated-filter rule order, so insertion order must be preserved.
 """
+import argparse
+import hashlib
 import json
 import shutil
 import sys
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation import data_pack, ggpk_data, translations  # noqa: E402
+
 BACKEND_DIR = PROJECT_ROOT / "webapp" / "backend"
 OUT_DIR = PROJECT_ROOT / "webapp" / "frontend" / "public" / "demo_data"
+STATE_FILE = PROJECT_ROOT / "webapp" / "frontend" / ".demo_data_state.json"
+CONFIG_DIR = PROJECT_ROOT / "filter_generation" / "data"
+DATA_DIR = PROJECT_ROOT / "data"
 SOUND_DIR = PROJECT_ROOT / "sound_files"
+SOUND_SUBDIRS = ("Default", "Sharket掉落音效")
+CHUNK_DIR = "chunks"
+MANIFEST_VERSION = 1
+STATE_VERSION = 1
+
+# Any change to the exporter, the backend it calls or a project module either
+# imports (code_inputs) invalidates every group.
+CODE_PREFIX = "code/"
+# data/ files the backend loaders read. Derived caches elsewhere under data/
+# (GGPK column cache, items_db.columns.json, scraper cache) are not inputs.
+DATA_INPUTS = ("from_filter_blade/3.28/BaseTypes.csv", "from_filter_blade/3.28/bonusItemInfo.json",
+               "from_ggpk/ch_simplified/currency_descriptions.json", "unique_base_db.json")
+# GGPK tables read through ggpk_data outside translations.py (load_stack_sizes)
+GGPK_READS = [("baseitemtypes", ["Id", "Name"], "en"), ("currencyitems", ["BaseItemTypesKey", "StackSize"], "en")]
+# Backend bookkeeping under CONFIG_DIR that is not export input.
+CONFIG_RUNTIME = {"_import_backup", "_snapshot_index.json"}
+# CONFIG_DIR files baked into the shared chunk.
+SHARED_INPUTS = {"theme/sharket/sharket_theme.json", "theme/sharket/Sharket_sound_map.json",
+                 "settings.json", "theme/custom_overrides.json", "footer.filter"}
+
+backend = None
+
+
+def load_backend(with_data: bool):
+    """Import webapp/backend/main.py on first use; load its data when asked."""
+    global backend
+    if backend is None:
+        sys.path.insert(0, str(BACKEND_DIR))
+        import main  # noqa: E402
+        backend = main
+    if with_data:
+        print(f"Loading backend data (project: {PROJECT_ROOT})...")
+        backend.load_base_types()
+        backend.load_translations()
+        backend.load_stack_sizes()
+        backend.load_category_map()
+        backend.load_class_hierarchy()
+        backend.load_filter_conditions()
+        backend.load_bonus_item_info()
+    return backend
+
+
+# --- state / input hashing ---
+
+def load_state() -> dict:
+    try:
+        state = json.loads(STATE_FILE.read_text(encoding="utf-8"))
+        if state.get("version") == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": STATE_VERSION, "inputs": {}, "groups": {}, "files": {}}
+
+
+def save_state(state: dict) -> None:
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+    tmp.replace(STATE_FILE)
+
+
+def code_inputs() -> dict:
+    """key -> path of this script and of every project module loaded once the
+    backend is imported (filter_generation, sql/item_index.py, main.py, ...)."""
+    load_backend(with_data=False)
+    files = {Path(__file__).resolve()}
+    for mod in list(sys.modules.values()):
+        path = getattr(mod, "__file__", None)
+        if path and PROJECT_ROOT in Path(path).resolve().parents and "site-packages" not in Path(path).parts:
+            files.add(Path(path).resolve())
+    return {CODE_PREFIX + path.relative_to(PROJECT_ROOT).as_posix(): path for path in sorted(files)}
+
+
+def iter_inputs():
+    """Yield (key, path) for every file the export reads."""
+    yield from code_inputs().items()
+    for path in sorted(CONFIG_DIR.rglob("*")):
+        rel = path.relative_to(CONFIG_DIR).as_posix()
+        if path.is_file() and rel.split("/", 1)[0] not in CONFIG_RUNTIME:
+            yield f"config/{rel}", path
+    data_files = {DATA_DIR / rel for rel in DATA_INPUTS}
+    data_files.update(ggpk_data.source(*read) for read in GGPK_READS)
+    data_files.update(p for p in translations.sources() if DATA_DIR in p.parents)
+    for path in sorted(data_files):
+        if path.is_file():
+            yield f"data/{path.relative_to(DATA_DIR).as_posix()}", path
+
+
+def hash_inputs(previous: dict) -> dict:
+    """key -> [mtime_ns, size, sha256]; files whose stat is unchanged reuse the
+    recorded hash instead of being re-read."""
+    inputs = {}
+    for key, path in iter_inputs():
+        st = path.stat()
+        old = previous.get(key)
+        if old and old[0] == st.st_mtime_ns and old[1] == st.st_size:
+            inputs[key] = old
+        else:
+            inputs[key] = [st.st_mtime_ns, st.st_size, hashlib.sha256(path.read_bytes()).hexdigest()]
+    return inputs
+
+
+def category_of(rel: str) -> str:
+    """Top-level category folder of a base_mapping/tier_definition relpath."""
+    return rel.split("/", 1)[0] if "/" in rel else ""
+
+
+def groups_of(key: str) -> list[str]:
+    """Output groups that read input `key` (code inputs are handled separately)."""
+    if key.startswith("data/"):
+        return ["backend"]
+    rel = key[len("config/"):]
+    root, _, sub = rel.partition("/")
+    if root in ("base_mapping", "tier_definition") and sub:
+        return [f"category:{category_of(sub)}"]
+    return ["backend", "shared"] if rel in SHARED_INPUTS else ["backend"]
+
+
+def sound_files() -> list[str]:
+    """Sound files to publish, relative to SOUND_DIR."""
+    files = []
+    for sub in SOUND_SUBDIRS:
+        src = SOUND_DIR / sub
+        if src.is_dir():
+            files += [p.relative_to(SOUND_DIR).as_posix() for p in src.rglob("*") if p.is_file()]
+    return sorted(files)
+
+
+def fingerprints(inputs: dict, sounds: list[str]) -> dict:
+    """group -> hash over the (key, sha256) of every input it reads."""
+    code = [(k, entry[2]) for k, entry in inputs.items() if k.startswith(CODE_PREFIX)]
+    members: dict[str, list] = {"backend": [], "shared": []}
+    for key, entry in inputs.items():
+        if key.startswith(CODE_PREFIX):
+            continue
+        for group in groups_of(key):
+            members.setdefault(group, []).append((key, entry[2]))
+    # sounds.json lists the available sound files
+    members["backend"] += [(f"sound/{s}", "") for s in sounds]
+    return {
+        group: hashlib.sha256(json.dumps(code + sorted(items), ensure_ascii=False).encode("utf-8")).hexdigest()
+        for group, items in members.items()
+    }
+
+
+# --- output writing ---
+
+class Writer:
+    """Writes outputs under OUT_DIR, skipping files whose content is unchanged,
+    and records every file this run produces."""
+
+    def __init__(self, state: dict):
+        self.files = state["files"]
+        self.written = 0
+
+    def write_bytes(self, name: str, data: bytes) -> None:
+        digest = hashlib.sha256(data).hexdigest()
+        path = OUT_DIR / name
+        if self.files.get(name) == digest and path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        self.files[name] = digest
+        self.written += 1
+        print(f"  {name}: {len(data) // 1024} KB")
+
+    def write_json(self, name: str, obj) -> None:
+        self.write_bytes(name, json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+    def write_chunk(self, obj) -> str:
+        """Write obj as a content-addressed chunk; returns its demo_data-relative name."""
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        name = f"{CHUNK_DIR}/{hashlib.sha256(data).hexdigest()[:16]}.json"
+        self.write_bytes(name, data)
+        return name
 
-sys.path.insert(0, str(BACKEND_DIR))
-import main as backend  # noqa: E402
 
+# --- group builders: each returns {logical output: file name under OUT_DIR} ---
 
-def write_json(name: str, obj) -> None:
-    path = OUT_DIR / name
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(obj, ensure_ascii=False), encoding="utf-8")
-    print(f"  {name}: {path.stat().st_size // 1024} KB")
+def read_json(path: Path):
+    return data_pack.read_json(path)
 
 
-def build_bundle() -> dict:
-    bundle = {"mappings": {}, "tiers": {}, "theme": {}, "soundMap": {},
-              "settings": {}, "customOverrides": {}, "footer": ""}
-    base_mapping = backend.CONFIG_DATA_DIR / "base_mapping"
-    tier_def = backend.CONFIG_DATA_DIR / "tier_definition"
-    for p in sorted(base_mapping.rglob("*.json")):
-        bundle["mappings"][p.relative_to(base_mapping).as_posix()] = json.loads(p.read_text(encoding="utf-8"))
-    for p in sorted(tier_def.rglob("*.json")):
-        bundle["tiers"][p.relative_to(tier_def).as_posix()] = json.loads(p.read_text(encoding="utf-8"))
-    theme_file = backend.CONFIG_DATA_DIR / "theme" / "sharket" / "sharket_theme.json"
-    sound_map_file = backend.CONFIG_DATA_DIR / "theme" / "sharket" / "Sharket_sound_map.json"
+def build_category(writer: Writer, category: str) -> dict:
+    """Chunk with `{"mappings": {...}, "tiers": {...}}` for every file under one
+    top-level folder (files at the root go to category "")."""
+    chunk = {"mappings": {}, "tiers": {}}
+    for section, root in (("mappings", CONFIG_DIR / "base_mapping"),
+                          ("tiers", CONFIG_DIR / "tier_definition")):
+        base = root / category if category else root
+        paths = base.rglob("*.json") if category else base.glob("*.json")
+        for p in sorted(paths):
+            chunk[section][p.relative_to(root).as_posix()] = read_json(p)
+    return {"chunk": writer.write_chunk(chunk)}
+
+
+def build_shared(writer: Writer) -> dict:
+    shared = {"theme": {}, "soundMap": {}, "settings": {}, "customOverrides": {}, "footer": ""}
+    theme_file = CONFIG_DIR / "theme" / "sharket" / "sharket_theme.json"
+    sound_map_file = CONFIG_DIR / "theme" / "sharket" / "Sharket_sound_map.json"
     if theme_file.exists():
-        bundle["theme"] = json.loads(theme_file.read_text(encoding="utf-8"))
+        shared["theme"] = read_json(theme_file)
     if sound_map_file.exists():
-        bundle["soundMap"] = json.loads(sound_map_file.read_text(encoding="utf-8"))
-    bundle["settings"] = backend.get_settings()
-    bundle["customOverrides"] = backend.get_custom_overrides()
-    footer_file = backend.CONFIG_DATA_DIR / "footer.filter"
+        shared["soundMap"] = read_json(sound_map_file)
+    shared["settings"] = backend.get_settings()
+    shared["customOverrides"] = backend.get_custom_overrides()
+    footer_file = CONFIG_DIR / "footer.filter"
     if footer_file.exists():
-        bundle["footer"] = footer_file.read_text(encoding="utf-8")
-    return bundle
+        shared["footer"] = footer_file.read_text(encoding="utf-8")
+    return {"chunk": writer.write_chunk(shared)}
 
 
 def build_items_db() -> dict:
@@ -77,43 +275,119 @@ def build_items_db() -> dict:
     }
 
 
-def main() -> None:
-    print(f"Loading backend data (project: {PROJECT_ROOT})...")
-    backend.load_base_types()
-    backend.load_translations()
-    backend.load_stack_sizes()
-    backend.load_category_map()
-    backend.load_class_hierarchy()
-    backend.load_filter_conditions()
-    backend.load_bonus_item_info()
-
-    if OUT_DIR.exists():
-        shutil.rmtree(OUT_DIR)
-    OUT_DIR.mkdir(parents=True)
-
-    print(f"Writing static data to {OUT_DIR}...")
-    write_json("bundle.json", build_bundle())
-    write_json("items_db.json", build_items_db())
-    write_json("category_structure.json", backend.get_category_structure())
-    write_json("rule_templates.json", backend.get_rule_templates())
-    write_json("filter_conditions.json", backend.get_filter_conditions())
-    write_json("class_properties.json", backend.get_class_properties())
-    write_json("class_hierarchy.json", backend.get_class_hierarchy())
-    write_json("bonus_info.json", backend.get_bonus_info())
-    write_json("sounds.json", backend.list_available_sounds())
-
+def build_backend(writer: Writer) -> dict:
+    outputs = {
+        "itemsDb": writer.write_chunk(build_items_db()),
+        "bonusInfo": writer.write_chunk(backend.get_bonus_info()),
+    }
+    static = {
+        "category_structure.json": backend.get_category_structure(),
+        "rule_templates.json": backend.get_rule_templates(),
+        "filter_conditions.json": backend.get_filter_conditions(),
+        "class_properties.json": backend.get_class_properties(),
+        "class_hierarchy.json": backend.get_class_hierarchy(),
+        "sounds.json": backend.list_available_sounds(),
+    }
     themes = backend.get_themes_list()
-    write_json("themes.json", themes)
+    static["themes.json"] = themes
     for theme_name in themes.get("themes", []):
-        write_json(f"theme_{theme_name}.json", backend.get_theme_data(theme_name))
+        static[f"theme_{theme_name}.json"] = backend.get_theme_data(theme_name)
+    for name, obj in static.items():
+        writer.write_json(name, obj)
+        outputs[name] = name
+    return outputs
 
-    print("Copying sound files...")
-    for sub in ("Default", "Sharket掉落音效"):
-        src = SOUND_DIR / sub
-        if src.is_dir():
-            shutil.copytree(src, OUT_DIR / "sounds" / sub, dirs_exist_ok=True)
 
-    print("Static web data exported.")
+# --- sounds / stale outputs ---
+
+def sync_sounds(sounds: list[str]) -> int:
+    """Copy new or changed sound files (size/mtime differ); returns the count."""
+    copied = 0
+    for rel in sounds:
+        src, dst = SOUND_DIR / rel, OUT_DIR / "sounds" / rel
+        s = src.stat()
+        if dst.exists():
+            d = dst.stat()
+            if d.st_size == s.st_size and d.st_mtime_ns == s.st_mtime_ns:
+                continue
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(src, dst)
+        copied += 1
+    return copied
+
+
+def remove_stale(expected: set[str]) -> int:
+    """Delete files under OUT_DIR that this export no longer produces."""
+    removed = 0
+    for path in sorted(OUT_DIR.rglob("*"), reverse=True):
+        rel = path.relative_to(OUT_DIR).as_posix()
+        if path.is_file() and rel not in expected:
+            path.unlink()
+            removed += 1
+        elif path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+    return removed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export static data for the backend-free webapp.")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore the export state and rebuild demo_data/ from scratch.")
+    args = parser.parse_args()
+
+    state = load_state()
+    if args.full:
+        if OUT_DIR.exists():
+            shutil.rmtree(OUT_DIR)
+        state = {"version": STATE_VERSION, "inputs": {}, "groups": {}, "files": {}}
+    OUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    inputs = hash_inputs(state["inputs"])
+    sounds = sound_files()
+    prints = fingerprints(inputs, sounds)
+    old_groups = state["groups"]
+
+    def is_fresh(group: str) -> bool:
+        old = old_groups.get(group)
+        return (old is not None and old["fingerprint"] == prints[group]
+                and all((OUT_DIR / name).exists() for name in old["outputs"].values()))
+
+    dirty = sorted(g for g in prints if not is_fresh(g))
+    writer = Writer(state)
+    groups = {g: old_groups[g] for g in prints if g not in dirty}
+    if dirty:
+        print(f"Rebuilding {len(dirty)} of {len(prints)} output groups into {OUT_DIR}...")
+        load_backend(with_data="backend" in dirty)
+        for group in dirty:
+            if group == "backend":
+                outputs = build_backend(writer)
+            elif group == "shared":
+                outputs = build_shared(writer)
+            else:
+                outputs = build_category(writer, group[len("category:"):])
+            groups[group] = {"fingerprint": prints[group], "outputs": outputs}
+
+    categories = sorted(g[len("category:"):] for g in groups if g.startswith("category:"))
+    writer.write_json("manifest.json", {
+        "version": MANIFEST_VERSION,
+        "categories": {cat: groups[f"category:{cat}"]["outputs"]["chunk"] for cat in categories},
+        "shared": groups["shared"]["outputs"]["chunk"],
+        "itemsDb": groups["backend"]["outputs"]["itemsDb"],
+        "bonusInfo": groups["backend"]["outputs"]["bonusInfo"],
+    })
+
+    copied = sync_sounds(sounds)
+    expected = {name for g in groups.values() for name in g["outputs"].values()}
+    expected.add("manifest.json")
+    expected.update(f"sounds/{s}" for s in sounds)
+    removed = remove_stale(expected)
+
+    state["inputs"] = inputs
+    state["groups"] = groups
+    state["files"] = {name: digest for name, digest in state["files"].items() if name in expected}
+    save_state(state)
+    print(f"Static web data exported: {writer.written} written, {copied} sounds copied, "
+          f"{removed} stale removed.")
 
 
 if __name__ == "__main__":
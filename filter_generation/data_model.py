@@ -0,0 +1,210 @@
+"""Typed in-memory model of the tier_definition / base_mapping documents.
+
+Each JSON file is turned once into slotted objects with the fields the
+generator and the backend read normalized up front, instead of walking the raw
+dicts with `.get()` chains inside their loops:
+
+  Category   one tier_definition file: tier_order, tiers (TierEntry by key),
+             the category _meta (theme_category, match_modes, ...)
+  TierEntry  one tier: hide flags, theme tier, localization, sound, lv_group,
+             conditions pre-split into filter lines
+  Mapping    one base_mapping file: base -> tiers (always a list), rules
+  Rule       one rule: targets (always a list), overrides.Tier, match modes,
+             conditions / raw lines pre-split
+
+Condition lines follow generate.py (and filterGenerator.ts) exactly, including
+their two RANGE flavours: tier conditions split on whitespace, rule conditions
+split on single spaces and drop a short RANGE.
+
+load_category / load_mapping cache per file (path, mtime, size), so repeated
+scans — the backend's per-request walks over base_mapping — parse a file only
+after it changed, and read it through the data pack (data_pack.py) when one is
+built. The objects are shared: treat them as read-only.
+
+Usage:
+    from filter_generation.data_model import load_mappings
+    for m in load_mappings(BASE_MAPPING_DIR):
+        m.rel_path, m.tiers_of(base), [r.tier for r in m.rules]
+"""
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from filter_generation.data_pack import read_json
+
+_cache = {}  # path -> ((mtime_ns, size), model)
+
+
+def condition_lines(conditions: dict, rule: bool = False) -> list[str]:
+    """`Key value` filter lines of a conditions dict (indent not included).
+
+    A list value is repeated lines (AND); `RANGE op a op b` becomes two lines;
+    a Rarity value loses a leading `==`. rule=True uses the rule flavour of
+    RANGE (split on " ", dropped when short); tier conditions split on
+    whitespace and fail on a short RANGE, like the generator.
+    """
+    lines = []
+    for key, val in (conditions or {}).items():
+        if isinstance(val, list):
+            for v in val:
+                lines.append(f"{key} {v}")
+        elif val.startswith("RANGE "):
+            parts = val.split(" ") if rule else val.split()
+            if rule and len(parts) < 5:
+                continue
+            lines.append(f"{key} {parts[1]} {parts[2]}")
+            lines.append(f"{key} {parts[3]} {parts[4]}")
+        elif key == "Rarity":
+            clean_val = val[2:].strip() if val.strip().startswith("==") else val
+            lines.append(f"{key} {clean_val}")
+        else:
+            lines.append(f"{key} {val}")
+    return lines
+
+
+@dataclass(slots=True)
+class TierEntry:
+    key: str
+    is_hide: bool                  # is_hide_tier
+    hide_at: int | None            # hide_at_strictness
+    excluded_modes: list[str]
+    class_condition: bool          # class-condition tier (no BaseType line)
+    conditions: dict               # raw, as authored
+    condition_lines: list[str]     # tier flavour, see condition_lines()
+    theme_tier: int | None         # theme.Tier override
+    localization: dict
+    sound: dict
+    lv_group: dict                 # Campaign picker group ({} when none)
+    show_in_editor: bool
+    raw: dict
+
+    @classmethod
+    def from_dict(cls, key: str, d: dict) -> "TierEntry":
+        conditions = d.get("conditions", {})
+        return cls(key=key, is_hide=d.get("is_hide_tier", False), hide_at=d.get("hide_at_strictness"),
+                   excluded_modes=d.get("excluded_modes", []), class_condition=bool(d.get("class_condition")),
+                   conditions=conditions, condition_lines=condition_lines(conditions),
+                   theme_tier=d.get("theme", {}).get("Tier"), localization=d.get("localization", {}),
+                   sound=d.get("sound", {}), lv_group=d.get("lv_group") or {},
+                   show_in_editor=d.get("show_in_editor", True), raw=d)
+
+    def label(self, lang: str) -> str | None:
+        """Localized display name: lang, then en, else None."""
+        return self.localization.get(lang) or self.localization.get("en")
+
+
+@dataclass(slots=True)
+class Category:
+    rel_path: str
+    key: str                       # category key (first non-comment key), "" if none
+    meta: dict                     # the category's _meta
+    tier_order: list[str]
+    tiers: dict[str, TierEntry]    # every tier key (non-_meta dict entry), authored order
+    theme_category: str
+    match_modes: dict[str, str]    # _meta.match_modes of the tier_definition
+
+    @classmethod
+    def from_doc(cls, rel_path: str, doc: dict) -> "Category":
+        key = next((k for k in doc if not k.startswith("//")), None) or ""
+        data = doc.get(key, {}) if key else {}
+        meta = data.get("_meta", {})
+        tiers = {k: TierEntry.from_dict(k, v) for k, v in data.items() if k != "_meta" and isinstance(v, dict)}
+        return cls(rel_path=rel_path, key=key, meta=meta, tier_order=list(meta.get("tier_order", [])),
+                   tiers=tiers, theme_category=meta.get("theme_category", key),
+                   match_modes=meta.get("match_modes", {}))
+
+
+@dataclass(slots=True)
+class Rule:
+    index: int                     # position in the file's rules array (-1: generated)
+    targets: list[str]
+    tier: str | None               # overrides.Tier
+    apply_to_tier: bool            # applyToTier: take every pending base of the tier
+    disabled: bool
+    overrides: dict
+    target_match_modes: dict[str, str]
+    condition_lines: list[str]     # rule flavour, see condition_lines()
+    raw_lines: list[str]           # `raw` text, stripped, blank lines dropped
+    comment: str
+    localization: dict
+    raw: dict
+
+    @classmethod
+    def from_dict(cls, index: int, d: dict) -> "Rule":
+        targets = d.get("targets", [])
+        overrides = d.get("overrides", {})
+        return cls(index=index, targets=targets if isinstance(targets, list) else [],
+                   tier=overrides.get("Tier"), apply_to_tier=d.get("applyToTier", False),
+                   disabled=bool(d.get("disabled")), overrides=overrides,
+                   target_match_modes=d.get("targetMatchModes", {}),
+                   condition_lines=condition_lines(d.get("conditions"), rule=True),
+                   raw_lines=[l.strip() for l in (d.get("raw") or "").split("\n") if l.strip()],
+                   comment=d.get("comment", ""), localization=d.get("localization", {}), raw=d)
+
+    def match_mode(self, target: str) -> str:
+        return self.target_match_modes.get(target, "exact")
+
+
+@dataclass(slots=True)
+class Mapping:
+    rel_path: str
+    meta: dict                     # the file's _meta
+    tiers: dict[str, list[str]]    # base -> tier keys (a single tier becomes a 1-list)
+    rules: list[Rule]
+    has_rules: bool                # the doc carries a `rules` array (see generate.py auto-sound rules)
+    match_modes: dict[str, str]    # _meta.match_modes of the mapping
+    excluded_modes: list[str]
+    raw: dict = field(repr=False, default_factory=dict)
+
+    @classmethod
+    def from_doc(cls, rel_path: str, doc: dict) -> "Mapping":
+        meta = doc.get("_meta", {})
+        tiers = {base: (t if isinstance(t, list) else [t]) for base, t in doc.get("mapping", {}).items()}
+        return cls(rel_path=rel_path, meta=meta, tiers=tiers,
+                   rules=[Rule.from_dict(i, r) for i, r in enumerate(doc.get("rules", []))],
+                   has_rules="rules" in doc, match_modes=meta.get("match_modes", {}),
+                   excluded_modes=meta.get("excluded_modes", []), raw=doc)
+
+    def tiers_of(self, base: str) -> list[str]:
+        return self.tiers.get(base, [])
+
+    def match_mode(self, base: str) -> str:
+        return self.match_modes.get(base, "exact")
+
+    def involved(self) -> set[str]:
+        """Every base the file names: mapped bases plus rule targets."""
+        bases = set(self.tiers)
+        for rule in self.rules:
+            bases.update(rule.targets)
+        return bases
+
+
+def _load(path: Path, root: Path, build):
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    hit = _cache.get(path)
+    if hit and hit[0] == stamp:
+        return hit[1]
+    model = build(path.relative_to(root).as_posix(), read_json(path))
+    _cache[path] = (stamp, model)
+    return model
+
+
+def load_category(path: Path, root: Path) -> Category:
+    """tier_definition file `path` (rel_path relative to `root`)."""
+    return _load(Path(path), Path(root), Category.from_doc)
+
+
+def load_mapping(path: Path, root: Path) -> Mapping:
+    """base_mapping file `path` (rel_path relative to `root`)."""
+    return _load(Path(path), Path(root), Mapping.from_doc)
+
+
+def load_mappings(root: Path) -> list[Mapping]:
+    """Every base_mapping file under root, in rglob order; unreadable files skipped."""
+    out = []
+    for path in Path(root).rglob("*.json"):
+        try:
+            out.append(load_mapping(path, root))
+        except (OSError, ValueError, TypeError, AttributeError):
+            continue
+    return out
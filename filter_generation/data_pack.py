@@ -0,0 +1,176 @@
+"""Single-file pack of the data tree (base_mapping + tier_definition).
+
+The JSON files under filter_generation/data stay the editable source of truth;
+the pack is a derived, read-only copy of their bytes in one file, so readers
+that walk the whole tree map one file instead of opening ~200:
+
+  b"FGPACK1\\n"                  magic
+  <u64 little-endian>           length of the index
+  index (UTF-8 JSON)            {"files": {"base_mapping/X/Y.json": [offset, length, mtime_ns, size], ...}}
+  payload                       the files' bytes, back to back (offsets count from here)
+
+The reader memory-maps the pack and decodes one file at a time (lazily, per
+category). Every lookup compares the source file's current (mtime, size) with
+the recorded one; an edited, new or missing entry is read from disk instead,
+so a stale pack only loses speed, never correctness.
+
+Usage:
+  python data_pack.py            # (re)build filter_generation/.data_pack
+  python data_pack.py --check    # exit 1 when the pack is missing or stale
+
+  from filter_generation.data_pack import read_json
+  doc = read_json(path)          # pack fast path, or the file
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DATA_DIR = SCRIPT_DIR / "data"
+PACK_FILE = SCRIPT_DIR / ".data_pack"
+PACKED_ROOTS = ("base_mapping", "tier_definition")
+MAGIC = b"FGPACK1\n"
+_HEADER = struct.Struct("<Q")
+
+_open = None  # (pack stat stamp, DataPack) of the pack currently mapped
+
+
+def _tree_files(data_dir: Path):
+    """(relative path, Path) of every packed file, sorted."""
+    for root in PACKED_ROOTS:
+        for path in sorted((data_dir / root).rglob("*.json")):
+            yield path.relative_to(data_dir).as_posix(), path
+
+
+def build_pack(data_dir: Path = DATA_DIR, pack_file: Path = PACK_FILE) -> int:
+    """Write the pack for data_dir; returns the number of files packed."""
+    index, chunks, offset = {}, [], 0
+    for rel, path in _tree_files(data_dir):
+        st = path.stat()
+        data = path.read_bytes()
+        index[rel] = [offset, len(data), st.st_mtime_ns, st.st_size]
+        chunks.append(data)
+        offset += len(data)
+    head = json.dumps({"files": index}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    tmp = pack_file.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(len(head)))
+        f.write(head)
+        for data in chunks:
+            f.write(data)
+    os.replace(tmp, pack_file)
+    return len(index)
+
+
+class DataPack:
+    """A memory-mapped pack; entries are decoded on demand."""
+
+    def __init__(self, pack_file: Path = PACK_FILE, data_dir: Path = DATA_DIR):
+        self.data_dir = Path(data_dir).resolve()
+        self._prefix = str(self.data_dir) + os.sep
+        with open(pack_file, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"{pack_file} is not a data pack")
+        (size,) = _HEADER.unpack_from(self._map, len(MAGIC))
+        start = len(MAGIC) + _HEADER.size
+        self.index = json.loads(self._map[start:start + size])["files"]
+        self._payload = start + size
+
+    def close(self):
+        self._map.close()
+
+    def _entry(self, path: Path):
+        name = os.fspath(path)
+        if not name.startswith(self._prefix):
+            name = str(Path(name).resolve())
+            if not name.startswith(self._prefix):
+                return None
+        entry = self.index.get(name[len(self._prefix):].replace(os.sep, "/"))
+        if entry is None:
+            return None
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return entry if (st.st_mtime_ns, st.st_size) == (entry[2], entry[3]) else None
+
+    def read_bytes(self, path: Path) -> bytes | None:
+        """Packed bytes of `path` when the pack holds its current version, else None."""
+        entry = self._entry(path)
+        if entry is None:
+            return None
+        start = self._payload + entry[0]
+        return self._map[start:start + entry[1]]
+
+    def stale(self) -> list[str]:
+        """Relative paths added, removed or changed since the pack was built."""
+        current = {}
+        for rel, path in _tree_files(self.data_dir):
+            st = path.stat()
+            current[rel] = (st.st_mtime_ns, st.st_size)
+        out = [rel for rel, stamp in current.items()
+               if rel not in self.index or tuple(self.index[rel][2:]) != stamp]
+        return out + [rel for rel in self.index if rel not in current]
+
+
+def get_pack() -> DataPack | None:
+    """The pack at PACK_FILE (reopened when rebuilt), or None without one."""
+    global _open
+    try:
+        st = PACK_FILE.stat()
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _open is None or _open[0] != stamp:
+        if _open is not None:
+            _open[1].close()
+        try:
+            _open = (stamp, DataPack())
+        except (OSError, ValueError):
+            _open = None
+            return None
+    return _open[1]
+
+
+def read_json(path: Path):
+    """Parsed JSON of a data-tree file: from the pack when it holds the file's
+    current version, otherwise from the file (raising like json.loads would)."""
+    pack = get_pack()
+    data = pack.read_bytes(path) if pack is not None else None
+    if data is None:
+        data = Path(path).read_bytes()
+    return json.loads(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the data tree into one memory-mappable file.")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when the pack is missing or stale.")
+    args = parser.parse_args()
+
+    if args.check:
+        pack = get_pack()
+        if pack is None:
+            print(f"no data pack at {PACK_FILE}")
+            sys.exit(1)
+        stale = pack.stale()
+        for rel in stale:
+            print(f"stale: {rel}")
+        print(f"{len(pack.index)} packed files, {len(stale)} stale")
+        sys.exit(1 if stale else 0)
+
+    t0 = time.perf_counter()
+    count = build_pack()
+    print(f"[OK] packed {count} files into {PACK_FILE} "
+          f"({PACK_FILE.stat().st_size // 1024} KiB) in {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Zero-copy reader for GGPK .datc64 tables (data/from_ggpk/**).
+
+Layout: uint32 row count, n fixed-width rows, the 8-byte 0xBB boundary, then
+the variable section. Strings are UTF-16LE, terminated by 4 zero bytes at an
+even distance from their start; string cells hold a uint64 offset into the
+variable section (which starts at the boundary, so offsets < 8 are invalid).
+Foreign keys take 16 bytes (row index + 8 unused), self-references 8; a null
+key is 0xFEFEFEFEFEFEFEFE. Arrays take 16 bytes: element count, then the
+offset of the packed elements in the variable section.
+
+The file is memory-mapped and never copied whole. Columns are described
+declaratively (name -> Column(offset, type)) and extracted a whole column at a
+time with one struct.iter_unpack over the fixed section (or as a NumPy array
+with `array()`); rows are lazy views that decode a cell when it is read.
+Decoded columns and strings are memoized per table.
+
+Usage:
+    from filter_generation.datc64 import Column, Table
+    BASE_ITEM_TYPES = {"Id": Column(0, "string"), "Name": Column(32, "string")}
+    with Table(path, BASE_ITEM_TYPES) as t:
+        ids = t.column("Id")                  # every row, decoded
+        t[12]["Name"], len(t), t.width
+"""
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+NULL_ROW = 0xFEFEFEFEFEFEFEFE
+BOUNDARY = b"\xbb" * 8
+_TERMINATOR = b"\x00\x00\x00\x00"
+
+# type -> (struct format of the stored value, size in the row)
+TYPES = {
+    "bool": ("?", 1), "u8": ("B", 1), "i16": ("h", 2), "u16": ("H", 2),
+    "i32": ("i", 4), "u32": ("I", 4), "f32": ("f", 4), "i64": ("q", 8), "u64": ("Q", 8),
+    "string": ("Q", 8),    # offset into the variable section
+    "row": ("Q", 8),       # self-reference (row index), NULL_ROW -> None
+    "foreign": ("Q", 16),  # row index into another table + 8 unused bytes
+    "array": ("QQ", 16),   # element count, offset of the elements
+}
+_NUMPY = {"bool": "?", "u8": "u1", "i16": "<i2", "u16": "<u2", "i32": "<i4", "u32": "<u4",
+          "f32": "<f4", "i64": "<i8", "u64": "<u8", "string": "<u8", "row": "<u8", "foreign": "<u8"}
+
+
+@dataclass(frozen=True, slots=True)
+class Column:
+    offset: int          # byte offset inside the fixed-width row
+    type: str            # key of TYPES
+    of: str = ""         # element type of an "array" column
+
+    @property
+    def size(self) -> int:
+        return TYPES[self.type][1]
+
+
+class Row:
+    """Lazy view of one row: `row["Name"]` decodes that cell only."""
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "Table", index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, name: str):
+        return self.table.cell(self.index, name)
+
+    def get(self, name: str, default=None):
+        return self.table.cell(self.index, name) if name in self.table.schema else default
+
+    def to_dict(self) -> dict:
+        return {"_rid": self.index, **{name: self[name] for name in self.table.schema}}
+
+
+class Table:
+    def __init__(self, path: Path, schema: dict[str, Column] | None = None):
+        self.path = Path(path)
+        self.schema = dict(schema or {})
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._layout()
+        except ValueError:
+            self._map.close()
+            raise
+        self._columns = {}
+        self._strings = {}
+
+    def _layout(self):
+        mm = self._map
+        if len(mm) < 4:
+            raise ValueError(f"{self.path.name}: truncated datc64")
+        (n,) = struct.unpack_from("<I", mm, 0)
+        bb = mm.find(BOUNDARY, 4)
+        if bb < 4 or (n and (bb - 4) % n) or (not n and bb != 4):
+            raise ValueError(f"{self.path.name}: unexpected datc64 layout")
+        self.n_rows = n
+        self.width = (bb - 4) // n if n else 0
+        self._var = bb  # absolute start of the variable section
+        for name, col in self.schema.items():
+            if col.type not in TYPES or (col.type == "array" and col.of not in TYPES.keys() - {"array"}):
+                raise ValueError(f"{self.path.name}: column {name} has unknown type {col.type!r}")
+            if n and col.offset + col.size > self.width:
+                raise ValueError(f"{self.path.name}: column {name} ends past the {self.width}-byte row")
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def __getitem__(self, index: int) -> Row:
+        if not -self.n_rows <= index < self.n_rows:
+            raise IndexError(index)
+        return Row(self, index % self.n_rows)
+
+    def __iter__(self):
+        return (Row(self, i) for i in range(self.n_rows))
+
+    # --- variable section ---
+
+    def string(self, offset: int) -> str | None:
+        """UTF-16LE string at `offset` of the variable section; None when the
+        offset is out of range / odd, unterminated, or not valid UTF-16."""
+        if offset in self._strings:
+            return self._strings[offset]
+        value = None
+        start, end = self._var + offset, len(self._map)
+        if 8 <= offset and start < end and not offset % 2:
+            stop = self._map.find(_TERMINATOR, start)
+            while stop != -1 and (stop - start) % 2:
+                stop = self._map.find(_TERMINATOR, stop + 1)
+            if stop != -1:
+                try:
+                    value = self._map[start:stop].decode("utf-16-le")
+                except UnicodeDecodeError:
+                    pass
+        self._strings[offset] = value
+        return value
+
+    def _elements(self, count: int, offset: int, of: str) -> list | None:
+        fmt, size = TYPES[of]
+        start = self._var + offset
+        if count == 0:
+            return []
+        if offset < 8 or start + count * size > len(self._map):
+            return None
+        raw = struct.unpack_from("<" + f"{fmt}{size - struct.calcsize(fmt)}x" * count, self._map, start)
+        return self._decode(of, raw)
+
+    def _decode(self, kind: str, raw) -> list:
+        if kind == "string":
+            return [self.string(o) for o in raw]
+        if kind in ("row", "foreign"):
+            return [None if v == NULL_ROW else v for v in raw]
+        return list(raw)
+
+    # --- fixed section ---
+
+    def _raw(self, col: Column) -> list:
+        """Stored value(s) of `col` for every row, in one pass over the fixed section."""
+        if not self.n_rows:
+            return []
+        fmt, size = TYPES[col.type]
+        pad = self.width - col.offset - struct.calcsize(fmt)
+        row = struct.Struct(f"<{col.offset}x{fmt}{pad}x")
+        fixed = memoryview(self._map)[4:self._var]
+        try:
+            if len(fmt) == 1:
+                return [v for (v,) in row.iter_unpack(fixed)]
+            return list(row.iter_unpack(fixed))
+        finally:
+            fixed.release()
+
+    def column(self, name: str) -> list:
+        """Every row's decoded value of column `name` (memoized)."""
+        if name not in self._columns:
+            col = self.schema[name]
+            raw = self._raw(col)
+            if col.type == "array":
+                values = [self._elements(count, offset, col.of) for count, offset in raw]
+            else:
+                values = self._decode(col.type, raw)
+            self._columns[name] = values
+        return self._columns[name]
+
+    def array(self, name: str):
+        """Column `name` as a NumPy array of the stored values (string offsets
+        and row keys undecoded, NULL_ROW kept). Needs numpy."""
+        import numpy as np  # optional, and slow to import: only array() needs it
+        col = self.schema[name]
+        if col.type not in _NUMPY:
+            raise ValueError(f"column {name} ({col.type}) has no NumPy form")
+        if not self.n_rows:
+            return np.empty(0, dtype=_NUMPY[col.type])
+        fixed = memoryview(self._map)[4:self._var]
+        view = np.ndarray((self.n_rows,), dtype=_NUMPY[col.type], buffer=fixed,
+                          offset=col.offset, strides=(self.width,))
+        values = view.copy()  # detach from the map so close() stays possible
+        del view
+        fixed.release()
+        return values
+
+    def cell(self, index: int, name: str):
+        """One decoded cell, without decoding the rest of the column."""
+        if name in self._columns:
+            return self._columns[name][index]
+        col = self.schema[name]
+        fmt, _ = TYPES[col.type]
+        raw = struct.unpack_from("<" + fmt, self._map, 4 + index * self.width + col.offset)
+        if col.type == "array":
+            return self._elements(raw[0], raw[1], col.of)
+        return self._decode(col.type, raw)[0]
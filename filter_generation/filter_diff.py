@@ -0,0 +1,263 @@
+"""Semantic diff between two .filter files (or two directories of variants).
+
+Blocks are aligned by a stable identity instead of line position, so block
+indices shifting by one do not turn a diff into noise:
+
+  * generated filters: (category banner, block banner without its index), i.e.
+    category + tier + rule/base group as generate.py labels them;
+  * FilterBlade filters: the `$type->` / `$tier->` tags;
+  * anything else: the block's condition text.
+
+Duplicate identities are numbered in order. Blocks left unpaired are then
+paired by content hash (a rule renumbered or renamed but otherwise unchanged).
+For every pair the report lists re-gated blocks (command or a non-BaseType
+condition changed), restyled blocks (actions changed) and pairs whose relative
+order changed (first match wins, so order is behaviour); unpaired blocks are
+added / removed. BaseTypes are followed separately: a base whose set of
+containing blocks changed is reported with the blocks it left / joined.
+
+Usage:
+  python filter_diff.py old.filter new.filter
+  python filter_diff.py --render /tmp/before                # all 28 variants (mode x language x strictness)
+  python filter_diff.py /tmp/before /tmp/after --check      # CI: exit 1 on any difference
+  python filter_diff.py /tmp/before /tmp/after --fail-on removed regated --json diff.json
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+from filter_generation.filter_parser import Block, generated_labels, parse_file  # noqa: E402
+from filter_generation.variants import render_variants  # noqa: E402
+
+KINDS = ("added", "removed", "regated", "restyled", "reordered", "bases")
+
+
+def _identity(block: Block, label) -> tuple:
+    if label:
+        return label
+    if block.type or block.tier:
+        return (block.type or "", block.tier or "")
+    return ("", " | ".join(f"{c.key} {c.raw}" for c in block.conditions))
+
+
+def _describe(block: Block, label) -> str:
+    if label:
+        return f"{label[0]} / {label[1]}" if label[0] else label[1]
+    if block.type or block.tier:
+        return f"$type->{block.type} $tier->{block.tier}"
+    return f"{block.command} (line {block.line})"
+
+
+def _gate(block: Block) -> list[str]:
+    return [block.command] + [f"{c.key} {c.raw}" for c in block.conditions if c.key != "BaseType"]
+
+
+def _style(block: Block) -> list[str]:
+    return [f"{a.key} {a.raw}".rstrip() for a in block.actions] + (["Continue"] if block.continues else [])
+
+
+def _bases(block: Block) -> list[str]:
+    return [v for c in block.conditions if c.key == "BaseType" for v in c.values]
+
+
+def _content_hash(block: Block) -> str:
+    text = "\n".join(_gate(block) + _style(block) + sorted(_bases(block)))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _keyed(blocks: list[Block]) -> list[tuple]:
+    """Identity of every block, duplicates numbered in source order."""
+    seen = {}
+    keys = []
+    for block, label in zip(blocks, generated_labels(blocks)):
+        ident = _identity(block, label)
+        n = seen[ident] = seen.get(ident, 0) + 1
+        keys.append((ident, n))
+    return keys
+
+
+def _out_of_order(pairs: list[tuple[int, int]]) -> set:
+    """Pairs (old, new) outside a longest increasing run of new positions."""
+    tails, tails_at, prev = [], [], [None] * len(pairs)
+    for k, (_, new) in enumerate(pairs):
+        pos = bisect.bisect_left(tails, new)
+        if pos == len(tails):
+            tails.append(new)
+            tails_at.append(k)
+        else:
+            tails[pos] = new
+            tails_at[pos] = k
+        prev[k] = tails_at[pos - 1] if pos else None
+    keep = set()
+    k = tails_at[-1] if tails_at else None
+    while k is not None:
+        keep.add(k)
+        k = prev[k]
+    return {pairs[k] for k in range(len(pairs)) if k not in keep}
+
+
+def diff_blocks(old: list[Block], new: list[Block]) -> dict:
+    old_keys, new_keys = _keyed(old), _keyed(new)
+    old_labels, new_labels = generated_labels(old), generated_labels(new)
+    new_by_key = {key: j for j, key in enumerate(new_keys)}
+
+    pairs, paired_new = [], set()
+    for i, key in enumerate(old_keys):
+        j = new_by_key.get(key)
+        if j is not None:
+            pairs.append((i, j))
+            paired_new.add(j)
+    paired_old = {i for i, _ in pairs}
+
+    # Second pass: unchanged content under a new identity (renumbered / renamed rule).
+    by_hash = {}
+    for j, block in enumerate(new):
+        if j not in paired_new:
+            by_hash.setdefault(_content_hash(block), []).append(j)
+    renamed = []
+    for i, block in enumerate(old):
+        if i in paired_old:
+            continue
+        candidates = by_hash.get(_content_hash(block))
+        if candidates:
+            j = candidates.pop(0)
+            pairs.append((i, j))
+            paired_old.add(i)
+            paired_new.add(j)
+            renamed.append((i, j))
+    pairs.sort()
+
+    def old_desc(i):
+        return _describe(old[i], old_labels[i])
+
+    def new_desc(j):
+        return _describe(new[j], new_labels[j])
+
+    report = {kind: [] for kind in KINDS}
+    report["renamed"] = [{"old": old_desc(i), "new": new_desc(j), "oldLine": old[i].line, "newLine": new[j].line}
+                         for i, j in renamed]
+    report["added"] = [{"block": new_desc(j), "line": new[j].line} for j in range(len(new)) if j not in paired_new]
+    report["removed"] = [{"block": old_desc(i), "line": old[i].line} for i in range(len(old)) if i not in paired_old]
+    for i, j in pairs:
+        entry = {"block": new_desc(j), "oldLine": old[i].line, "newLine": new[j].line}
+        old_gate, new_gate = _gate(old[i]), _gate(new[j])
+        if old_gate != new_gate:
+            report["regated"].append({**entry, "old": old_gate, "new": new_gate})
+        old_style, new_style = _style(old[i]), _style(new[j])
+        if old_style != new_style:
+            report["restyled"].append({**entry, "old": [s for s in old_style if s not in new_style],
+                                       "new": [s for s in new_style if s not in old_style]})
+    for i, j in sorted(_out_of_order(pairs), key=lambda p: p[1]):
+        report["reordered"].append({"block": new_desc(j), "oldLine": old[i].line, "newLine": new[j].line})
+
+    # BaseTypes: compare the blocks holding each base, old blocks named by their
+    # new-side pair so a renamed-but-paired block does not read as a move.
+    new_name_of_old = {i: new_desc(j) for i, j in pairs}
+    old_homes, new_homes = {}, {}
+    for i, block in enumerate(old):
+        for base in _bases(block):
+            old_homes.setdefault(base, []).append(new_name_of_old.get(i, old_desc(i)))
+    for j, block in enumerate(new):
+        for base in _bases(block):
+            new_homes.setdefault(base, []).append(new_desc(j))
+    for base in sorted(old_homes.keys() | new_homes.keys()):
+        before, after = old_homes.get(base, []), new_homes.get(base, [])
+        if sorted(before) != sorted(after):
+            report["bases"].append({"base": base, "from": [h for h in before if h not in after],
+                                    "to": [h for h in after if h not in before]})
+    return report
+
+
+def diff_files(old_path: Path, new_path: Path) -> dict:
+    report = diff_blocks(parse_file(old_path), parse_file(new_path))
+    report["old"], report["new"] = str(old_path), str(new_path)
+    return report
+
+
+def summary(report: dict) -> str:
+    return ", ".join(f"{len(report[kind])} {kind}" for kind in KINDS + ("renamed",))
+
+
+def print_report(name: str, report: dict, limit: int):
+    print(f"== {name}: {summary(report)}")
+    sections = [
+        ("added", "+", lambda e: f"{e['block']} (line {e['line']})"),
+        ("removed", "-", lambda e: f"{e['block']} (line {e['line']})"),
+        ("regated", "!", lambda e: f"{e['block']}: {' ; '.join(e['old'])}  ->  {' ; '.join(e['new'])}"),
+        ("restyled", "~", lambda e: f"{e['block']}: {' ; '.join(e['old']) or '-'}  ->  {' ; '.join(e['new']) or '-'}"),
+        ("reordered", "^", lambda e: f"{e['block']} (line {e['oldLine']} -> {e['newLine']})"),
+        ("renamed", "=", lambda e: f"{e['old']}  ->  {e['new']}"),
+        ("bases", ">", lambda e: f"{e['base']}: {' | '.join(e['from']) or '(new)'}  ->  {' | '.join(e['to']) or '(dropped)'}"),
+    ]
+    for kind, mark, fmt in sections:
+        entries = report[kind]
+        for entry in entries[:limit]:
+            print(f"  {mark} {fmt(entry)}")
+        if len(entries) > limit:
+            print(f"  {mark} ... {len(entries) - limit} more {kind}")
+
+
+def render_all(out_dir: Path) -> list[Path]:
+    """Render every mode x language x strictness variant into out_dir."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    jobs = [(m, lang) for m in ("standard", "ruthless") for lang in ("ch", "en")]
+    with ThreadPoolExecutor() as pool:
+        return [p for paths in pool.map(lambda job: render_variants(*job, out_dir), jobs) for p in paths.values()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semantic diff of generated filter variants.")
+    parser.add_argument("old", nargs="?", help="Old .filter, or a directory of variants.")
+    parser.add_argument("new", nargs="?", help="New .filter, or a directory of variants.")
+    parser.add_argument("--render", metavar="DIR",
+                        help="Render all 28 variants of the current data into DIR (then exit).")
+    parser.add_argument("--check", action="store_true", help="Exit 1 when anything differs.")
+    parser.add_argument("--fail-on", nargs="+", choices=KINDS, default=[],
+                        help="Exit 1 only when these kinds of change are present.")
+    parser.add_argument("--limit", type=int, default=30, help="Lines per section in the text report.")
+    parser.add_argument("--json", help="Also write the full report as JSON here.")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.render:
+        paths = render_all(Path(args.render))
+        print(f"rendered {len(paths)} variants into {args.render} in {time.perf_counter() - t0:.1f}s",
+              file=sys.stderr)
+        return
+    if not (args.old and args.new):
+        parser.error("give OLD and NEW (files or directories), or --render DIR")
+
+    old, new = Path(args.old), Path(args.new)
+    if old.is_dir() and new.is_dir():
+        old_names = {p.name for p in old.glob("*.filter")}
+        new_names = {p.name for p in new.glob("*.filter")}
+        for name in sorted(old_names ^ new_names):
+            print(f"== {name}: only in {old if name in old_names else new}")
+        pairs = [(name, old / name, new / name) for name in sorted(old_names & new_names)]
+        missing = bool(old_names ^ new_names)
+    else:
+        pairs = [(new.name, old, new)]
+        missing = False
+
+    reports = {}
+    for name, old_path, new_path in pairs:
+        reports[name] = diff_files(old_path, new_path)
+        print_report(name, reports[name], args.limit)
+    print(f"{len(reports)} filter pairs in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+    if args.json:
+        Path(args.json).write_text(json.dumps(reports, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    fail_kinds = KINDS if args.check else args.fail_on
+    if (args.check and missing) or any(r[kind] for r in reports.values() for kind in fail_kinds):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Streaming parser for PoE `.filter` files -> typed block AST.
+
+Shared by the Python tooling that reads filters: the FilterBlade importers in
+parsing_tool/, the drop simulator (simulate.py) and the filter analyzers.
+
+Block semantics follow the game: a block starts at a `Show` / `Hide` /
+`Minimal` line and owns every following non-blank, non-comment line up to the
+next block header — blank lines and comments inside a block are skipped, and
+lines at column 0 (FilterBlade emits some `Class ==` lines unindented) still
+belong to the block. Commented-out blocks (`#Show ...`) are not blocks.
+
+Each Block keeps its command, conditions (repeated keys stay separate entries,
+meaning AND), actions, the `Continue` flag, the trailing comment of the command
+line with FilterBlade's `$type->` / `$tier->` tags split out, the comment lines
+above it (generate.py's `#==[NNNNN]-...==` banner and notes) and source offsets
+(character offsets into the text, plus 1-based line numbers).
+
+Usage:
+    from filter_generation.filter_parser import parse_file
+    for block in parse_file(path):
+        block.command, block.type, block.tier, block.condition_map()
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+import re
+from typing import Iterable, Iterator
+
+BLOCK_COMMANDS = ("Show", "Hide", "Minimal")
+# Action keywords (everything else inside a block is a condition). Prefix match,
+# so the *Positional / *Optional / *IfAlertSound variants are covered too.
+ACTION_PREFIXES = (
+    "SetFontSize", "SetTextColor", "SetBorderColor", "SetBackgroundColor",
+    "PlayAlertSound", "PlayEffect", "MinimapIcon", "CustomAlertSound",
+    "DisableDropSound", "EnableDropSound",
+)
+OPERATORS = ("==", "!=", "<=", ">=", "<", ">", "=", "!")
+
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+_BANNER_RE = re.compile(r"^==\[(\d{5,})\]-\s*(.*?)\s*==$")
+_TYPE_RE = re.compile(r"\$type->(\S+)")
+_TIER_RE = re.compile(r"\$tier->(\S+)")
+
+
+@dataclass(slots=True)
+class Condition:
+    key: str
+    op: str            # "" when the line has no explicit operator (implicit "=")
+    values: list[str]  # quotes stripped
+    raw: str           # text after the key, as written (operator included)
+    line: int
+
+
+@dataclass(slots=True)
+class Action:
+    key: str
+    args: list[str]
+    raw: str
+    line: int
+
+
+@dataclass(slots=True)
+class Block:
+    index: int                 # ordinal among the file's blocks
+    command: str               # Show / Hide / Minimal
+    comment: str               # trailing comment of the command line ("" if none)
+    type: str | None           # FilterBlade `$type->` path, e.g. "uniques->replicas"
+    tier: str | None           # FilterBlade `$tier->` value
+    preceding_comment: str     # last comment line seen since the previous block header
+    comments: list[str]        # every comment line since the previous block header
+    line: int                  # 1-based line of the command
+    start: int                 # offset of the command line
+    end: int = 0               # offset just past the block's last line
+    conditions: list[Condition] = field(default_factory=list)
+    actions: list[Action] = field(default_factory=list)
+    continues: bool = False
+
+    @property
+    def command_span(self) -> tuple[int, int]:
+        """(start, end) offsets of the command keyword itself."""
+        return self.start, self.start + len(self.command)
+
+    def get(self, key: str) -> Condition | None:
+        """First condition with this key."""
+        for cond in self.conditions:
+            if cond.key == key:
+                return cond
+        return None
+
+    def action(self, key: str) -> Action | None:
+        for act in self.actions:
+            if act.key == key:
+                return act
+        return None
+
+    def condition_map(self, skip: Iterable[str] = ()) -> "OrderedDict[str, str | list[str]]":
+        """key -> raw value; a repeated key (AND) becomes a list of raw values.
+
+        This is the shape the tier_definition `conditions` dicts use.
+        """
+        skip = set(skip)
+        out = OrderedDict()
+        for cond in self.conditions:
+            if cond.key in skip:
+                continue
+            if cond.key in out:
+                prev = out[cond.key]
+                out[cond.key] = (prev if isinstance(prev, list) else [prev]) + [cond.raw]
+            else:
+                out[cond.key] = cond.raw
+        return out
+
+
+def strip_comment(line: str) -> tuple[str, str]:
+    """Split `code # comment` at the first '#' outside double quotes."""
+    in_quote = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            in_quote = not in_quote
+        elif ch == "#" and not in_quote:
+            return line[:i].rstrip(), line[i + 1:].strip()
+    return line.rstrip(), ""
+
+
+def split_values(text: str) -> list[str]:
+    """Tokens of a condition/action value; quoted strings keep inner spaces."""
+    return [m.group(1) if m.group(1) is not None else m.group(2) for m in _TOKEN_RE.finditer(text)]
+
+
+def parse_condition(key: str, rest: str, line: int) -> Condition:
+    op = ""
+    body = rest
+    for candidate in OPERATORS:
+        if rest.startswith(candidate):
+            op, body = candidate, rest[len(candidate):].lstrip()
+            break
+    return Condition(key, op, split_values(body), rest, line)
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[Block]:
+    """Stream blocks from lines (line endings kept, as from a file object or
+    `text.splitlines(keepends=True)`); offsets count characters of those lines."""
+    block = None
+    comments = []
+    offset = 0
+    index = 0
+    for lineno, raw in enumerate(lines, 1):
+        start = offset
+        offset += len(raw)
+        stripped = raw.strip()
+        if not stripped:
+            continue
+        if stripped.startswith("#"):
+            comments.append(stripped[1:].strip())
+            continue
+        code, trailing = strip_comment(stripped) if "#" in stripped else (stripped, "")
+        key, _, rest = code.partition(" ")
+        rest = rest.strip()
+        if key in BLOCK_COMMANDS:
+            if block is not None:
+                yield block
+            lead = len(raw) - len(raw.lstrip())
+            type_m, tier_m = _TYPE_RE.search(trailing), _TIER_RE.search(trailing)
+            block = Block(index=index, command=key, comment=trailing,
+                          type=type_m.group(1) if type_m else None,
+                          tier=tier_m.group(1) if tier_m else None,
+                          preceding_comment=comments[-1] if comments else "", comments=comments,
+                          line=lineno, start=start + lead,
+                          end=offset)
+            index += 1
+            comments = []
+            continue
+        if block is None:
+            continue  # stray line before the first block
+        block.end = offset
+        if key == "Continue":
+            block.continues = True
+        elif key.startswith(ACTION_PREFIXES):
+            block.actions.append(Action(key, split_values(rest), rest, lineno))
+        else:
+            block.conditions.append(parse_condition(key, rest, lineno))
+    if block is not None:
+        yield block
+
+
+def banner(comment: str) -> tuple[int, str] | None:
+    """(index, text) of a generate.py `#==[NNNNN]-text==` banner comment."""
+    m = _BANNER_RE.match(comment)
+    return (int(m.group(1)), m.group(2)) if m else None
+
+
+def generated_labels(blocks: Iterable[Block]) -> list[tuple[str, str] | None]:
+    """(category, label) of every block of a generate.py filter, index-free.
+
+    The label is the block's own banner; the category is the per-file banner
+    generate.py writes before a file's first block (the banner preceding a
+    block's own one). None for blocks without a banner (footer, foreign filters).
+    """
+    labels, category = [], ""
+    for block in blocks:
+        found = [b for b in map(banner, block.comments) if b]
+        if len(found) > 1:
+            category = found[-2][1]
+        labels.append((category, found[-1][1]) if found else None)
+    return labels
+
+
+def parse_filter(text: str) -> list[Block]:
+    return list(iter_blocks(text.splitlines(keepends=True)))
+
+
+def parse_file(path) -> list[Block]:
+    """Parse a .filter file (UTF-8, BOM tolerated) without loading it whole."""
+    with open(Path(path), "r", encoding="utf-8-sig", newline="") as f:
+        return list(iter_blocks(f))
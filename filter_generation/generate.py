@@ -3,8 +3,14 @@ import re
 import os
 import sys
 import argparse
+import hashlib
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve()))
+from filter_generation.data_model import Rule, load_category, load_mapping  # noqa: E402
 
 # ===========================
 # CONFIG
@@ -15,6 +21,10 @@ BASE_MAPPING_DIR = (PROJECT_ROOT / "filter_generation" / "data" / "base_mapping"
 THEME_FILE = (PROJECT_ROOT / "filter_generation" / "data" / "theme" / "sharket" / "sharket_theme.json").resolve()
 SOUND_MAP_FILE = (PROJECT_ROOT / "filter_generation" / "data" / "theme" / "sharket" / "Sharket_sound_map.json").resolve()
 OUTPUT_FILE = (PROJECT_ROOT / "filter_generation" / "complete_filter.filter").resolve()
+# Per-variant render cache for Campaign picker changes (see assemble_selection).
+CACHE_DIR = (PROJECT_ROOT / "filter_generation" / ".generate_cache").resolve()
+# Files under filter_generation/data the backend rewrites that are not generation inputs.
+DATA_RUNTIME = {"_import_backup", "_snapshot_index.json"}
 
 # Folder holding custom sound files (for sharket_sound_id)
 SOUND_FILE_PATH = Path("sound_files")
@@ -38,10 +48,27 @@ _args.add_argument("--language", default="ch", choices=["ch", "en"])
 # (parity-safe default). Shape: {weapons:[], armour_defense:[], vendor_bands:[],
 # minion_focused:bool, hide_unselected:bool, preset:str}. Mirrors filterGenerator.ts.
 _args.add_argument("--leveling-selection", default="{}")
+# Write somewhere other than complete_filter.filter (tooling that renders several
+# variants side by side, e.g. coverage.py). Python-only; no TS counterpart needed.
+_args.add_argument("--output", default=None)
+# Render every strictness level in one run: the soft filter is generated once and
+# the stricter levels are derived by patching the command line of gated blocks
+# (Show -> HIDE_CMD). Writes <output stem>_<level><suffix> per level. Python-only.
+_args.add_argument("--all-strictness", action="store_true")
+# Ignore (and rebuild) the Campaign picker render cache.
+_args.add_argument("--no-cache", action="store_true")
+# Render category files in N worker processes (0 = one per core). Block numbering
+# is planned up front, so the output is byte-identical to the serial default.
+_args.add_argument("--jobs", type=int, default=1)
 _parsed = _args.parse_known_args()[0]
+if _parsed.output:
+    OUTPUT_FILE = Path(_parsed.output).resolve()
+ALL_STRICTNESS = _parsed.all_strictness
+USE_CACHE = not _parsed.no_cache
+JOBS = _parsed.jobs if _parsed.jobs > 0 else (os.cpu_count() or 1)
 MODE = _parsed.mode
 GAME_VERSION = _parsed.game_version
-STRICTNESS = _parsed.strictness
+STRICTNESS = "soft" if _parsed.all_strictness else _parsed.strictness
 STRICTNESS_IDX = STRICTNESS_LEVELS.index(STRICTNESS)
 HIDE_CMD = "Minimal" if MODE == "ruthless" else "Hide"
 # Value may be inline JSON, or "@path" to read the JSON from a file (avoids shell
@@ -73,6 +100,26 @@ def lv_picked(tier_entry):
     return False
 
 
+def lv_state(lv_group):
+    """How a campaign group tier renders under LEVELING_SELECTION: "show",
+    "hide" or None (omitted — consumes no block index).
+
+    Selection-centric ladder (mirrors filterGenerator.ts): group tiers (axis
+    weapon/armour — the T1 band layer + T2 class-wide rare layer) emit ONLY when
+    their key is picked in the Campaign picker; unpicked groups are omitted and
+    fall to the T3 safety net. 'aggressive' declutter tiers emit (as Hide) only
+    under hide_unselected, which also flips unpicked WEAPON groups to Hide
+    instead of omitting them. Strictness NEVER applies inside _campaign (see
+    CONTEXT.md)."""
+    axis = lv_group.get("axis")
+    hide_unselected = LEVELING_SELECTION.get("hide_unselected")
+    if axis == "aggressive":
+        return "hide" if hide_unselected else None
+    if lv_picked({"lv_group": lv_group}):
+        return "show"
+    return "hide" if axis == "weapon" and hide_unselected else None
+
+
 if GAME_VERSION == "poe2":
     print("[ERROR] POE2 filter generation is not yet supported.")
     sys.exit(1)
@@ -149,7 +196,7 @@ def resolve_sound(tier_entry, sound_map, override_sound=None):
             return f'CustomAlertSound "sound_files\\{win_path}" {vol}'
 
     # Handle the new sound_map structure (dict with basetype_sounds and class_sounds)
-    sb = tier_entry.get("sound", {})
+    sb = tier_entry.sound
     
     # Check if sound_map has tiered default IDs
     if sb.get("sharket_sound_id") and "class_sounds" in sound_map and sb["sharket_sound_id"] in sound_map["class_sounds"]:
@@ -172,15 +219,18 @@ def tier_num_from_label(label):
 def header_line(index, text):
     return f"\n#==[{index:05d}]-{text}=="
 
-def load_merged_theme():
-    # 1. Load Settings to find Base Theme
+def read_base_theme_name():
     settings_path = PROJECT_ROOT / "data" / "config" / "settings.json"
-    base_theme_name = "sharket"
     if settings_path.exists():
         try:
             settings = json.loads(settings_path.read_text(encoding="utf-8"))
-            base_theme_name = settings.get("base_theme", "sharket")
+            return settings.get("base_theme", "sharket")
         except: pass
+    return "sharket"
+
+def load_merged_theme():
+    # 1. Load Settings to find Base Theme
+    base_theme_name = read_base_theme_name()
     
     print(f"Using Base Theme: {base_theme_name}")
 
@@ -213,270 +263,410 @@ def load_merged_theme():
 
     return theme_data
 
-# ---------- MAIN ----------
-def generate_filter():
-    theme_data = load_merged_theme()
-    # SOUND_MAP_FILE is usually tied to Sharket currently, but ideally should follow theme or use a global map.
-    # For now, we assume Sound Map is consistent or handled by frontend overrides.
-    sound_map = json.loads(Path(SOUND_MAP_FILE).read_text(encoding="utf-8"))
-    
-    # Localized like the TS generator (filterGenerator.ts): ch by default, en under --language en.
-    cr_label = "自定义规则" if LANG == "ch" else "Custom Rules"
-    cr_desc = ("在此添加自定义规则将会覆盖所有过滤器设定."
-               if LANG == "ch" else "Add custom rules here to override all filter settings.")
-    overview = [
-        "#========================================",
-        "#  FILTER OVERVIEW",
-        "#========================================",
-        f"#  [00000] {cr_label}"
-    ]
-
-    out_lines = []
-    out_lines.append(header_line(0, cr_label))
-    out_lines.append(f"# {cr_desc}\n")
 
+# Category GENERATION order = explicit `_meta.gen_order` (ascending), then the
+# relative path. This is DECOUPLED from the nav display order (category_structure
+# order) on purpose: campaign carries gen_order -100 so it emits FIRST (first-match
+# wins during the acts) even though the nav shows it low (opened less often).
+# Absent field = 0. Tier order (tier_order) and rule order (rules array) are
+# authored in the editor and followed verbatim — the generator never reorders
+# blocks or rules. (Mirrors the sort in filterGenerator.ts — parity-guarded.)
+def _gen_order_key(p):
+    rel = p.relative_to(BASE_MAPPING_DIR).as_posix()
+    try:
+        gen_order = load_mapping(p, BASE_MAPPING_DIR).meta.get("gen_order", 0)
+    except (OSError, ValueError):
+        gen_order = 0
+    return (gen_order, rel)
+
+
+def plan_categories():
+    """Category files in generation order, each with the block numbering the
+    serial walk would give it: {rel_path, sub_counter, major} where major is
+    (major_counter, header_text) on the first file of a folder, else None.
+    Numbering only depends on this order and the mode exclusions, so files can
+    then be rendered independently (render_category)."""
+    jobs = []
     current_major_cat = ""
     major_counter = 0 # 10000, 20000...
     sub_counter = 0   # 11000, 12000...
-
-    # Category GENERATION order = explicit `_meta.gen_order` (ascending), then the
-    # relative path. This is DECOUPLED from the nav display order (category_structure
-    # order) on purpose: campaign carries gen_order -100 so it emits FIRST (first-match
-    # wins during the acts) even though the nav shows it low (opened less often).
-    # Absent field = 0. Tier order (tier_order) and rule order (rules array) are
-    # authored in the editor and followed verbatim — the generator never reorders
-    # blocks or rules. (Mirrors the sort in filterGenerator.ts — parity-guarded.)
-    def _order_key(p):
-        rel = p.relative_to(BASE_MAPPING_DIR).as_posix()
-        try:
-            gen_order = json.loads(p.read_text(encoding="utf-8")).get("_meta", {}).get("gen_order", 0)
-        except (OSError, ValueError):
-            gen_order = 0
-        return (gen_order, rel)
-
-    for map_file in sorted(BASE_MAPPING_DIR.rglob("*.json"), key=_order_key):
+    for map_file in sorted(BASE_MAPPING_DIR.rglob("*.json"), key=_gen_order_key):
         rel_path = map_file.relative_to(BASE_MAPPING_DIR)
-        tier_file = TIER_DEF_DIR / rel_path
-        
-        if not tier_file.exists():
+        if not (TIER_DEF_DIR / rel_path).exists():
             continue
-
-        tier_doc = json.loads(tier_file.read_text(encoding="utf-8"))
-        map_doc  = json.loads(map_file.read_text(encoding="utf-8"))
+        mapping = load_mapping(map_file, BASE_MAPPING_DIR)
 
         # Skip files excluded for current mode (e.g. Divination Cards in ruthless)
         # BEFORE any counter/header work, so excluded files consume no block
         # indices and a fully-excluded folder emits no header. (Mirrors the
         # early skip in filterGenerator.ts — parity-guarded in ruthless mode.)
-        if MODE in map_doc.get("_meta", {}).get("excluded_modes", []):
+        if MODE in mapping.excluded_modes:
             continue
 
-        # Extract Folder Name (First part of path)
-        folder = rel_path.parts[0]
-
         # --- Major Category Header ---
+        folder = rel_path.parts[0]
+        major = None
         if folder != current_major_cat:
             current_major_cat = folder
             major_counter += 10000
             sub_counter = major_counter # Reset sub counter base
-
-            # Localize folder name
             folder_localized = FOLDER_LOCALIZATION.get(folder, folder)
-            header_text = f"{folder_localized} {folder}" if LANG == "ch" else folder
-
-            out_lines.append(f"\n#===================================================================================================================")
-            out_lines.append(f"# [[{major_counter:05d}]] {header_text}")
-            out_lines.append(f"#===================================================================================================================")
-            overview.append(f"#  [{major_counter:05d}] {header_text}")
+            major = (major_counter, f"{folder_localized} {folder}" if LANG == "ch" else folder)
 
         # --- Sub Category (File) ---
         sub_counter += 1000
-        block_index = sub_counter # 11000 start
-
-        category_key = next((k for k in tier_doc if not k.startswith("//")), None)
-        if not category_key: continue
-        
-        category_data = tier_doc[category_key]
-        meta = category_data.get("_meta", {})
-        loc_en = meta.get("localization", {}).get("en", category_key)
-        
-        # Load Item Translations from Base Mapping (map_doc), NOT Tier Definition
-        map_meta = map_doc.get("_meta", {})
-        
-        # Generic Localization Loading
-        loc_data = map_meta.get("localization", {}).get(LANG, {})
-        
-        if isinstance(loc_data, dict):
-            # It's a dictionary of baseType -> translation. The class label now lives
-            # canonically in _meta.item_class (was the magic localization.ch.__class_name__ key).
-            loc_cat = map_meta.get("item_class", {}).get(LANG) or meta.get("localization", {}).get("ch", loc_en)
-            item_trans = loc_data # The whole dict is the translation map
+        jobs.append({"rel_path": rel_path, "sub_counter": sub_counter, "major": major})
+    return jobs
+
+
+def render_category(job, theme_data, sound_map):
+    """Render one category file of plan_categories(). Returns a record shaped
+    like generate_filter's (overview / out_lines / gated / lv_spans / lv_files,
+    indices local to the file), or None for a file without a category key."""
+    rel_path = job["rel_path"]
+    sub_counter = job["sub_counter"]
+    category = load_category(TIER_DEF_DIR / rel_path, TIER_DEF_DIR)
+    mapping_doc = load_mapping(BASE_MAPPING_DIR / rel_path, BASE_MAPPING_DIR)
+    folder = rel_path.parts[0] # Extract Folder Name (First part of path)
+    block_index = sub_counter # 11000 start
+    out_lines, gated, lv_spans, lv_files = [], [], [], []
+
+    category_key = category.key
+    if not category_key:
+        return None
+    
+    meta = category.meta
+    loc_en = meta.get("localization", {}).get("en", category_key)
+    
+    # Load Item Translations from Base Mapping (map_doc), NOT Tier Definition
+    map_meta = mapping_doc.meta
+    
+    # Generic Localization Loading
+    loc_data = map_meta.get("localization", {}).get(LANG, {})
+    
+    if isinstance(loc_data, dict):
+        # It's a dictionary of baseType -> translation. The class label now lives
+        # canonically in _meta.item_class (was the magic localization.ch.__class_name__ key).
+        loc_cat = map_meta.get("item_class", {}).get(LANG) or meta.get("localization", {}).get("ch", loc_en)
+        item_trans = loc_data # The whole dict is the translation map
+    else:
+        # It's a string (like 'en' usually is) or missing
+        loc_cat = loc_data if loc_data else loc_en
+        item_trans = {}
+    
+    item_class_raw = meta.get("item_class", category_key)
+    if isinstance(item_class_raw, dict):
+        # For filter syntax (Class "...") we MUST use English
+        item_class = item_class_raw.get("en", category_key)
+        # For comment/header we can use localized version
+        if isinstance(item_class_raw.get(LANG), str):
+             item_class_header = item_class_raw.get(LANG)
         else:
-            # It's a string (like 'en' usually is) or missing
-            loc_cat = loc_data if loc_data else loc_en
-            item_trans = {}
-        
-        item_class_raw = meta.get("item_class", category_key)
-        if isinstance(item_class_raw, dict):
-            # For filter syntax (Class "...") we MUST use English
-            item_class = item_class_raw.get("en", category_key)
-            # For comment/header we can use localized version
-            if isinstance(item_class_raw.get(LANG), str):
-                 item_class_header = item_class_raw.get(LANG)
-            else:
-                 item_class_header = item_class
+             item_class_header = item_class
+    else:
+        item_class = item_class_raw
+        item_class_header = item_class
+
+    theme_ref = theme_data.get(category.theme_category, theme_data.get("Default", {}))
+
+    # --- Construct Full Hierarchy Header ---
+    breadcrumbs = []
+    for i, p in enumerate(rel_path.parts):
+        if i == len(rel_path.parts) - 1:
+            # Last part is file -> use Category Name from JSON
+            breadcrumbs.append(f"{loc_cat} {loc_en}")
         else:
-            item_class = item_class_raw
-            item_class_header = item_class
-
-        theme_cat_key = meta.get("theme_category", category_key)
-        theme_ref = theme_data.get(theme_cat_key, theme_data.get("Default", {}))
-
-        # --- Construct Full Hierarchy Header ---
-        breadcrumbs = []
-        for i, p in enumerate(rel_path.parts):
-            if i == len(rel_path.parts) - 1:
-                # Last part is file -> use Category Name from JSON
-                breadcrumbs.append(f"{loc_cat} {loc_en}")
-            else:
-                # Folder -> use FOLDER_LOCALIZATION
-                loc_folder = FOLDER_LOCALIZATION.get(p, p)
-                breadcrumbs.append(f"{loc_folder} {p}")
-        
-        full_header_text = " - ".join(breadcrumbs)
-
-        # Add Subcategory to Overview
-        overview.append(f"#    [{sub_counter:05d}] {full_header_text}")
-        out_lines.append(header_line(sub_counter, full_header_text))
-
-        # Map items to their tiers
-        mapping = map_doc.get("mapping", {})
-        items_by_tier = defaultdict(list)
-        for item_name, t_val in mapping.items():
-            if isinstance(t_val, list):
-                for t in t_val:
-                    items_by_tier[t].append(item_name)
-            else:
-                items_by_tier[t_val].append(item_name)
-
-        # For underscore-prefix folders (_legacy, _campaign), mapping values may reference
-        # cross-category tier keys that don't exist in this tier_def.
-        # Remap all such items to the first non-hide tier defined in this tier_def.
-        if folder.startswith("_"):
-            valid_tier_keys = set(k for k in category_data if k.startswith("Tier"))
-            default_show_tier = next(
-                (t for t in meta.get("tier_order", [])
-                 if t in valid_tier_keys and not category_data[t].get("is_hide_tier", False)),
-                None
-            )
-            if default_show_tier:
-                remapped = defaultdict(list)
-                for t_key, item_list in items_by_tier.items():
-                    if t_key in valid_tier_keys:
-                        remapped[t_key].extend(item_list)
-                    else:
-                        remapped[default_show_tier].extend(item_list)
-                items_by_tier = remapped
+            # Folder -> use FOLDER_LOCALIZATION
+            loc_folder = FOLDER_LOCALIZATION.get(p, p)
+            breadcrumbs.append(f"{loc_folder} {p}")
+    
+    full_header_text = " - ".join(breadcrumbs)
+
+    # Add Subcategory to Overview
+    overview = [f"#    [{sub_counter:05d}] {full_header_text}"]
+    out_lines = [header_line(sub_counter, full_header_text)]
+
+    # Map items to their tiers
+    items_by_tier = defaultdict(list)
+    for item_name, item_tiers in mapping_doc.tiers.items():
+        for t in item_tiers:
+            items_by_tier[t].append(item_name)
+
+    # For underscore-prefix folders (_legacy, _campaign), mapping values may reference
+    # cross-category tier keys that don't exist in this tier_def.
+    # Remap all such items to the first non-hide tier defined in this tier_def.
+    if folder.startswith("_"):
+        valid_tier_keys = set(k for k in category.tiers if k.startswith("Tier"))
+        default_show_tier = next(
+            (t for t in category.tier_order
+             if t in valid_tier_keys and not category.tiers[t].is_hide),
+            None
+        )
+        if default_show_tier:
+            remapped = defaultdict(list)
+            for t_key, item_list in items_by_tier.items():
+                if t_key in valid_tier_keys:
+                    remapped[t_key].extend(item_list)
+                else:
+                    remapped[default_show_tier].extend(item_list)
+            items_by_tier = remapped
 
-        # Determine Tier Order
-        tier_order = meta.get("tier_order", [])
-        if not tier_order:
-            tier_order = sorted(items_by_tier.keys(), key=tier_num_from_label)
-        
-        used_tiers = set(items_by_tier.keys())
-        for t in used_tiers:
-            if t not in tier_order:
-                tier_order.append(t)
+    # Determine Tier Order
+    tier_order = list(category.tier_order)
+    if not tier_order:
+        tier_order = sorted(items_by_tier.keys(), key=tier_num_from_label)
+    
+    used_tiers = set(items_by_tier.keys())
+    for t in used_tiers:
+        if t not in tier_order:
+            tier_order.append(t)
+
+    # The rules array is shared by every tier of the file, so auto-sound rules
+    # injected for one tier stay visible to the next; a file without a `rules`
+    # key starts each tier from an empty list. (Same as the generator always did.)
+    shared_rules = list(mapping_doc.rules) if mapping_doc.has_rules else None
+    block_counter = 0
+    file_start = len(out_lines)
+    lv_open = None  # (out_lines start, lv_group) of the group tier being rendered
+    
+    for t_lbl in tier_order:
+        if lv_open:
+            lv_spans.append((lv_open[0], len(out_lines), lv_open[1]))
+            lv_open = None
+        if t_lbl not in category.tiers: continue
 
-        block_counter = 0
-        
-        for t_lbl in tier_order:
-            if t_lbl not in category_data: continue
-
-            items = items_by_tier.get(t_lbl, [])
-            tier_entry = category_data[t_lbl]
-
-            # Skip tiers excluded for current mode (e.g. Chaos Recipe in ruthless)
-            if MODE in tier_entry.get("excluded_modes", []):
-                continue
-
-            # Campaign module gate (selection-centric ladder, mirrors
-            # filterGenerator.ts): group tiers (axis weapon/armour — the T1
-            # band layer + T2 class-wide rare layer) emit ONLY when their key
-            # is picked in the Campaign picker; unpicked groups are omitted and
-            # fall to the T3 safety net. 'aggressive' declutter tiers emit (as
-            # Hide) only under hide_unselected, which also flips unpicked
-            # WEAPON groups to Hide instead of omitting them. Strictness NEVER
-            # applies inside _campaign (see CONTEXT.md).
-            lv_axis = (tier_entry.get("lv_group") or {}).get("axis")
-            lv_hide = False
-            if lv_axis == "aggressive":
-                if LEVELING_SELECTION.get("hide_unselected"):
-                    lv_hide = True
-                else:
-                    continue
-            elif lv_axis in ("weapon", "armour"):
-                if not lv_picked(tier_entry):
-                    if lv_axis == "weapon" and LEVELING_SELECTION.get("hide_unselected"):
-                        lv_hide = True
-                    else:
-                        continue
+        items = items_by_tier.get(t_lbl, [])
+        tier_entry = category.tiers[t_lbl]
 
-            is_hide = tier_entry.get("is_hide_tier", False)
-            # Strictness gate: flip a normally-shown tier to Hide once the selected
-            # strictness reaches its threshold. Mode-independent — HIDE_CMD already
-            # resolves to "Minimal" under ruthless. (Mirrors filterGenerator.ts.)
-            hide_at = tier_entry.get("hide_at_strictness")
-            if hide_at is not None and STRICTNESS_IDX >= hide_at:
-                is_hide = True
-            if lv_hide:
-                is_hide = True
-            tnum = tier_num_from_label(t_lbl)
-            # Honor explicit theme.Tier for tiers with non-standard label names (e.g. "Bows Progression")
-            theme_tier_override = tier_entry.get("theme", {}).get("Tier")
-            if theme_tier_override is not None:
-                tnum = theme_tier_override
-            ttheme = theme_ref.get(f"Tier {tnum}", {})
+        # Skip tiers excluded for current mode (e.g. Chaos Recipe in ruthless)
+        if MODE in tier_entry.excluded_modes:
+            continue
+
+        # Campaign module gate: every group tier (axis weapon/armour/aggressive)
+        # is rendered here as if picked and recorded as a span; the picker
+        # selection (lv_state) is applied afterwards by assemble_selection,
+        # so a cached render serves every selection.
+        lv_group = tier_entry.lv_group
+        if lv_group.get("axis") in ("aggressive", "weapon", "armour"):
+            lv_open = (len(out_lines), lv_group)
+
+        is_hide = tier_entry.is_hide
+        # Strictness gate: flip a normally-shown tier to Hide once the selected
+        # strictness reaches its threshold. Mode-independent — HIDE_CMD already
+        # resolves to "Minimal" under ruthless. (Mirrors filterGenerator.ts.)
+        hide_at = tier_entry.hide_at
+        if hide_at is not None and STRICTNESS_IDX >= hide_at:
+            is_hide = True
+        # Level from which this tier's shown blocks flip (--all-strictness patching).
+        gate_at = hide_at if hide_at is not None and not is_hide else None
+        tnum = tier_num_from_label(t_lbl)
+        # Honor explicit theme.Tier for tiers with non-standard label names (e.g. "Bows Progression")
+        if tier_entry.theme_tier is not None:
+            tnum = tier_entry.theme_tier
+        ttheme = theme_ref.get(f"Tier {tnum}", {})
+        base_text_col = parse_rgba(ttheme.get("TextColor"))
+        base_border_col = parse_rgba(ttheme.get("BorderColor"))
+        base_background_col = parse_rgba(ttheme.get("BackgroundColor"), "0 0 0 255")
+        base_play_eff = ttheme.get("PlayEffect")
+        base_mini_icon = ttheme.get("MinimapIcon")
+
+        # --- Class-Condition Mode (e.g. _campaign/Armour.json) ---
+        if tier_entry.class_condition:
+            if not tier_entry.conditions:
+                continue  # No conditions defined — skip this tier
+            # Use theme tier from tier_entry directly (label-based tnum is unreliable for custom keys)
+            theme_tnum = tier_entry.theme_tier if tier_entry.theme_tier is not None else tnum
+            ttheme = theme_ref.get(f"Tier {theme_tnum}", ttheme)
             base_text_col = parse_rgba(ttheme.get("TextColor"))
             base_border_col = parse_rgba(ttheme.get("BorderColor"))
             base_background_col = parse_rgba(ttheme.get("BackgroundColor"), "0 0 0 255")
             base_play_eff = ttheme.get("PlayEffect")
             base_mini_icon = ttheme.get("MinimapIcon")
+            block_index += 1
+            tier_display = tier_entry.label(LANG) or t_lbl
+            out_lines.append(f"\n#==[{block_index:05d}]- {item_class_header} -{tier_display} {loc_cat} - Class Condition==")
+            cmd = HIDE_CMD if is_hide else "Show"
+            block_lines = [f'{cmd}']
+            # Pre-split conditions (list = repeated AND lines, RANGE = two lines).
+            block_lines.extend(f"    {line}" for line in tier_entry.condition_lines)
+            # Disabled/sentinel styles are OMITTED (see style_off) so the editor
+            # preview and the exported filter agree. (Mirrors filterGenerator.ts.)
+            block_lines.append(f'    SetFontSize {ttheme.get("FontSize", DEFAULT_FONT_SIZE)}')
+            if not style_off(ttheme.get("TextColor")):
+                block_lines.append(f'    SetTextColor {base_text_col}')
+            if not style_off(ttheme.get("BorderColor")):
+                block_lines.append(f'    SetBorderColor {base_border_col}')
+            if not style_off(ttheme.get("BackgroundColor")):
+                block_lines.append(f'    SetBackgroundColor {base_background_col}')
+            sound_line = resolve_sound(tier_entry, sound_map)
+            if sound_line:
+                block_lines.append(f"    {sound_line}")
+            if base_play_eff and not style_off(base_play_eff):
+                block_lines.append(f"    PlayEffect {base_play_eff}")
+            if base_mini_icon and not style_off(base_mini_icon):
+                block_lines.append(f"    MinimapIcon {base_mini_icon}")
+            if gate_at is not None:
+                gated.append((len(out_lines), gate_at))
+            out_lines.append("\n".join(block_lines) + "\n")
+            continue  # Skip normal BaseType processing for this tier
+
+        all_rules = shared_rules if shared_rules is not None else []
+        
+        # --- AUTO-INJECT SOUND RULES FROM MAP ---
+        bt_sounds = sound_map.get("basetype_sounds", {})
+        for item_name in items:
+            if item_name in bt_sounds:
+                s_data = bt_sounds[item_name]
+                # Check if a rule already targets this item specifically
+                already_handled = any(item_name in r.targets for r in all_rules)
+                if not already_handled:
+                    all_rules.append(Rule.from_dict(-1, {
+                        "targets": [item_name],
+                        "overrides": { "PlayAlertSound": [s_data["file"], s_data["volume"]] },
+                        "comment": f"__AUTO_SOUND__:{item_name}"
+                    }))
+        # -----------------------------------------
+
+        pending_items = set(items)
+        
+        rule_counter = 0
+        for rule in all_rules:
+            if rule.disabled: continue
+            
+            rule_targets = rule.targets
+            rule_tier_override = rule.tier
+            apply_to_tier = rule.apply_to_tier
+            
+            rule_matches = []
+
+            if rule_tier_override:
+                if rule_tier_override == t_lbl:
+                    if apply_to_tier:
+                        rule_matches = list(pending_items)
+                    elif rule_targets:
+                        # Strict instruction: If rule targets this tier, pull it in!
+                        rule_matches = rule_targets
+                    else:
+                        continue
+                else:
+                    # Rule is for another tier. Ignore it in this tier loop.
+                    continue
+            else:
+                # No tier override: only applies to items native to this tier loop
+                if rule_targets:
+                    rule_matches = [item for item in rule_targets if item in pending_items]
+                    if not rule_matches: continue
+                else:
+                    continue
+            
+            if not rule_matches: continue
+
+            exact_group = []
+            partial_group = []
+            for m in rule_matches:
+                mode = rule.match_mode(m)
+                if mode == "exact": exact_group.append(m)
+                else: partial_group.append(m)
+
+            for subgroup, mode_label, is_strict in [(exact_group, "Exact", True), (partial_group, "Partial", False)]:
+                if not subgroup: continue
+                
+                block_index += 1
+                
+                r_over = rule.overrides
+                
+                raw_comment = rule.comment
+                if raw_comment.startswith("__AUTO_SOUND__:"):
+                    # Implicit Auto-Sound Rule
+                    item_key = raw_comment.split(":", 1)[1].strip()
+                    item_name_local = item_trans.get(item_key, item_key)
+                    
+                    rule_part = f"{tr('Auto-Sound')}：{item_name_local}"
+                else:
+                    # Explicit User Rule
+                    rule_counter += 1
+                    # Localizable rule name: rule.localization[lang] -> comment -> "Rule"
+                    rule_name = rule.localization.get(LANG) or raw_comment or tr('Rule')
+                    rule_part = f"#{rule_counter} {rule_name}"
+
+                final_mode = tr(mode_label)
+                tier_display_r = tier_entry.label(LANG) or f"Tier {tnum}"
+                out_lines.append(f"\n#==[{block_index:05d}]- {item_class_header} -{tier_display_r} {loc_cat} - {rule_part} - {final_mode}==")
+                
+                joined = '" "'.join(subgroup)
+                cmd = HIDE_CMD if is_hide else "Show"
+                bt_operator = " == " if is_strict else " "
+                
+                block_lines = [
+                    f'{cmd}',
+                    f'    BaseType{bt_operator}"{joined}"'
+                ]
+                
+                # Extra rule conditions (a short RANGE is dropped), then raw lines.
+                block_lines.extend(f"    {line}" for line in rule.condition_lines)
+                block_lines.extend(f"    {line}" for line in rule.raw_lines)
+
+                # Effective raw value = the override when present, else the theme
+                # value; disabled/sentinel values omit the line (see style_off).
+                block_lines.append(f'    SetFontSize {r_over.get("FontSize", ttheme.get("FontSize", DEFAULT_FONT_SIZE))}')
+                r_text_raw = r_over["TextColor"] if "TextColor" in r_over else ttheme.get("TextColor")
+                if not style_off(r_text_raw):
+                    block_lines.append(f'    SetTextColor {parse_rgba(r_over.get("TextColor"), base_text_col)}')
+                r_border_raw = r_over["BorderColor"] if "BorderColor" in r_over else ttheme.get("BorderColor")
+                if not style_off(r_border_raw):
+                    block_lines.append(f'    SetBorderColor {parse_rgba(r_over.get("BorderColor"), base_border_col)}')
+                r_bg_raw = r_over["BackgroundColor"] if "BackgroundColor" in r_over else ttheme.get("BackgroundColor")
+                if not style_off(r_bg_raw):
+                    block_lines.append(f'    SetBackgroundColor {parse_rgba(r_over.get("BackgroundColor"), base_background_col)}')
+
+                sound_line = resolve_sound(tier_entry, sound_map, r_over.get("PlayAlertSound"))
+                if sound_line:  block_lines.append(f"    {sound_line}")
+                r_eff = r_over.get("PlayEffect", base_play_eff)
+                if r_eff and not style_off(r_eff): block_lines.append(f"    PlayEffect {r_eff}")
+                r_icon = r_over.get("MinimapIcon", base_mini_icon)
+                if r_icon and not style_off(r_icon): block_lines.append(f"    MinimapIcon {r_icon}")
+                
+                if gate_at is not None:
+                    gated.append((len(out_lines), gate_at))
+                out_lines.append("\n".join(block_lines) + "\n")
+
+            for m in rule_matches:
+                pending_items.discard(m)
+
+        # 3. Base Block for Remaining Items
+        if pending_items:
+            match_modes = category.match_modes
+            
+            exact_pending = []
+            partial_pending = []
+            for item in sorted(list(pending_items)):
+                if match_modes.get(item, "exact") == "exact":
+                    exact_pending.append(item)
+                else:
+                    partial_pending.append(item)
 
-            # --- Class-Condition Mode (e.g. _campaign/Armour.json) ---
-            if tier_entry.get("class_condition"):
-                tier_conditions = tier_entry.get("conditions", {})
-                if not tier_conditions:
-                    continue  # No conditions defined — skip this tier
-                # Use theme tier from tier_entry directly (label-based tnum is unreliable for custom keys)
-                theme_tnum = tier_entry.get("theme", {}).get("Tier", tnum)
-                ttheme = theme_ref.get(f"Tier {theme_tnum}", ttheme)
-                base_text_col = parse_rgba(ttheme.get("TextColor"))
-                base_border_col = parse_rgba(ttheme.get("BorderColor"))
-                base_background_col = parse_rgba(ttheme.get("BackgroundColor"), "0 0 0 255")
-                base_play_eff = ttheme.get("PlayEffect")
-                base_mini_icon = ttheme.get("MinimapIcon")
+            for subgroup, mode_label, is_strict in [(exact_pending, "Exact", True), (partial_pending, "Partial", False)]:
+                if not subgroup: continue
+                
                 block_index += 1
-                tier_display = tier_entry.get("localization", {}).get(LANG) or tier_entry.get("localization", {}).get("en") or t_lbl
-                out_lines.append(f"\n#==[{block_index:05d}]- {item_class_header} -{tier_display} {loc_cat} - Class Condition==")
+                final_mode = tr(mode_label)
+                base_label = tr("Base")
+                tier_display = tier_entry.label(LANG) or f"Tier {tnum}"
+                out_lines.append(f"\n#==[{block_index:05d}]- {item_class_header} -{tier_display} {loc_cat} - {base_label} - {final_mode}==")
+                
+                joined = '" "'.join(subgroup)
                 cmd = HIDE_CMD if is_hide else "Show"
-                block_lines = [f'{cmd}']
-                for key, val in tier_conditions.items():
-                    if isinstance(val, list):
-                        # Repeated condition lines (AND), e.g. two HasInfluence lines
-                        for v in val:
-                            block_lines.append(f"    {key} {v}")
-                    elif val.startswith("RANGE "):
-                        parts = val.split()
-                        block_lines.append(f"    {key} {parts[1]} {parts[2]}")
-                        block_lines.append(f"    {key} {parts[3]} {parts[4]}")
-                    elif key == "Rarity":
-                        clean_val = val[2:].strip() if val.strip().startswith("==") else val
-                        block_lines.append(f"    {key} {clean_val}")
-                    else:
-                        block_lines.append(f"    {key} {val}")
-                # Disabled/sentinel styles are OMITTED (see style_off) so the editor
-                # preview and the exported filter agree. (Mirrors filterGenerator.ts.)
+                bt_operator = " == " if is_strict else " "
+                
+                block_lines = [
+                    f'{cmd}',
+                    f'    BaseType{bt_operator}"{joined}"',
+                ]
+
+                # Emit tier-level conditions (e.g. ItemLevel, Rarity, DropLevel)
+                block_lines.extend(f"    {line}" for line in tier_entry.condition_lines)
+
+                # Disabled/sentinel styles are OMITTED (see style_off).
                 block_lines.append(f'    SetFontSize {ttheme.get("FontSize", DEFAULT_FONT_SIZE)}')
                 if not style_off(ttheme.get("TextColor")):
                     block_lines.append(f'    SetTextColor {base_text_col}')
@@ -484,218 +674,83 @@ def generate_filter():
                     block_lines.append(f'    SetBorderColor {base_border_col}')
                 if not style_off(ttheme.get("BackgroundColor")):
                     block_lines.append(f'    SetBackgroundColor {base_background_col}')
+
                 sound_line = resolve_sound(tier_entry, sound_map)
-                if sound_line:
-                    block_lines.append(f"    {sound_line}")
-                if base_play_eff and not style_off(base_play_eff):
-                    block_lines.append(f"    PlayEffect {base_play_eff}")
-                if base_mini_icon and not style_off(base_mini_icon):
-                    block_lines.append(f"    MinimapIcon {base_mini_icon}")
+                if sound_line:  block_lines.append(f"    {sound_line}")
+                if base_play_eff and not style_off(base_play_eff): block_lines.append(f"    PlayEffect {base_play_eff}")
+                if base_mini_icon and not style_off(base_mini_icon): block_lines.append(f"    MinimapIcon {base_mini_icon}")
+                
+                if gate_at is not None:
+                    gated.append((len(out_lines), gate_at))
                 out_lines.append("\n".join(block_lines) + "\n")
-                continue  # Skip normal BaseType processing for this tier
 
-            all_rules = map_doc.get("rules", [])
-            
-            # --- AUTO-INJECT SOUND RULES FROM MAP ---
-            bt_sounds = sound_map.get("basetype_sounds", {})
-            for item_name in items:
-                if item_name in bt_sounds:
-                    s_data = bt_sounds[item_name]
-                    # Check if a rule already targets this item specifically
-                    already_handled = any(item_name in r.get("targets", []) for r in all_rules)
-                    if not already_handled:
-                        all_rules.append({
-                            "targets": [item_name],
-                            "overrides": { "PlayAlertSound": [s_data["file"], s_data["volume"]] },
-                            "comment": f"__AUTO_SOUND__:{item_name}"
-                        })
-            # -----------------------------------------
-
-            pending_items = set(items)
-            
-            rule_counter = 0
-            for rule in all_rules:
-                if rule.get("disabled"): continue
-                
-                rule_targets = rule.get("targets", [])
-                rule_tier_override = rule.get("overrides", {}).get("Tier")
-                apply_to_tier = rule.get("applyToTier", False)
-                match_modes = rule.get("targetMatchModes", {})
-                
-                rule_matches = []
-
-                if rule_tier_override:
-                    if rule_tier_override == t_lbl:
-                        if apply_to_tier:
-                            rule_matches = list(pending_items)
-                        elif rule_targets:
-                            # Strict instruction: If rule targets this tier, pull it in!
-                            rule_matches = rule_targets
-                        else:
-                            continue
-                    else:
-                        # Rule is for another tier. Ignore it in this tier loop.
-                        continue
-                else:
-                    # No tier override: only applies to items native to this tier loop
-                    if rule_targets:
-                        rule_matches = [item for item in rule_targets if item in pending_items]
-                        if not rule_matches: continue
-                    else:
-                        continue
-                
-                if not rule_matches: continue
+    if lv_open:
+        lv_spans.append((lv_open[0], len(out_lines), lv_open[1]))
+    if lv_spans:
+        lv_files.append((file_start, len(out_lines), sub_counter))
+    return {"overview": overview, "out_lines": out_lines, "gated": gated,
+            "lv_spans": lv_spans, "lv_files": lv_files}
 
-                exact_group = []
-                partial_group = []
-                for m in rule_matches:
-                    mode = match_modes.get(m, "exact")
-                    if mode == "exact": exact_group.append(m)
-                    else: partial_group.append(m)
 
-                for subgroup, mode_label, is_strict in [(exact_group, "Exact", True), (partial_group, "Partial", False)]:
-                    if not subgroup: continue
-                    
-                    block_index += 1
-                    
-                    r_over = rule.get("overrides", {})
-                    
-                    raw_comment = rule.get('comment', '')
-                    if raw_comment.startswith("__AUTO_SOUND__:"):
-                        # Implicit Auto-Sound Rule
-                        item_key = raw_comment.split(":", 1)[1].strip()
-                        item_name_local = item_trans.get(item_key, item_key)
-                        
-                        rule_part = f"{tr('Auto-Sound')}：{item_name_local}"
-                    else:
-                        # Explicit User Rule
-                        rule_counter += 1
-                        # Localizable rule name: rule.localization[lang] -> comment -> "Rule"
-                        rule_name = rule.get("localization", {}).get(LANG) or raw_comment or tr('Rule')
-                        rule_part = f"#{rule_counter} {rule_name}"
-
-                    final_mode = tr(mode_label)
-                    tier_display_r = tier_entry.get("localization", {}).get(LANG) or tier_entry.get("localization", {}).get("en") or f"Tier {tnum}"
-                    out_lines.append(f"\n#==[{block_index:05d}]- {item_class_header} -{tier_display_r} {loc_cat} - {rule_part} - {final_mode}==")
-                    
-                    joined = '" "'.join(subgroup)
-                    cmd = HIDE_CMD if is_hide else "Show"
-                    bt_operator = " == " if is_strict else " "
-                    
-                    block_lines = [
-                        f'{cmd}',
-                        f'    BaseType{bt_operator}"{joined}"'
-                    ]
-                    
-                    extra_conditions = rule.get("conditions")
-                    if extra_conditions:
-                        for key, val in extra_conditions.items():
-                            if isinstance(val, list):
-                                # Repeated condition lines (AND), e.g. two HasInfluence lines
-                                for v in val:
-                                    block_lines.append(f"    {key} {v}")
-                            elif val.startswith("RANGE "):
-                                parts = val.split(" ")
-                                if len(parts) >= 5:
-                                    block_lines.append(f"    {key} {parts[1]} {parts[2]}")
-                                    block_lines.append(f"    {key} {parts[3]} {parts[4]}")
-                            elif key == "Rarity":
-                                clean_val = val[2:].strip() if val.strip().startswith("==") else val
-                                block_lines.append(f"    {key} {clean_val}")
-                            else:
-                                block_lines.append(f"    {key} {val}")
-
-                    if rule.get("raw"):
-                        for r_line in rule.get("raw").split('\n'):
-                            if r_line.strip(): block_lines.append(f"    {r_line.strip()}")
-
-                    # Effective raw value = the override when present, else the theme
-                    # value; disabled/sentinel values omit the line (see style_off).
-                    block_lines.append(f'    SetFontSize {r_over.get("FontSize", ttheme.get("FontSize", DEFAULT_FONT_SIZE))}')
-                    r_text_raw = r_over["TextColor"] if "TextColor" in r_over else ttheme.get("TextColor")
-                    if not style_off(r_text_raw):
-                        block_lines.append(f'    SetTextColor {parse_rgba(r_over.get("TextColor"), base_text_col)}')
-                    r_border_raw = r_over["BorderColor"] if "BorderColor" in r_over else ttheme.get("BorderColor")
-                    if not style_off(r_border_raw):
-                        block_lines.append(f'    SetBorderColor {parse_rgba(r_over.get("BorderColor"), base_border_col)}')
-                    r_bg_raw = r_over["BackgroundColor"] if "BackgroundColor" in r_over else ttheme.get("BackgroundColor")
-                    if not style_off(r_bg_raw):
-                        block_lines.append(f'    SetBackgroundColor {parse_rgba(r_over.get("BackgroundColor"), base_background_col)}')
-
-                    sound_line = resolve_sound(tier_entry, sound_map, r_over.get("PlayAlertSound"))
-                    if sound_line:  block_lines.append(f"    {sound_line}")
-                    r_eff = r_over.get("PlayEffect", base_play_eff)
-                    if r_eff and not style_off(r_eff): block_lines.append(f"    PlayEffect {r_eff}")
-                    r_icon = r_over.get("MinimapIcon", base_mini_icon)
-                    if r_icon and not style_off(r_icon): block_lines.append(f"    MinimapIcon {r_icon}")
-                    
-                    out_lines.append("\n".join(block_lines) + "\n")
+def render_categories(jobs, theme_data, sound_map):
+    """render_category over every job, in job order. With JOBS > 1 the files
+    are rendered in a process pool; numbering is fixed by the plan, so the
+    concatenation is byte-identical to the serial render."""
+    if JOBS <= 1 or len(jobs) < 2:
+        return [render_category(job, theme_data, sound_map) for job in jobs]
+    with ProcessPoolExecutor(max_workers=JOBS) as pool:
+        return list(pool.map(render_category, jobs, repeat(theme_data), repeat(sound_map),
+                             chunksize=max(1, len(jobs) // (JOBS * 4))))
 
-                for m in rule_matches:
-                    pending_items.discard(m)
 
-            # 3. Base Block for Remaining Items
-            if pending_items:
-                match_modes = meta.get("match_modes", {})
-                
-                exact_pending = []
-                partial_pending = []
-                for item in sorted(list(pending_items)):
-                    if match_modes.get(item, "exact") == "exact":
-                        exact_pending.append(item)
-                    else:
-                        partial_pending.append(item)
+# ---------- MAIN ----------
+def generate_filter():
+    fingerprint = render_fingerprint()
+    record = load_render_cache(fingerprint) if USE_CACHE else None
+    if record is not None:
+        print("Using cached render; Campaign picker selection applied.")
+        write_output(record)
+        return
 
-                for subgroup, mode_label, is_strict in [(exact_pending, "Exact", True), (partial_pending, "Partial", False)]:
-                    if not subgroup: continue
-                    
-                    block_index += 1
-                    final_mode = tr(mode_label)
-                    base_label = tr("Base")
-                    tier_display = tier_entry.get("localization", {}).get(LANG) or tier_entry.get("localization", {}).get("en") or f"Tier {tnum}"
-                    out_lines.append(f"\n#==[{block_index:05d}]- {item_class_header} -{tier_display} {loc_cat} - {base_label} - {final_mode}==")
-                    
-                    joined = '" "'.join(subgroup)
-                    cmd = HIDE_CMD if is_hide else "Show"
-                    bt_operator = " == " if is_strict else " "
-                    
-                    block_lines = [
-                        f'{cmd}',
-                        f'    BaseType{bt_operator}"{joined}"',
-                    ]
-
-                    # Emit tier-level conditions (e.g. ItemLevel, Rarity, DropLevel)
-                    tier_conditions = tier_entry.get("conditions", {})
-                    for key, val in tier_conditions.items():
-                        if isinstance(val, list):
-                            # Repeated condition lines (AND), e.g. two HasInfluence lines
-                            for v in val:
-                                block_lines.append(f"    {key} {v}")
-                        elif val.startswith("RANGE "):
-                            parts = val.split()
-                            block_lines.append(f"    {key} {parts[1]} {parts[2]}")
-                            block_lines.append(f"    {key} {parts[3]} {parts[4]}")
-                        elif key == "Rarity":
-                            clean_val = val[2:].strip() if val.strip().startswith("==") else val
-                            block_lines.append(f"    {key} {clean_val}")
-                        else:
-                            block_lines.append(f"    {key} {val}")
-
-                    # Disabled/sentinel styles are OMITTED (see style_off).
-                    block_lines.append(f'    SetFontSize {ttheme.get("FontSize", DEFAULT_FONT_SIZE)}')
-                    if not style_off(ttheme.get("TextColor")):
-                        block_lines.append(f'    SetTextColor {base_text_col}')
-                    if not style_off(ttheme.get("BorderColor")):
-                        block_lines.append(f'    SetBorderColor {base_border_col}')
-                    if not style_off(ttheme.get("BackgroundColor")):
-                        block_lines.append(f'    SetBackgroundColor {base_background_col}')
-
-                    sound_line = resolve_sound(tier_entry, sound_map)
-                    if sound_line:  block_lines.append(f"    {sound_line}")
-                    if base_play_eff and not style_off(base_play_eff): block_lines.append(f"    PlayEffect {base_play_eff}")
-                    if base_mini_icon and not style_off(base_mini_icon): block_lines.append(f"    MinimapIcon {base_mini_icon}")
-                    
-                    out_lines.append("\n".join(block_lines) + "\n")
+    theme_data = load_merged_theme()
+    # SOUND_MAP_FILE is usually tied to Sharket currently, but ideally should follow theme or use a global map.
+    # For now, we assume Sound Map is consistent or handled by frontend overrides.
+    sound_map = json.loads(Path(SOUND_MAP_FILE).read_text(encoding="utf-8"))
+    
+    # Localized like the TS generator (filterGenerator.ts): ch by default, en under --language en.
+    cr_label = "自定义规则" if LANG == "ch" else "Custom Rules"
+    cr_desc = ("在此添加自定义规则将会覆盖所有过滤器设定."
+               if LANG == "ch" else "Add custom rules here to override all filter settings.")
+    overview = [
+        "#========================================",
+        "#  FILTER OVERVIEW",
+        "#========================================",
+        f"#  [00000] {cr_label}"
+    ]
+
+    out_lines = []
+    gated = []  # (out_lines index, hide_at_strictness) of shown blocks a stricter level hides
+    lv_spans = []  # (start, end, lv_group): out_lines of each Campaign group tier
+    lv_files = []  # (start, end, sub_counter): category files holding group tiers
+    out_lines.append(header_line(0, cr_label))
+    out_lines.append(f"# {cr_desc}\n")
+
+    jobs = plan_categories()
+    for job, part in zip(jobs, render_categories(jobs, theme_data, sound_map)):
+        if job["major"]:
+            major_counter, header_text = job["major"]
+            out_lines.append(f"\n#===================================================================================================================")
+            out_lines.append(f"# [[{major_counter:05d}]] {header_text}")
+            out_lines.append(f"#===================================================================================================================")
+            overview.append(f"#  [{major_counter:05d}] {header_text}")
+        if part is None:
+            continue
+        base = len(out_lines)
+        overview.extend(part["overview"])
+        out_lines.extend(part["out_lines"])
+        gated.extend((base + k, hide_at) for k, hide_at in part["gated"])
+        lv_spans.extend((base + start, base + end, lv_group) for start, end, lv_group in part["lv_spans"])
+        lv_files.extend((base + start, base + end, sub) for start, end, sub in part["lv_files"])
 
     # Footer (data/footer.filter): appended verbatim at the very end —
     # the unknown-items catch-all block lives there (hand-maintained).
@@ -706,9 +761,128 @@ def generate_filter():
             out_lines.append("\n" + footer_text + "\n")
 
     overview.append("#========================================\n")
+    record = {"overview": overview, "out_lines": out_lines, "gated": gated,
+              "lv_spans": lv_spans, "lv_files": lv_files}
+    save_render_cache(fingerprint, record)
+    write_output(record)
+
+
+def _code_files():
+    """This script and every loaded filter_generation module (data_model,
+    data_pack, ...): rendering logic lives in them too."""
+    pkg_dir = PROJECT_ROOT / "filter_generation"
+    files = {Path(__file__).resolve()}
+    for mod in list(sys.modules.values()):
+        path = getattr(mod, "__file__", None)
+        if path and Path(path).resolve().parent == pkg_dir:
+            files.add(Path(path).resolve())
+    return sorted(files)
+
+
+def render_fingerprint():
+    """Hash of the options a render depends on (all but the picker selection)
+    and the stat of every input file — the tier/mapping tree, theme, overrides,
+    sound map, footer — plus the generator's code (_code_files)."""
+    h = hashlib.sha256(json.dumps([MODE, LANG, STRICTNESS, read_base_theme_name()]).encode("utf-8"))
+    data_dir = PROJECT_ROOT / "filter_generation" / "data"
+    for path in sorted(data_dir.rglob("*")) + _code_files():
+        if DATA_RUNTIME.intersection(path.parts) or not path.is_file():
+            continue
+        st = path.stat()
+        h.update(f"{path}\0{st.st_mtime_ns}\0{st.st_size}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _cache_file():
+    return CACHE_DIR / f"{MODE}_{LANG}_{STRICTNESS}.json"
+
+
+def load_render_cache(fingerprint):
+    try:
+        record = json.loads(_cache_file().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return record if record.get("fingerprint") == fingerprint else None
+
+
+def save_render_cache(fingerprint, record):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _cache_file().write_text(json.dumps({"fingerprint": fingerprint, **record}, ensure_ascii=False),
+                                 encoding="utf-8")
+    except OSError as e:
+        print(f"Warning: could not write render cache: {e}")
+
+
+def assemble_selection(record):
+    """Apply LEVELING_SELECTION to a render whose Campaign group tiers are all
+    in their picked state: omitted tiers are dropped, hidden ones get HIDE_CMD,
+    and block banners of the files holding group tiers are renumbered so
+    omitted blocks consume no index. Returns (out_lines, gated) — identical to
+    rendering with the selection applied inline."""
+    out_lines = record["out_lines"]
+    state_at = {}
+    for start, end, lv_group in record["lv_spans"]:
+        state = lv_state(lv_group)
+        for k in range(start, end):
+            state_at[k] = state
+    file_base = {}
+    for start, end, sub in record["lv_files"]:
+        for k in range(start, end):
+            file_base[k] = sub
+
+    kept, new_index, counters = [], {}, {}
+    for k, line in enumerate(out_lines):
+        state = state_at.get(k, "show")
+        if state is None:
+            continue
+        if state == "hide" and line.startswith("Show"):
+            line = HIDE_CMD + line[len("Show"):]
+        sub = file_base.get(k)
+        if sub is not None and line.startswith("\n#==["):
+            counters[sub] = counters.get(sub, sub) + 1
+            line = f"\n#==[{counters[sub]:05d}" + line[line.index("]"):]
+        new_index[k] = len(kept)
+        kept.append(line)
+    # A hidden group tier is no longer a strictness candidate (it is hidden already).
+    gated = [(new_index[k], h) for k, h in record["gated"] if state_at.get(k, "show") == "show"]
+    return kept, gated
+
+
+def write_output(record):
+    out_lines, gated = assemble_selection(record)
+    overview = record["overview"]
     final_text = "\n".join(overview) + "\n" + "\n".join(out_lines) + "\n"
+    if ALL_STRICTNESS:
+        write_strictness_variants(final_text, len("\n".join(overview)) + 1, out_lines, gated)
+        return
     OUTPUT_FILE.write_text(final_text, encoding="utf-8")
     print(f"[OK] Complete filter generated at {OUTPUT_FILE}")
 
+
+def write_strictness_variants(soft_text, body_start, out_lines, gated):
+    """Write every strictness level from the soft render. Each gated block
+    string starts with its "Show" command, so its span follows from the
+    out_lines offsets; a level replaces the spans whose hide_at_strictness it
+    reaches with HIDE_CMD — byte-identical to a direct --strictness render."""
+    starts, pos, k = [], body_start, 0
+    for idx, hide_at in gated:
+        while k < idx:
+            pos += len(out_lines[k]) + 1
+            k += 1
+        starts.append((pos, hide_at))
+    for level_idx, level in enumerate(STRICTNESS_LEVELS):
+        pieces, last = [], 0
+        for start, hide_at in starts:
+            if level_idx >= hide_at:
+                pieces.append(soft_text[last:start])
+                pieces.append(HIDE_CMD)
+                last = start + len("Show")
+        pieces.append(soft_text[last:])
+        path = OUTPUT_FILE.with_name(f"{OUTPUT_FILE.stem}_{level}{OUTPUT_FILE.suffix}")
+        path.write_text("".join(pieces), encoding="utf-8")
+    print(f"[OK] {len(STRICTNESS_LEVELS)} strictness levels ({len(gated)} gated blocks) generated "
+          f"at {OUTPUT_FILE.with_name(OUTPUT_FILE.stem + '_*' + OUTPUT_FILE.suffix)}")
+
 if __name__ == "__main__":
     generate_filter()
@@ -0,0 +1,191 @@
+"""Reference tables of data/from_ggpk, loaded one projected column set at a time.
+
+Callers name a table, a language and the columns they use; the rest of the
+table is never materialized:
+
+  * a `.datc64` table with a schema below that covers the columns is read
+    through datc64.Table (memory-mapped, only those columns decoded);
+  * otherwise the `.json` dump is parsed once and projected, and the
+    projection is saved under data/from_ggpk/.columns_cache/ so the next run
+    reads a few hundred KB instead of the multi-MB dump.
+
+Both are memoized per process, keyed by the source file's (mtime, size), so
+the backend's loaders and the parsing tools share one decode. Values follow
+the JSON dumps: a null row key is None, a column missing from a JSON row is
+None. The result is shared: treat it as read-only.
+
+stream() yields the same rows one at a time without memoizing anything: the
+.datc64 table row by row, or the .json dump parsed incrementally in fixed-size
+chunks, so an importer walking a whole table keeps memory bounded.
+
+Usage:
+    from filter_generation.ggpk_data import columns, rows
+    cols = columns("baseitemtypes", ["Id", "Name"], lang="ch")   # {"_rid": [...], "Id": [...], "Name": [...]}
+    for row in rows("words", ["Wordlist", "Text", "Text2"], lang="ch"): ...
+    for row in stream("baseitemtypes", ["Id", "Name"]): ...              # bounded memory
+"""
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation.datc64 import Column, Table  # noqa: E402
+
+GGPK_DIR = PROJECT_ROOT / "data" / "from_ggpk"
+CACHE_DIR = GGPK_DIR / ".columns_cache"
+LANG_DIRS = {"en": GGPK_DIR, "ch": GGPK_DIR / "ch_simplified"}
+
+# Fixed-row layouts of the tables the tools read (offsets checked against the
+# JSON dumps of the same patch). A table or column missing here is read from JSON.
+SCHEMAS = {
+    "baseitemtypes": {
+        "Id": Column(0, "string"), "ItemClassesKey": Column(8, "foreign"),
+        "Width": Column(24, "i32"), "Height": Column(28, "i32"),
+        "Name": Column(32, "string"), "DropLevel": Column(48, "i32"),
+    },
+    "itemclasses": {"Id": Column(0, "string"), "Name": Column(8, "string")},
+    "words": {"Wordlist": Column(0, "i32"), "Text": Column(4, "string"), "Text2": Column(48, "string")},
+    "componentattributerequirements": {
+        "BaseItemTypesKey": Column(0, "string"),
+        "ReqStr": Column(8, "i32"), "ReqDex": Column(12, "i32"), "ReqInt": Column(16, "i32"),
+    },
+    "currencyitems": {
+        "BaseItemTypesKey": Column(0, "foreign"), "StackSize": Column(16, "i32"),
+        "Description": Column(56, "string"),
+    },
+}
+
+_memo = {}  # (source path, columns) -> ((mtime_ns, size), columns dict)
+
+
+def source(table: str, names: list[str], lang: str = "en") -> Path:
+    """The file `columns()` reads for this request: the .datc64 table when it
+    exists and its schema covers every column, else the .json dump."""
+    folder = LANG_DIRS[lang]
+    binary = folder / f"{table}.datc64"
+    if binary.exists() and all(n in SCHEMAS.get(table, {}) for n in names):
+        return binary
+    return folder / f"{table}.json"
+
+
+def _stamp(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _from_binary(path: Path, table: str, names: list[str]) -> dict:
+    with Table(path, {n: SCHEMAS[table][n] for n in names}) as t:
+        out = {"_rid": list(range(len(t)))}
+        for n in names:
+            out[n] = t.column(n)
+    return out
+
+
+def _from_json(path: Path, names: list[str], stamp: tuple[int, int]) -> dict:
+    key = hashlib.sha1(json.dumps([path.relative_to(GGPK_DIR).as_posix(), names]).encode("utf-8")).hexdigest()[:16]
+    cache_file = CACHE_DIR / f"{path.stem}_{key}.json"
+    try:
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))
+        if cached.get("stamp") == list(stamp):
+            return cached["columns"]
+    except (OSError, ValueError):
+        pass
+    data = json.loads(path.read_text(encoding="utf-8"))
+    out = {"_rid": [row.get("_rid", i) for i, row in enumerate(data)]}
+    for n in names:
+        out[n] = [row.get(n) for row in data]
+    del data
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"stamp": list(stamp), "columns": out}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass  # read-only checkout: just skip the cache
+    return out
+
+
+def columns(table: str, names: list[str], lang: str = "en") -> dict[str, list]:
+    """{"_rid": [...], name: [...] for each name} of `table` in `lang` ("en" or
+    "ch"). Raises FileNotFoundError when neither the .datc64 nor the .json exists."""
+    names = list(names)
+    path = source(table, names, lang)
+    stamp = _stamp(path)
+    key = (path, tuple(names))
+    hit = _memo.get(key)
+    if hit and hit[0] == stamp:
+        return hit[1]
+    if path.suffix == ".datc64":
+        out = _from_binary(path, table, names)
+    else:
+        out = _from_json(path, names, stamp)
+    _memo[key] = (stamp, out)
+    return out
+
+
+def rows(table: str, names: list[str], lang: str = "en") -> list[dict]:
+    """columns() as one dict per row ({"_rid", *names}), for callers that
+    iterated the JSON dump."""
+    cols = columns(table, names, lang)
+    keys = ["_rid", *names]
+    return [dict(zip(keys, values)) for values in zip(*(cols[k] for k in keys))]
+
+
+def _iter_json_array(path: Path, chunk_size: int = 1 << 16):
+    """The objects of a JSON array file, decoded one at a time from chunks."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+
+        def fill():
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def skip(chars):
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in chars:
+                    pos += 1
+                if pos < len(buf) or eof:
+                    return
+                fill()
+
+        skip(" \t\r\n")
+        if buf[pos:pos + 1] != "[":
+            raise ValueError(f"{path.name}: not a JSON array")
+        pos += 1
+        while True:
+            skip(" \t\r\n,")
+            if pos >= len(buf):
+                raise ValueError(f"{path.name}: unterminated JSON array")
+            if buf[pos] == "]":
+                return
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill()  # the object continues past the buffer
+                continue
+            yield obj
+            pos = end
+
+
+def stream(table: str, names: list[str], lang: str = "en"):
+    """Rows ({"_rid", *names}) of `table` one at a time, nothing memoized.
+    Raises FileNotFoundError like columns()."""
+    names = list(names)
+    path = source(table, names, lang)
+    if path.suffix == ".datc64":
+        with Table(path, {n: SCHEMAS[table][n] for n in names}) as t:
+            for i in range(len(t)):
+                yield {"_rid": i, **{n: t.cell(i, n) for n in names}}
+        return
+    for i, row in enumerate(_iter_json_array(path)):
+        yield {"_rid": row.get("_rid", i), **{n: row.get(n) for n in names}}
@@ -1,43 +1,23 @@
 import json
+import sys
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent.resolve()
-DATA_DIR = PROJECT_ROOT / "data"
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation import translations  # noqa: E402
+
 SOUND_MAP_FILE = PROJECT_ROOT / "filter_generation" / "data" / "theme" / "sharket" / "Sharket_sound_map.json"
 OUTPUT_FILE = PROJECT_ROOT / "filter_generation" / "data" / "theme" / "sharket" / "Sharket_sound_map_v2.json"
 
 def load_reverse_translations():
     """Load CH -> EN mapping for BaseTypes."""
     print("Loading translations...")
-    en_map = {} # ID -> Name
-    try:
-        en_path = DATA_DIR / "from_ggpk" / "baseitemtypes.json"
-        if en_path.exists():
-            with open(en_path, "r", encoding="utf-8") as f:
-                en_data = json.load(f)
-                for item in en_data:
-                    if "Id" in item and "Name" in item:
-                        en_map[item["Id"]] = item["Name"]
-    except Exception as e: 
-        print(f"Error loading EN base types: {e}")
-        return {}
-
-    ch_to_en = {}
     try:
-        ch_path = DATA_DIR / "from_ggpk" / "ch_simplified" / "baseitemtypes.json"
-        if ch_path.exists():
-            with open(ch_path, "r", encoding="utf-8") as f:
-                ch_data = json.load(f)
-                for item in ch_data:
-                    if "Id" in item and "Name" in item:
-                        en_name = en_map.get(item["Id"])
-                        if en_name:
-                            ch_to_en[item["Name"]] = en_name
-                            # Also map stripped versions if needed?
+        ch_to_en = translations.base_ch2en()
     except Exception as e:
-        print(f"Error loading CH base types: {e}")
+        print(f"Error loading base type translations: {e}")
         return {}
-        
+
     print(f"Loaded {len(ch_to_en)} reverse translations.")
     return ch_to_en
 
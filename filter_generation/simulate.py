@@ -0,0 +1,1001 @@
+"""Batch drop simulation — the Python counterpart of webapp/frontend/src/utils/simulatorEngine.ts.
+
+Items are plain dicts shaped like the TS `ItemProps` (name, class, itemLevel,
+rarity, sockets, corrupted, ...). Two sources can be simulated:
+
+  * the data tree (base_mapping + tier_definition + theme/overrides), with the
+    exact first-match and style rules of simulatorEngine.ts `evaluateItem`
+    (results have the same shape as its `SimulationResult`);
+  * a generated .filter, evaluated block by block with the game's semantics
+    (the first matching block without `Continue` decides).
+
+Conditions are evaluated column-wise over a whole batch rather than item by
+item: every rule/block narrows a list of still-unmatched row indices, rules
+with `targets`, mapping lookups and `BaseType ==` blocks only touch the rows
+whose name they can match, and styles are resolved once per (file, tier).
+For a .filter, a MatchIndex (BaseType hash buckets, partial-BaseType trie,
+Class buckets, residual list) gives each (name, class) the few blocks it can
+match, in source order, so rows never walk the whole block list.
+
+Usage:
+  python simulate.py items.json                      # data tree, JSON results to stdout
+  python simulate.py items.json --filter complete_filter.filter --area-level 68
+  python simulate.py --sample 50000                  # random drops from BaseTypes.csv, timed
+  python simulate.py --sample 20000 --filter --bench # indexed lookup vs linear block scan
+"""
+import argparse
+import csv
+import json
+import math
+import operator
+import random
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation.data_pack import read_json  # noqa: E402
+from filter_generation.filter_parser import parse_filter  # noqa: E402
+
+CONFIG_DATA_DIR = SCRIPT_DIR / "data"
+BASE_TYPES_CSV = PROJECT_ROOT / "data" / "from_filter_blade" / "3.28" / "BaseTypes.csv"
+DEFAULT_FILTER = SCRIPT_DIR / "complete_filter.filter"
+
+# Conditions the simulator cannot model (mods / enchants / derived stats / actions).
+# They are treated as satisfied; results that relied on one are flagged `partial`.
+NON_SIMULATABLE = frozenset({
+    "CorruptedMods", "HasExplicitMod", "HasImplicitMod", "AnyEnchantment", "HasEnchantment",
+    "HasSearingExarchImplicit", "HasEaterOfWorldsImplicit", "HasCruciblePassiveTree",
+    "BaseDefencePercentile", "BaseArmour", "BaseEvasion", "BaseEnergyShield", "BaseWard",
+    "EnchantmentPassiveNum", "EnchantmentPassiveNode", "Foulborn",
+    "DisableDropSound", "EnableDropSound",
+})
+
+# Boolean condition keys -> the item attribute they test.
+BOOL_FIELD = {
+    "FracturedItem": "fractured", "SynthesisedItem": "synthesised",
+    "ShaperItem": "shaper", "ElderItem": "elder",
+    "Scourged": "scourged", "Replica": "replica", "Imbued": "imbued", "TransfiguredGem": "transfigured",
+    "BlightedMap": "blightedMap", "BlightRavagedMap": "blightRavagedMap",
+    "ShapedMap": "shapedMap", "ElderMap": "elderMap", "ZanasMemory": "zanasMemory",
+    "Corrupted": "corrupted", "Identified": "identified", "Mirrored": "mirrored",
+    "Fractured": "fractured", "Synthesised": "synthesised", "HasImplicit": "hasImplicit",
+}
+
+INFLUENCES = ("shaper", "elder", "crusader", "redeemer", "hunter", "warlord", "exarch", "eater")
+
+DEFAULT_STYLE = {
+    "color": "#888",
+    "backgroundColor": "rgba(0,0,0,0.8)",
+    "borderColor": "#333",
+    "borderStyle": "solid",
+    "borderWidth": "1px",
+    "fontSize": "14px",
+    "padding": "2px 6px",
+    "fontFamily": "Fontin, sans-serif",
+}
+
+
+# --- JS value semantics (the TS engine compares with JS coercion rules) ---
+
+class _Undefined:
+    __slots__ = ()
+
+    def __repr__(self):
+        return "undefined"
+
+
+UNDEFINED = _Undefined()
+
+_FLOAT_PREFIX_RE = re.compile(r"\s*([+-]?(?:Infinity|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?))")
+_NUMBER_RE = re.compile(r"[+-]?(?:Infinity|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)")
+
+
+def parse_float(text: str) -> float:
+    """JS parseFloat: longest numeric prefix after leading whitespace, else NaN."""
+    m = _FLOAT_PREFIX_RE.match(text)
+    return float(m.group(1).replace("Infinity", "inf")) if m else math.nan
+
+
+def js_number(v) -> float:
+    """JS Number(v)."""
+    if v is UNDEFINED:
+        return math.nan
+    if v is None:
+        return 0.0
+    if isinstance(v, bool):
+        return 1.0 if v else 0.0
+    if isinstance(v, (int, float)):
+        return v
+    if isinstance(v, str):
+        s = v.strip()
+        if not s:
+            return 0.0
+        if _NUMBER_RE.fullmatch(s):
+            return float(s.replace("Infinity", "inf"))
+        return math.nan
+    return math.nan
+
+
+def js_string(v) -> str:
+    """JS String(v)."""
+    if v is UNDEFINED:
+        return "undefined"
+    if v is None:
+        return "null"
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, float):
+        if math.isnan(v):
+            return "NaN"
+        if math.isinf(v):
+            return "Infinity" if v > 0 else "-Infinity"
+        return str(int(v)) if v.is_integer() else repr(v)
+    if isinstance(v, list):
+        return ",".join("" if x is None or x is UNDEFINED else js_string(x) for x in v)
+    if isinstance(v, dict):
+        return "[object Object]"
+    return str(v)
+
+
+def truthy(v) -> bool:
+    """JS truthiness ({} and [] are truthy, NaN is not)."""
+    if v is UNDEFINED or v is None or v is False:
+        return False
+    if isinstance(v, (int, float)):
+        return v == v and v != 0
+    if isinstance(v, str):
+        return v != ""
+    return True
+
+
+def _js_kind(v) -> str:
+    if isinstance(v, bool):
+        return "boolean"
+    if isinstance(v, (int, float)):
+        return "number"
+    return type(v).__name__
+
+
+def js_strict_eq(a, b) -> bool:
+    """JS ===."""
+    return _js_kind(a) == _js_kind(b) and a == b
+
+
+# --- item batches ---
+
+class ItemBatch:
+    """Column-oriented view over a list of ItemProps dicts.
+
+    Columns and indexes are built on first use and cached, so a batch can be
+    reused across several simulators.
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.size = len(self.items)
+        self._columns = {}
+        self._indexes = {}
+
+    def column(self, field: str) -> list:
+        col = self._columns.get(field)
+        if col is None:
+            col = self._columns[field] = [it.get(field, UNDEFINED) for it in self.items]
+        return col
+
+    def derived(self, name: str, fn) -> list:
+        """Cached column computed by fn(item) for every row."""
+        key = ("derived", name)
+        col = self._columns.get(key)
+        if col is None:
+            col = self._columns[key] = [fn(it) for it in self.items]
+        return col
+
+    def index(self, name: str, col: list) -> dict:
+        """Cached value -> [row, ...] index over a column."""
+        idx = self._indexes.get(name)
+        if idx is None:
+            idx = {}
+            for i, v in enumerate(col):
+                idx.setdefault(v, []).append(i)
+            self._indexes[name] = idx
+        return idx
+
+    def by_name(self) -> dict:
+        return self.index("name", self.column("name"))
+
+    def by_lower_name(self) -> dict:
+        return self.index("name_lower", self.derived("name_lower", lambda it: str(it.get("name", "")).lower()))
+
+    def socket_letters(self) -> list:
+        return self.derived("socket_letters", lambda it: _socket_letters(it.get("sockets")))
+
+
+def _socket_letters(sockets) -> str:
+    if not truthy(sockets):
+        return ""
+    return re.sub(r"[^RGBAWD]", "", js_string(sockets), flags=re.I).upper()
+
+
+def _lower_first(key: str) -> str:
+    return key[:1].lower() + key[1:]
+
+
+# --- data-tree simulation (mirrors simulatorEngine.ts evaluateItem) ---
+
+_OPS = {">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt}
+
+
+def _tree_predicate(key: str, value):
+    """Compile one rule condition into pred(batch, rows, area_level) -> rows.
+
+    Returns None for conditions the TS engine skips (non-simulatable keys and
+    repeated keys other than HasInfluence).
+    """
+    if isinstance(value, list):
+        if key != "HasInfluence":
+            return None
+        wanted = [inf for v in value for inf in re.split(r"\s+", js_string(v).replace('"', "").strip().lower())]
+        if any(w not in INFLUENCES for w in wanted):
+            return lambda batch, rows, area: []
+        fields = sorted(set(wanted))
+
+        def all_influences(batch, rows, area):
+            cols = [batch.column(f) for f in fields]
+            return [i for i in rows if all(truthy(c[i]) for c in cols)]
+        return all_influences
+
+    op, target = "=", value
+    if isinstance(value, str):
+        for prefix in (">=", "<=", ">", "<", "="):
+            if value.startswith(prefix):
+                op, target = prefix, parse_float(value[len(prefix):])
+                break
+
+    if key in NON_SIMULATABLE:
+        return None
+
+    if key == "SocketGroup":
+        want = Counter(re.sub(r"[^RGBAWD]", "", js_string(value), flags=re.I).upper())
+
+        def socket_group(batch, rows, area):
+            letters = batch.socket_letters()
+            return [i for i in rows if not want - Counter(letters[i])]
+        return socket_group
+
+    if key in BOOL_FIELD:
+        field, expected = BOOL_FIELD[key], js_string(value).strip() == "True"
+        return lambda batch, rows, area: [i for i in rows if truthy(batch.column(field)[i]) == expected]
+
+    if key == "HasInfluence":
+        wanted = [w for w in re.split(r"\s+", js_string(value).replace('"', "").strip()) if w]
+        fields = sorted({w.lower() for w in wanted if w.lower() in INFLUENCES})
+
+        def any_influence(batch, rows, area):
+            cols = [batch.column(f) for f in fields]
+            return [i for i in rows if any(truthy(c[i]) for c in cols)]
+        return any_influence
+
+    if key == "BaseType":
+        tokens = set()
+        for t in re.split(r"\s+", js_string(value)):
+            t = re.sub(r'^"|"$', "", t).lower()
+            if t:
+                tokens.add(t)
+
+        def base_type(batch, rows, area):
+            lower = batch.derived("name_lower", lambda it: str(it.get("name", "")).lower())
+            return [i for i in rows if lower[i] in tokens]
+        return base_type
+
+    def item_values(batch, area):
+        if key == "AreaLevel":
+            return None
+        if key == "Sockets":
+            return [len(s) for s in batch.socket_letters()]
+        return batch.column(_lower_first(key))
+
+    if isinstance(target, str):
+        convert = lambda v: v if isinstance(v, str) else js_string(v)
+    elif isinstance(target, (int, float)) and not isinstance(target, bool):
+        convert = lambda v: v if isinstance(v, (int, float)) and not isinstance(v, bool) else js_number(v)
+    else:
+        convert = lambda v: v
+    compare = _OPS.get(op)
+
+    def generic(batch, rows, area):
+        values = item_values(batch, area)
+        if values is None:  # AreaLevel: one value for the whole batch
+            v = convert(area if truthy(area) else 1)
+            ok = compare(v, target) if compare else js_strict_eq(v, target)
+            return rows if ok else []
+        if compare:
+            return [i for i in rows if compare(convert(values[i]), target)]
+        return [i for i in rows if js_strict_eq(convert(values[i]), target)]
+    return generic
+
+
+def rule_is_partial(rule: dict) -> bool:
+    return any(k in NON_SIMULATABLE for k in (rule.get("conditions") or {}))
+
+
+def _color_to_rgb(value):
+    if not truthy(value):
+        return "transparent"
+    if isinstance(value, str) and len(value) == 9:
+        r, g, b, a = (int(value[i:i + 2], 16) for i in (1, 3, 5, 7))
+        return f"rgba({r},{g},{b},{a / 255:.2f})"
+    return value
+
+
+def _convert_theme_style(ts: dict) -> dict:
+    sound = UNDEFINED
+    alert = ts.get("PlayAlertSound")
+    if alert is not None:
+        sound = (alert[0] if alert else UNDEFINED) if isinstance(alert, list) else alert
+    border = truthy(ts.get("BorderColor", UNDEFINED))
+    font = ts.get("FontSize", UNDEFINED)
+    return {
+        "color": _color_to_rgb(ts["TextColor"]) if truthy(ts.get("TextColor", UNDEFINED)) else UNDEFINED,
+        "backgroundColor": _color_to_rgb(ts["BackgroundColor"]) if truthy(ts.get("BackgroundColor", UNDEFINED)) else UNDEFINED,
+        "borderColor": _color_to_rgb(ts["BorderColor"]) if border else UNDEFINED,
+        "fontSize": f"{js_string(js_number(font) / 1.8)}px" if truthy(font) else UNDEFINED,
+        "borderStyle": "solid" if border else "none",
+        "borderWidth": "1px" if border else "0px",
+        "sound": sound,
+    }
+
+
+def _first_key(obj: dict, skip_comments: bool):
+    for k in obj:
+        if k != "_meta" and not (skip_comments and k.startswith("//")):
+            return k
+    return None
+
+
+class TreeSimulator:
+    """Simulates drops against the data tree, mirroring simulatorEngine.ts.
+
+    `mappings` / `tier_definitions` are keyed like the simulator bundle
+    ("base_mapping/...", "tier_definition/..."); their order is the match order.
+    """
+
+    def __init__(self, mappings: dict, tier_definitions: dict, theme: dict, overrides: dict | None = None):
+        self.mappings = mappings
+        self.tier_definitions = tier_definitions
+        self.theme = theme or {}
+        self.overrides = overrides or {}
+        self.files = []
+        for path, content in mappings.items():
+            rules = []
+            for rule in content.get("rules") or []:
+                tier = (rule.get("overrides") or {}).get("Tier")
+                if not truthy(tier):
+                    continue  # the TS engine only takes rules that set a Tier
+                targets = rule.get("targets") or []
+                preds = [p for k, v in (rule.get("conditions") or {}).items()
+                         if (p := _tree_predicate(k, v)) is not None]
+                rules.append((set(targets) if targets else None, preds,
+                              # Tier: [] is truthy but tier[0] is undefined in the TS engine
+                              (tier[0] if tier else None) if isinstance(tier, list) else tier,
+                              rule.get("comment") or "Custom Rule", rule_is_partial(rule)))
+            lower_map = {}
+            for k, v in (content.get("mapping") or {}).items():
+                lower_map.setdefault(k.lower(), v)
+            self.files.append((path, rules, lower_map))
+        self._styles = {}
+
+    def resolve_style(self, matched_file: str | None, matched_tier: str) -> tuple[dict, bool]:
+        """(style, visible) for a (file, tier) pair — resolveStyle in the TS engine."""
+        key = (matched_file, matched_tier)
+        cached = self._styles.get(key)
+        if cached is None:
+            cached = self._styles[key] = self._resolve_style(matched_file, matched_tier)
+        return cached
+
+    def _tier_def(self, matched_file: str):
+        return self.tier_definitions.get(re.sub(r"^base_mapping/", "tier_definition/", matched_file))
+
+    def _resolve_style(self, matched_file, matched_tier):
+        category = "Default"
+        if matched_file:
+            tier_def = self._tier_def(matched_file)
+            if tier_def:
+                group_key = _first_key(tier_def, skip_comments=True)
+                if group_key:
+                    group = tier_def[group_key]
+                    meta = group.get("_meta") if isinstance(group, dict) else None
+                    theme_cat = meta.get("theme_category") if isinstance(meta, dict) else None
+                    category = theme_cat if truthy(theme_cat if theme_cat is not None else UNDEFINED) else group_key
+            else:
+                meta = (self.mappings.get(matched_file) or {}).get("_meta") or {}
+                if truthy(meta.get("theme_category", UNDEFINED)):
+                    category = meta["theme_category"]
+                else:
+                    parts = [p for p in matched_file.split("/") if p != "base_mapping" and not p.endswith(".json")]
+                    if parts:
+                        category = parts[-1]
+                    if category == "Fragments":
+                        category = "Map Fragments"
+
+        theme_style = None
+        if matched_tier and matched_tier != "Untiered":
+            m = re.search(r"Tier \d+", matched_tier)
+            normalized = m.group(0) if m else matched_tier
+
+            def check(cat, tier):
+                for source in (self.overrides, self.theme):
+                    entry = source.get(cat)
+                    if truthy(entry if entry is not None else UNDEFINED) and isinstance(entry, dict):
+                        found = entry.get(tier)
+                        if truthy(found if found is not None else UNDEFINED):
+                            return found
+                return None
+
+            theme_style = (check(category, matched_tier) or check(category, normalized)
+                           or check("Default", matched_tier) or check("Default", normalized))
+            if not theme_style and matched_file:
+                tier_def = self._tier_def(matched_file)
+                if tier_def:
+                    group_key = _first_key(tier_def, skip_comments=False)
+                    if group_key:
+                        entry = (tier_def.get(group_key) or {}).get(matched_tier)
+                        inline_theme = entry.get("theme") if isinstance(entry, dict) else None
+                        if truthy(inline_theme if inline_theme is not None else UNDEFINED):
+                            inline = {k: v for k, v in inline_theme.items() if k != "Tier"}
+                            if inline:
+                                theme_style = inline
+
+        style = dict(DEFAULT_STYLE)
+        if theme_style:
+            style.update(_convert_theme_style(theme_style))
+            style = {k: v for k, v in style.items() if v is not UNDEFINED}
+        visible = not (matched_tier and "Hide" in matched_tier)
+        return style, visible
+
+    def run(self, batch: ItemBatch, area_level=None) -> list[dict]:
+        """First-match result per row of `batch` (SimulationResult shape)."""
+        n = batch.size
+        won = [None] * n
+        pending = list(range(n))
+        by_name = batch.by_name()
+        by_lower = batch.by_lower_name()
+        area = area_level if area_level is not None else UNDEFINED
+
+        for path, rules, lower_map in self.files:
+            for targets, preds, tier, comment, partial in rules:
+                if targets is not None:
+                    rows = sorted(i for t in targets for i in by_name.get(t, ()) if won[i] is None)
+                else:
+                    pending = [i for i in pending if won[i] is None]
+                    rows = pending
+                for pred in preds:
+                    if not rows:
+                        break
+                    rows = pred(batch, rows, area)
+                for i in rows:
+                    won[i] = (path, tier, comment, partial)
+            if len(lower_map) <= len(by_lower):
+                hits = ((k, by_lower.get(k)) for k in lower_map)
+            else:
+                hits = ((k, rows) for k, rows in by_lower.items() if k in lower_map)
+            for k, rows in hits:
+                if rows:
+                    tier = lower_map[k]
+                    for i in rows:
+                        if won[i] is None:
+                            won[i] = (path, tier, None, False)
+
+        results = []
+        for w in won:
+            if w is None:
+                style, visible = self.resolve_style(None, "Untiered")
+                results.append({"visible": visible, "style": style, "matchedTier": "Untiered"})
+                continue
+            path, tier, comment, partial = w
+            if isinstance(tier, list):
+                tier = tier[0] if tier else None
+            tier_key = tier if truthy(tier if tier is not None else UNDEFINED) else "Untiered"
+            style, visible = self.resolve_style(path, tier_key)
+            result = {"visible": visible, "style": style, "matchedTier": tier_key, "matchedFile": path}
+            if comment:
+                result["matchedRule"] = comment
+            if partial:
+                result["partial"] = True
+            results.append(result)
+        return results
+
+
+def load_tree(config_dir: Path = CONFIG_DATA_DIR) -> TreeSimulator:
+    """TreeSimulator over a data tree, with the theme/overrides the simulator UI
+    uses (settings.base_theme preset + theme/custom_overrides.json)."""
+    def read(path: Path, default):
+        try:
+            return read_json(path)
+        except (OSError, ValueError):
+            return default
+
+    mappings, tiers = {}, {}
+    for root, target in (("base_mapping", mappings), ("tier_definition", tiers)):
+        for p in sorted((config_dir / root).rglob("*.json")):
+            content = read(p, None)
+            if content is not None:
+                target[p.relative_to(config_dir).as_posix()] = content
+    settings = read(config_dir / "settings.json", {})
+    base_theme = settings.get("base_theme") or settings.get("active_theme") or "sharket"
+    theme = read(config_dir / "theme" / base_theme / f"{base_theme}_theme.json", {})
+    overrides = read(config_dir / "theme" / "custom_overrides.json", {})
+    return TreeSimulator(mappings, tiers, theme, overrides)
+
+
+# --- generated .filter simulation ---
+
+_HEADER_RE = re.compile(r"^#==\[(\d+)\]-(.*)==\s*$")
+_RARITY = {"Normal": 0, "Magic": 1, "Rare": 2, "Unique": 3}
+_NUMERIC_FIELD = {
+    "ItemLevel": "itemLevel", "DropLevel": "dropLevel", "Quality": "quality",
+    "LinkedSockets": "linkedSockets", "StackSize": "stackSize", "GemLevel": "gemLevel",
+    "MapTier": "mapTier", "Height": "height", "Width": "width",
+}
+_FILTER_BOOL = {**BOOL_FIELD, "Corrupted": "corrupted", "Identified": "identified", "Mirrored": "mirrored"}
+
+
+def read_filter_blocks(text: str) -> list[dict]:
+    """Blocks of a .filter in order: command, conditions, actions, header, line."""
+    blocks = []
+    for b in parse_filter(text):
+        m = next(filter(None, (_HEADER_RE.match("#" + c) for c in reversed(b.comments))), None)
+        blocks.append({
+            "command": b.command,
+            "conditions": [(c.key, c.op or "=", c.values) for c in b.conditions],
+            "actions": {a.key: a.args for a in b.actions},
+            "continue": b.continues,
+            "header": (int(m.group(1)), m.group(2).strip(" -")) if m else None,
+            "line": b.line,
+        })
+    return blocks
+
+
+def _compare(op: str, a, b) -> bool:
+    if op in ("=", "=="):
+        return a == b
+    if op in ("!=", "!"):
+        return a != b
+    return _OPS[op](a, b)
+
+
+def _filter_predicate(key: str, op: str, values: list):
+    """Compile one .filter condition into pred(batch, rows, area_level) -> rows.
+
+    Returns None (treated as satisfied, block flagged partial) for conditions
+    that cannot be evaluated from ItemProps.
+    """
+    negate = op in ("!=", "!")
+    if key in ("BaseType", "Class"):
+        field = "name" if key == "BaseType" else "class"
+        if op in ("==", "!="):
+            wanted = set(values)
+
+            def exact_match(batch, rows, area):
+                col = batch.column(field)
+                return [i for i in rows if (col[i] in wanted) != negate]
+            return exact_match
+
+        def partial_match(batch, rows, area):
+            col = batch.column(field)
+            return [i for i in rows
+                    if (isinstance(col[i], str) and any(v in col[i] for v in values)) != negate]
+        return partial_match
+
+    if key == "Rarity":
+        ranks = [_RARITY.get(v, -1) for v in values]
+
+        def rarity(batch, rows, area):
+            col = batch.column("rarity")
+            out = []
+            for i in rows:
+                r = _RARITY.get(col[i], 0 if col[i] is UNDEFINED else -1)
+                if op in ("=", "==", "!=", "!"):
+                    ok = (r in ranks) != negate
+                else:
+                    ok = _compare(op, r, ranks[0])
+                if ok:
+                    out.append(i)
+            return out
+        return rarity
+
+    if key in _FILTER_BOOL:
+        field, expected = _FILTER_BOOL[key], (values[:1] == ["True"]) != negate
+
+        def flag(batch, rows, area):
+            col = batch.column(field)
+            return [i for i in rows if truthy(col[i]) == expected]
+        return flag
+
+    if key == "HasInfluence":
+        wanted = [v.lower() for v in values]
+        if wanted == ["none"]:
+            def no_influence(batch, rows, area):
+                influenced = batch.derived("influenced", lambda it: any(truthy(it.get(f)) for f in INFLUENCES))
+                return [i for i in rows if not influenced[i]]
+            return no_influence
+        fields = [w for w in wanted if w in INFLUENCES]
+        combine = all if op == "==" else any
+
+        def influence(batch, rows, area):
+            cols = [batch.column(f) for f in fields]
+            return [i for i in rows if cols and combine(truthy(c[i]) for c in cols)]
+        return influence
+
+    if key == "SocketGroup":
+        want = Counter(re.sub(r"[^RGBAWD]", "", "".join(values), flags=re.I).upper())
+
+        def socket_group(batch, rows, area):
+            letters = batch.socket_letters()
+            return [i for i in rows if not want - Counter(letters[i])]
+        return socket_group
+
+    if key in _NUMERIC_FIELD or key in ("Sockets", "AreaLevel"):
+        targets = [parse_float(v) for v in values]
+        if not targets or any(math.isnan(t) for t in targets):
+            return None
+
+        def numeric(v) -> bool:
+            if op in ("=", "=="):
+                return any(v == t for t in targets)
+            if negate:
+                return all(v != t for t in targets)
+            return _OPS[op](v, targets[0])
+
+        if key == "AreaLevel":
+            return lambda batch, rows, area: rows if numeric(area if truthy(area) else 1) else []
+        if key == "Sockets":
+            return lambda batch, rows, area: [i for i in rows if numeric(len(batch.socket_letters()[i]))]
+        field = _NUMERIC_FIELD[key]
+
+        def numeric_field(batch, rows, area):
+            col = batch.column(field)
+            return [i for i in rows if numeric(js_number(col[i]))]
+        return numeric_field
+    return None
+
+
+def _filter_color(args: list) -> str:
+    nums = [int(a) for a in args[:4] if a.lstrip("-").isdigit()]
+    if len(nums) < 3:
+        return "transparent"
+    a = nums[3] if len(nums) > 3 else 255
+    return f"rgba({nums[0]},{nums[1]},{nums[2]},{a / 255:.2f})"
+
+
+def _filter_style(actions: dict) -> dict:
+    style = dict(DEFAULT_STYLE)
+    if "SetTextColor" in actions:
+        style["color"] = _filter_color(actions["SetTextColor"])
+    if "SetBackgroundColor" in actions:
+        style["backgroundColor"] = _filter_color(actions["SetBackgroundColor"])
+    if "SetBorderColor" in actions:
+        style["borderColor"] = _filter_color(actions["SetBorderColor"])
+    if actions.get("SetFontSize"):
+        style["fontSize"] = f"{js_string(js_number(actions['SetFontSize'][0]) / 1.8)}px"
+    if actions.get("CustomAlertSound"):
+        style["sound"] = actions["CustomAlertSound"][0]
+    elif actions.get("PlayAlertSound"):
+        sound = actions["PlayAlertSound"][0]
+        style["sound"] = int(sound) if sound.isdigit() else sound
+    return style
+
+
+class _Trie:
+    """Substring matcher for partial `BaseType` values: walk the needle trie
+    from every start position of the name."""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, needle: str, block: int):
+        node = self.root
+        for ch in needle:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append(block)
+
+    def search(self, text: str) -> set:
+        hits = set()
+        root = self.root
+        for start in range(len(text)):
+            node = root
+            for ch in text[start:]:
+                node = node.get(ch)
+                if node is None:
+                    break
+                if None in node:
+                    hits.update(node[None])
+        if None in root:  # empty needle: matches everything
+            hits.update(root[None])
+        return hits
+
+
+class MatchIndex:
+    """First-match candidate index over a block list.
+
+    Every block is filed under one key condition: its `BaseType ==` names (hash
+    buckets), else a partial `BaseType` (trie), else a `Class` condition (class
+    buckets, resolved per distinct class), else the residual list. The
+    candidates for a (name, class) are those four sources merged back into
+    source order, so scanning them gives the same first match as scanning every
+    block. `keyed[b]` is the condition index the key already proves (None for
+    residual and for `BaseType ==`, whose names are intersected up front).
+    """
+
+    def __init__(self, blocks: list[dict]):
+        self.exact = {}
+        self.trie = _Trie()
+        self.class_exact = {}
+        self.class_partial = []
+        self.residual = []
+        self.keyed = []
+        for b, block in enumerate(blocks):
+            conds = block["conditions"]
+            names = None
+            for key, op, values in conds:
+                if key == "BaseType" and op == "==":
+                    names = set(values) if names is None else names & set(values)
+            if names is not None:
+                for name in names:
+                    self.exact.setdefault(name, []).append(b)
+                self.keyed.append(None)
+                continue
+            keyed = next((c for c, (key, op, _) in enumerate(conds) if key == "BaseType" and op == "="), None)
+            if keyed is not None:
+                for value in conds[keyed][2]:
+                    self.trie.add(value, b)
+            else:
+                keyed = next((c for c, (key, op, _) in enumerate(conds)
+                              if key == "Class" and op in ("=", "==")), None)
+                if keyed is None:
+                    self.residual.append(b)
+                elif conds[keyed][1] == "==":
+                    for value in set(conds[keyed][2]):
+                        self.class_exact.setdefault(value, []).append(b)
+                else:
+                    self.class_partial.append((b, conds[keyed][2]))
+            self.keyed.append(keyed)
+        self._by_class = {}
+        self._cache = {}
+
+    def _class_blocks(self, cls) -> list:
+        blocks = self._by_class.get(cls)
+        if blocks is None:
+            blocks = list(self.class_exact.get(cls, ()))
+            if isinstance(cls, str):
+                blocks += [b for b, values in self.class_partial if any(v in cls for v in values)]
+            blocks.sort()
+            self._by_class[cls] = blocks
+        return blocks
+
+    def candidates(self, name, cls) -> tuple:
+        """Block indices that can match an item with this name/class, in order."""
+        key = (name, cls)
+        found = self._cache.get(key)
+        if found is None:
+            merged = set(self.exact.get(name, ()))
+            if isinstance(name, str):
+                merged |= self.trie.search(name)
+            merged.update(self._class_blocks(cls))
+            merged.update(self.residual)
+            found = self._cache[key] = tuple(sorted(merged))
+        return found
+
+
+class FilterSimulator:
+    """Simulates drops against a generated .filter (first non-Continue match wins)."""
+
+    def __init__(self, text: str):
+        self.blocks = read_filter_blocks(text)
+        self.index = MatchIndex(self.blocks)
+        self.compiled = []    # (exact_names, preds, partial): the full test of each block
+        self.unproven = []    # preds the index key does not already prove
+        for b, block in enumerate(self.blocks):
+            preds, unproven, partial, exact_names = [], [], False, None
+            for c, (key, op, values) in enumerate(block["conditions"]):
+                if key == "BaseType" and op == "==":
+                    exact_names = set(values) if exact_names is None else exact_names & set(values)
+                    continue
+                pred = _filter_predicate(key, op, values)
+                if pred is None:
+                    partial = True
+                    continue
+                preds.append(pred)
+                if c != self.index.keyed[b]:
+                    unproven.append(pred)
+            self.compiled.append((exact_names, preds, partial))
+            self.unproven.append(unproven)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "FilterSimulator":
+        return cls(Path(path).read_text(encoding="utf-8"))
+
+    def run(self, batch: ItemBatch, area_level=None) -> list[dict]:
+        """Rows are grouped by their index candidate list; each group walks only
+        its candidates, narrowing its still-unmatched rows."""
+        n = batch.size
+        won = [None] * n
+        carried = [None] * n  # actions accumulated from matching Continue blocks
+        area = area_level if area_level is not None else UNDEFINED
+        for candidates, group in self.group_rows(batch).items():
+            pending = group
+            for b in candidates:
+                rows = pending
+                for pred in self.unproven[b]:
+                    if not rows:
+                        break
+                    rows = pred(batch, rows, area)
+                if not rows:
+                    continue
+                block = self.blocks[b]
+                if block["continue"]:
+                    for i in rows:
+                        carried[i] = {**(carried[i] or {}), **block["actions"]}
+                    continue
+                partial = self.compiled[b][2]
+                for i in rows:
+                    won[i] = (b, partial)
+                if len(rows) == len(pending):
+                    break
+                pending = [i for i in pending if won[i] is None]
+        return self._results(won, carried)
+
+    def group_rows(self, batch: ItemBatch) -> dict:
+        """Index candidate tuple -> rows of the batch that share it."""
+        by_key = {}
+        for i, key in enumerate(zip(batch.column("name"), batch.column("class"))):
+            by_key.setdefault(key, []).append(i)
+        groups = {}
+        for (name, cls), rows in by_key.items():
+            groups.setdefault(self.index.candidates(name, cls), []).extend(rows)
+        return groups
+
+    def matching_rows(self, batch: ItemBatch, b: int, area_level=None, groups: dict | None = None) -> list:
+        """Rows block b matches on its own, ignoring every block before it."""
+        area = area_level if area_level is not None else UNDEFINED
+        rows = sorted(i for candidates, group in (groups or self.group_rows(batch)).items()
+                      if b in candidates for i in group)
+        for pred in self.unproven[b]:
+            if not rows:
+                break
+            rows = pred(batch, rows, area)
+        return rows
+
+    def run_linear(self, batch: ItemBatch, area_level=None) -> list[dict]:
+        """Reference: every item tested against every block in order (bench / check)."""
+        won = [None] * batch.size
+        carried = [None] * batch.size
+        area = area_level if area_level is not None else UNDEFINED
+        names = batch.column("name")
+        for i in range(batch.size):
+            for b, (exact_names, preds, partial) in enumerate(self.compiled):
+                if exact_names is not None and names[i] not in exact_names:
+                    continue
+                if not all(pred(batch, [i], area) for pred in preds):
+                    continue
+                block = self.blocks[b]
+                if block["continue"]:
+                    carried[i] = {**(carried[i] or {}), **block["actions"]}
+                else:
+                    won[i] = (b, partial)
+                    break
+        return self._results(won, carried)
+
+    def _results(self, won: list, carried: list) -> list[dict]:
+        results = []
+        styles = {}
+        for i, w in enumerate(won):
+            if w is None:
+                actions = carried[i] or {}
+                results.append({"visible": True, "style": _filter_style(actions)})
+                continue
+            b, partial = w
+            block = self.blocks[b]
+            if carried[i]:
+                style = _filter_style({**carried[i], **block["actions"]})
+            else:
+                style = styles.get(b) or styles.setdefault(b, _filter_style(block["actions"]))
+            result = {"visible": block["command"] == "Show", "style": style,
+                      "matchedBlock": b, "line": block["line"]}
+            if block["header"]:
+                result["blockIndex"], result["matchedHeader"] = block["header"]
+            if partial:
+                result["partial"] = True
+            results.append(result)
+        return results
+
+
+# --- sample drops / CLI ---
+
+def sample_items(count: int, seed: int = 0) -> list[dict]:
+    """Random drops over the BaseTypes.csv catalog (bench / smoke input)."""
+    with open(BASE_TYPES_CSV, "r", encoding="utf-8-sig") as f:
+        bases = [row for row in csv.DictReader(f) if row.get("Class") and row.get("BaseType")]
+    rng = random.Random(seed)
+    items = []
+    for _ in range(count):
+        row = rng.choice(bases)
+        item = {
+            "name": row["BaseType"].strip(),
+            "class": row["Class"].strip(),
+            "dropLevel": int(row["DropLevel"] or 1),
+            "itemLevel": rng.randint(1, 86),
+            "rarity": rng.choice(("Normal", "Normal", "Magic", "Rare", "Unique")),
+            "width": int(row["Width"] or 1),
+            "height": int(row["Height"] or 1),
+            "corrupted": rng.random() < 0.05,
+            "identified": rng.random() < 0.3,
+        }
+        slots = min(6, item["width"] * item["height"]) if row.get("Sockets") else 0
+        if slots:
+            n = rng.randint(0, slots)
+            item["sockets"] = "".join(rng.choice("RGB") for _ in range(n))
+            item["linkedSockets"] = rng.randint(min(n, 1), n) if n else 0
+        items.append(item)
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate item drops against the data tree or a generated filter.")
+    parser.add_argument("items", nargs="?", help="JSON file with a list of ItemProps objects.")
+    parser.add_argument("--filter", nargs="?", const=str(DEFAULT_FILTER), default=None,
+                        help="Simulate against a generated .filter (default: complete_filter.filter) "
+                             "instead of the data tree.")
+    parser.add_argument("--area-level", type=int, default=None, help="AreaLevel of the simulated zone.")
+    parser.add_argument("--sample", type=int, default=0, help="Simulate N random drops from BaseTypes.csv.")
+    parser.add_argument("--out", help="Write results JSON here instead of stdout.")
+    parser.add_argument("--bench", action="store_true",
+                        help="With --filter: time the indexed lookup against a linear block scan "
+                             "on the same drops and check both give identical results.")
+    args = parser.parse_args()
+    if args.bench and not args.filter:
+        parser.error("--bench needs --filter")
+
+    if args.sample:
+        items = sample_items(args.sample)
+    elif args.items:
+        items = json.loads(Path(args.items).read_text(encoding="utf-8"))
+    else:
+        parser.error("give an items file or --sample N")
+
+    t0 = time.perf_counter()
+    sim = FilterSimulator.from_file(Path(args.filter)) if args.filter else load_tree()
+    t1 = time.perf_counter()
+    results = sim.run(ItemBatch(items), args.area_level)
+    t2 = time.perf_counter()
+
+    if args.bench:
+        t3 = time.perf_counter()
+        linear = sim.run_linear(ItemBatch(items), args.area_level)
+        t4 = time.perf_counter()
+        tested = sum(len(sim.index.candidates(it.get("name", UNDEFINED), it.get("class", UNDEFINED)))
+                     for it in items) / max(len(items), 1)
+        print(f"{len(sim.blocks)} blocks, {tested:.1f} index candidates per item", file=sys.stderr)
+        print(f"linear scan {t4 - t3:.3f}s, indexed {t2 - t1:.3f}s "
+              f"({(t4 - t3) / max(t2 - t1, 1e-9):.0f}x), results "
+              f"{'identical' if linear == results else 'DIFFER'}", file=sys.stderr)
+        if linear != results:
+            sys.exit(1)
+
+    hidden = sum(not r["visible"] for r in results)
+    matched = sum("matchedFile" in r or "matchedBlock" in r for r in results)
+    print(f"{len(items)} items: {matched} matched, {hidden} hidden "
+          f"(load {t1 - t0:.3f}s, simulate {t2 - t1:.3f}s)", file=sys.stderr)
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, ensure_ascii=False), encoding="utf-8")
+    elif not args.sample:
+        json.dump(results, sys.stdout, ensure_ascii=False)
+        print()
+
+
+if __name__ == "__main__":
+    main()
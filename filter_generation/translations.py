@@ -0,0 +1,169 @@
+"""EN <-> CH name tables shared by the backend and the parsing tools.
+
+Built once from the GGPK dumps (through ggpk_data.py) and kept as one compact
+table under data/from_ggpk/.columns_cache/translations.json, keyed by the
+(mtime, size) of every source, so a process that needs any of them reads one
+small file instead of joining both baseitemtypes dumps:
+
+  base_en2ch / base_ch2en   base type names, joined on the GGPK Id; when several
+                            rows share a name the first row wins (in both
+                            directions), as sync_base_translations always did
+  base_ch_by_id             Id -> CH name (build_items_db joins per Id)
+  class_en2ch               item class names, joined on Id, first row wins
+  unique_en2ch              unique item names keyed by norm_unique_name(): the
+                            ch `words` table (Wordlist 6: Text = EN, Text2 = CH)
+                            overlaid with data/unique_name_zh_extra.json
+
+A missing source yields empty tables. The dicts are shared: treat them as
+read-only.
+
+Usage:
+    from filter_generation import translations
+    translations.base_en2ch()["Driftwood Wand"]
+    translations.unique_en2ch().get(translations.norm_unique_name(name))
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation import datc64, ggpk_data  # noqa: E402
+
+UNIQUE_EXTRA = PROJECT_ROOT / "data" / "unique_name_zh_extra.json"
+CACHE_FILE = ggpk_data.CACHE_DIR / "translations.json"
+CACHE_FORMAT = 1
+UNIQUE_WORDLIST = 6
+
+# (table, columns, lang) of every GGPK read below
+_READS = [
+    ("baseitemtypes", ["Id", "Name"], "en"),
+    ("baseitemtypes", ["Id", "Name"], "ch"),
+    ("itemclasses", ["Id", "Name"], "en"),
+    ("itemclasses", ["Id", "Name"], "ch"),
+    ("words", ["Wordlist", "Text", "Text2"], "ch"),
+]
+
+_memo = None  # (stamps, tables)
+
+
+def norm_unique_name(name: str) -> str:
+    """Join key for unique names: the GGPK Words rows differ from trade-data
+    names by curly apostrophes (Tasalio’s), casing (Jack, The Axe) and stray
+    whitespace (Demigod's Immortality<space>)."""
+    return " ".join(name.replace("’", "'").split()).lower()
+
+
+def sources() -> list[Path]:
+    """Every file the tables are built from (the cache is keyed by their stamps),
+    including the reader code: ggpk_data.py holds the table schemas, datc64.py
+    decodes the binary dumps."""
+    code = [Path(__file__).resolve(), Path(ggpk_data.__file__).resolve(), Path(datc64.__file__).resolve()]
+    return [ggpk_data.source(*read) for read in _READS] + code + [UNIQUE_EXTRA]
+
+
+def _stamps(paths: list[Path]) -> list:
+    out = []
+    for path in paths:
+        try:
+            st = path.stat()
+            out.append([path.as_posix(), st.st_mtime_ns, st.st_size])
+        except OSError:
+            out.append([path.as_posix(), None, None])
+    return out
+
+
+def _columns(table: str, names: list[str], lang: str) -> dict[str, list]:
+    try:
+        return ggpk_data.columns(table, names, lang)
+    except FileNotFoundError:
+        return {n: [] for n in names}
+
+
+def _join(table: str) -> tuple[dict, dict, dict]:
+    """(en2ch, ch2en, Id -> ch name) of a table with Id / Name columns."""
+    en = _columns(table, ["Id", "Name"], "en")
+    ch = _columns(table, ["Id", "Name"], "ch")
+    ch_by_id = {i: n for i, n in zip(ch["Id"], ch["Name"]) if i is not None and n}
+    en2ch, ch2en = {}, {}
+    for item_id, en_name in zip(en["Id"], en["Name"]):
+        ch_name = ch_by_id.get(item_id)
+        if en_name and ch_name:
+            en2ch.setdefault(en_name, ch_name)
+            ch2en.setdefault(ch_name, en_name)
+    return en2ch, ch2en, ch_by_id
+
+
+def _unique_names() -> dict:
+    trans = {}
+    words = _columns("words", ["Wordlist", "Text", "Text2"], "ch")
+    for wordlist, en_name, ch_name in zip(words["Wordlist"], words["Text"], words["Text2"]):
+        if wordlist == UNIQUE_WORDLIST and en_name and ch_name and ch_name.strip() != en_name.strip():
+            trans[norm_unique_name(en_name)] = ch_name.strip()
+    try:
+        extra = json.loads(UNIQUE_EXTRA.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        extra = {}
+    for en_name, ch_name in extra.items():
+        if en_name.startswith("_") or not ch_name:
+            continue  # meta keys / not-yet-filled entries
+        trans[norm_unique_name(en_name)] = ch_name
+    return trans
+
+
+def _build() -> dict:
+    base_en2ch, base_ch2en, base_ch_by_id = _join("baseitemtypes")
+    class_en2ch, _, _ = _join("itemclasses")
+    return {"base_en2ch": base_en2ch, "base_ch2en": base_ch2en, "base_ch_by_id": base_ch_by_id,
+            "class_en2ch": class_en2ch, "unique_en2ch": _unique_names()}
+
+
+def tables() -> dict[str, dict]:
+    """Every table by name (see the module docstring), from the process memo,
+    the cache file, or rebuilt from the sources when either is stale."""
+    global _memo
+    stamps = _stamps(sources())
+    if _memo is not None and _memo[0] == stamps:
+        return _memo[1]
+    try:
+        cached = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+        if cached.get("format") != CACHE_FORMAT or cached.get("stamps") != stamps:
+            cached = None
+    except (OSError, ValueError):
+        cached = None
+    if cached is not None:
+        out = cached["tables"]
+    else:
+        out = _build()
+        try:
+            CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = CACHE_FILE.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"format": CACHE_FORMAT, "stamps": stamps, "tables": out},
+                                      ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, CACHE_FILE)
+        except OSError:
+            pass  # read-only checkout: just skip the cache
+    _memo = (stamps, out)
+    return out
+
+
+def base_en2ch() -> dict[str, str]:
+    return tables()["base_en2ch"]
+
+
+def base_ch2en() -> dict[str, str]:
+    return tables()["base_ch2en"]
+
+
+def base_ch_by_id() -> dict[str, str]:
+    return tables()["base_ch_by_id"]
+
+
+def class_en2ch() -> dict[str, str]:
+    return tables()["class_en2ch"]
+
+
+def unique_en2ch() -> dict[str, str]:
+    """CH unique names keyed by norm_unique_name() of the EN name."""
+    return tables()["unique_en2ch"]
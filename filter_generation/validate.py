@@ -0,0 +1,313 @@
+"""Whole-tree validator for the generator's data.
+
+Indexes every base_mapping / tier_definition file, the merged theme (base theme
+from data/config/settings.json + custom_overrides.json) and the item catalog
+(BaseTypes.csv + data/items_db.json) once, then cross-checks them for the data
+generate.py silently skips or chokes on. Each finding is a diagnostic dict:
+
+  {"severity": "error" | "warning", "code": ..., "file": <path relative to
+   base_mapping / tier_definition>, "where": <key inside the file>, "message": ...}
+
+Errors (output is lost or the generator crashes):
+  missing-tier-file   mapping without a tier_definition (the whole file is skipped)
+  invalid-json        a data file that does not parse
+  no-category         tier_definition without a category key
+  unknown-tier        mapping entry naming a tier the tier_definition lacks (item dropped;
+                      underscore folders are exempt, they remap to their first shown tier)
+  rule-unknown-tier   rule whose overrides.Tier is not defined (rule never applies)
+  bad-range           `RANGE` condition that is not `RANGE <op> <v> <op> <v>`
+  bad-shape           valid JSON of the wrong shape (e.g. a rule that is not an object);
+                      the offending part is skipped by the checks below
+
+Warnings (emitted, but probably not as intended):
+  unordered-tier      tier defined but missing from tier_order (emits last, or never)
+  undefined-order     tier_order entry with no definition
+  unknown-base        mapped base not in the catalog (partial bases: no catalog name contains it)
+  unknown-theme       theme_category / `Tier N` style missing from the theme (falls back)
+
+Usage:
+  python validate.py                   # text report, exit 1 when there are errors
+  python validate.py --json            # diagnostics as JSON on stdout
+  python validate.py --strict          # exit 1 on warnings too
+"""
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation.data_pack import read_json  # noqa: E402
+
+DATA_DIR = SCRIPT_DIR / "data"
+BASE_MAPPING_DIR = DATA_DIR / "base_mapping"
+TIER_DEF_DIR = DATA_DIR / "tier_definition"
+THEME_DIR = DATA_DIR / "theme"
+SETTINGS_FILE = PROJECT_ROOT / "data" / "config" / "settings.json"
+BASE_TYPES_CSV = PROJECT_ROOT / "data" / "from_filter_blade" / "3.28" / "BaseTypes.csv"
+ITEMS_DB = PROJECT_ROOT / "data" / "items_db.json"
+
+_catalog_cache = {}  # (path, mtime_ns) pairs -> set of base names
+
+
+def tier_num_from_label(label):
+    # Mirrors generate.py tier_num_from_label.
+    if "Tier 0" in label: return 0
+    if "Hide" in label: return 9
+    m = re.search(r"Tier\s+(\d+)", label)
+    return int(m.group(1)) if m else 99
+
+
+def load_catalog_names() -> set:
+    """Every base name of BaseTypes.csv and items_db.json (cached per file mtime)."""
+    key = tuple((str(p), p.stat().st_mtime_ns) for p in (BASE_TYPES_CSV, ITEMS_DB) if p.exists())
+    if key not in _catalog_cache:
+        names = set()
+        if BASE_TYPES_CSV.exists():
+            with open(BASE_TYPES_CSV, "r", encoding="utf-8-sig") as f:
+                names.update((row.get("BaseType") or "").strip() for row in csv.DictReader(f))
+        if ITEMS_DB.exists():
+            names.update(it.get("name") for it in json.loads(ITEMS_DB.read_text(encoding="utf-8")).get("items", []))
+        names.discard("")
+        names.discard(None)
+        _catalog_cache.clear()
+        _catalog_cache[key] = names
+    return _catalog_cache[key]
+
+
+def load_theme() -> dict:
+    """The merged theme generate.py styles with (same fallbacks as load_merged_theme)."""
+    name = "sharket"
+    try:
+        name = json.loads(SETTINGS_FILE.read_text(encoding="utf-8")).get("base_theme", "sharket")
+    except (OSError, ValueError):
+        pass
+    theme_file = THEME_DIR / name / f"{name}_theme.json"
+    if not theme_file.exists():
+        theme_file = THEME_DIR / "sharket" / "sharket_theme.json"
+    theme = json.loads(theme_file.read_text(encoding="utf-8"))
+    try:
+        overrides = json.loads((THEME_DIR / "custom_overrides.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        overrides = {}
+    for cat, tiers in overrides.items():
+        for tier in tiers:
+            theme.setdefault(cat, {}).setdefault(tier, {})
+    return theme
+
+
+def _range_ok(value: str) -> bool:
+    parts = value.split(" ")
+    return len(parts) == 5 and all(parts[1:])
+
+
+def _conditions(conditions: dict):
+    """(key, raw value) of a conditions dict; list values are repeated AND lines."""
+    if not isinstance(conditions, dict):
+        return
+    for key, val in conditions.items():
+        for v in (val if isinstance(val, list) else [val]):
+            yield key, v
+
+
+class TreeIndex:
+    """Parsed base_mapping + tier_definition docs, keyed by relative path.
+
+    `overlay` maps a relative path ("base_mapping/X/Y.json" or
+    "tier_definition/X/Y.json") to an already-parsed doc that replaces the file
+    on disk — how the backend validates a save before writing it.
+    """
+
+    def __init__(self, overlay: dict | None = None):
+        overlay = overlay or {}
+        self.diagnostics = []
+        self.mappings = self._load(BASE_MAPPING_DIR, "base_mapping", overlay)
+        self.tiers = self._load(TIER_DEF_DIR, "tier_definition", overlay)
+
+    def _load(self, root: Path, prefix: str, overlay: dict) -> dict:
+        docs = {}
+        for path in root.rglob("*.json"):
+            rel = path.relative_to(root).as_posix()
+            if f"{prefix}/{rel}" in overlay:
+                continue
+            try:
+                docs[rel] = read_json(path)
+            except (OSError, ValueError) as e:
+                self.diagnostics.append(diag("error", "invalid-json", rel, prefix, str(e)))
+        for key, doc in overlay.items():
+            head, _, rel = key.partition("/")
+            if head == prefix:
+                docs[rel] = doc
+        return docs
+
+
+def diag(severity: str, code: str, file: str, where: str, message: str) -> dict:
+    return {"severity": severity, "code": code, "file": file, "where": where, "message": message}
+
+
+def validate_tree(overlay: dict | None = None, catalog: set | None = None, theme: dict | None = None) -> list[dict]:
+    """Diagnostics for the whole data tree, in file order."""
+    index = TreeIndex(overlay)
+    catalog = load_catalog_names() if catalog is None else catalog
+    theme = load_theme() if theme is None else theme
+    out = index.diagnostics
+    partial_pool = None  # "\n"-joined catalog, built on the first partial base
+
+    def bad_shape(rel, where, what):
+        out.append(diag("error", "bad-shape", rel, where, f"{what}; skipped"))
+
+    for rel in sorted(index.mappings):
+        map_doc = index.mappings[rel]
+        tier_doc = index.tiers.get(rel)
+        if not isinstance(map_doc, dict):
+            bad_shape(rel, "", "base_mapping file is not a JSON object")
+            continue
+        mapping = map_doc.get("mapping", {})
+        if not isinstance(mapping, dict):
+            bad_shape(rel, "mapping", "'mapping' is not an object")
+            mapping = {}
+        rules = map_doc.get("rules", [])
+        if not isinstance(rules, list):
+            bad_shape(rel, "rules", "'rules' is not a list")
+            rules = []
+        if tier_doc is None:
+            if mapping or rules:
+                out.append(diag("error", "missing-tier-file", rel, "",
+                                f"no tier_definition/{rel}: its {len(mapping)} bases are never emitted"))
+            continue
+        if not isinstance(tier_doc, dict):
+            bad_shape(rel, "tier_definition", "tier_definition file is not a JSON object")
+            continue
+        category_key = next((k for k in tier_doc if not k.startswith("//")), None)
+        if not category_key:
+            out.append(diag("error", "no-category", rel, "", "tier_definition has no category key"))
+            continue
+        category = tier_doc[category_key]
+        if not isinstance(category, dict):
+            bad_shape(rel, category_key, f"tier_definition category '{category_key}' is not an object")
+            continue
+        meta = category.get("_meta", {})
+        if not isinstance(meta, dict):
+            bad_shape(rel, "_meta", "tier_definition _meta is not an object")
+            meta = {}
+        defined = [k for k in category if k != "_meta" and not k.startswith("//")]
+        tier_order = meta.get("tier_order", [])
+        if not isinstance(tier_order, list):
+            bad_shape(rel, "_meta.tier_order", "tier_order is not a list")
+            tier_order = []
+
+        if tier_order:
+            for t in defined:
+                if t not in tier_order:
+                    out.append(diag("warning", "unordered-tier", rel, t,
+                                    f"'{t}' is not in tier_order: emitted last if mapped, otherwise never"))
+            for t in tier_order:
+                if t not in category:
+                    out.append(diag("warning", "undefined-order", rel, f"_meta.tier_order.{t}",
+                                    f"tier_order lists '{t}', which is not defined"))
+
+        remapped = rel.split("/", 1)[0].startswith("_")
+        match_modes = meta.get("match_modes", {})
+        if not isinstance(match_modes, dict):
+            match_modes = {}
+        for base, tiers in mapping.items():
+            if not remapped:
+                for t in (tiers if isinstance(tiers, list) else [tiers]):
+                    if not isinstance(t, str):
+                        bad_shape(rel, f"mapping.{base}", f"'{base}' has a tier that is not a string ({t!r})")
+                        continue
+                    if t not in category:
+                        out.append(diag("error", "unknown-tier", rel, f"mapping.{base}",
+                                        f"'{base}' is mapped to undefined tier '{t}' and is dropped"))
+            if base in catalog:
+                continue
+            if match_modes.get(base, "exact") != "exact":
+                if partial_pool is None:
+                    partial_pool = "\n".join(catalog)
+                if base in partial_pool:
+                    continue
+            out.append(diag("warning", "unknown-base", rel, f"mapping.{base}", f"'{base}' is not in the item catalog"))
+
+        for n, rule in enumerate(rules, 1):
+            where = f"rules[{n}]"
+            if not isinstance(rule, dict):
+                bad_shape(rel, where, "rule is not an object")
+                continue
+            overrides = rule.get("overrides", {})
+            tier = overrides.get("Tier") if isinstance(overrides, dict) else None
+            if isinstance(tier, list):
+                tier = tier[0] if tier else None
+            if tier is not None and not isinstance(tier, str):
+                bad_shape(rel, f"{where}.overrides.Tier", f"rule Tier is not a string ({tier!r})")
+                tier = None
+            if tier and tier not in category:
+                out.append(diag("error", "rule-unknown-tier", rel, where,
+                                f"rule '{rule.get('comment', '')}' targets undefined tier '{tier}' and never applies"))
+            for key, val in _conditions(rule.get("conditions")):
+                if isinstance(val, str) and val.startswith("RANGE ") and not _range_ok(val):
+                    out.append(diag("error", "bad-range", rel, f"{where}.conditions.{key}",
+                                    f"'{val}' is not RANGE <op> <value> <op> <value> (condition dropped)"))
+
+        theme_cat = meta.get("theme_category", category_key)
+        theme_ref = theme.get(theme_cat) if isinstance(theme_cat, str) else None
+        if theme_ref is None:
+            out.append(diag("warning", "unknown-theme", rel, "_meta.theme_category",
+                            f"theme has no '{theme_cat}' category; styled from 'Default'"))
+            theme_ref = theme.get("Default", {})
+        for t in defined:
+            entry = category[t]
+            if not isinstance(entry, dict):
+                continue
+            for key, val in _conditions(entry.get("conditions")):
+                if isinstance(val, str) and val.startswith("RANGE ") and not _range_ok(val):
+                    out.append(diag("error", "bad-range", rel, f"{t}.conditions.{key}",
+                                    f"'{val}' is not RANGE <op> <value> <op> <value> (generator crashes)"))
+            entry_theme = entry.get("theme", {})
+            if not isinstance(entry_theme, dict):
+                bad_shape(rel, f"{t}.theme", f"'{t}' theme is not an object")
+                entry_theme = {}
+            tnum = entry_theme.get("Tier", tier_num_from_label(t))
+            if f"Tier {tnum}" not in theme_ref:
+                out.append(diag("warning", "unknown-theme", rel, f"{t}.theme",
+                                f"theme '{theme_cat}' has no 'Tier {tnum}' style; '{t}' is unstyled"))
+    return out
+
+
+def summarize(diagnostics: list[dict]) -> dict:
+    counts = {"error": 0, "warning": 0}
+    for d in diagnostics:
+        counts[d["severity"]] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-reference checks for the generator's data tree.")
+    parser.add_argument("--json", action="store_true", help="Print the diagnostics as JSON.")
+    parser.add_argument("--strict", action="store_true", help="Exit 1 on warnings as well as errors.")
+    parser.add_argument("--limit", type=int, default=0, help="Print at most this many diagnostics (0 = all).")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    diagnostics = validate_tree()
+    counts = summarize(diagnostics)
+    if args.json:
+        print(json.dumps({"diagnostics": diagnostics, "counts": counts}, ensure_ascii=False, indent=2))
+    else:
+        shown = diagnostics[:args.limit] if args.limit else diagnostics
+        for d in shown:
+            where = f" [{d['where']}]" if d["where"] else ""
+            print(f"{d['severity']:<7} {d['code']:<18} {d['file']}{where}: {d['message']}")
+        if len(shown) < len(diagnostics):
+            print(f"... {len(diagnostics) - len(shown)} more")
+    print(f"{counts['error']} errors, {counts['warning']} warnings in {time.perf_counter() - t0:.2f}s",
+          file=sys.stderr)
+    if counts["error"] or (args.strict and counts["warning"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Render generated filter variants by running generate.py in a subprocess.
+
+Shared by coverage.py and filter_diff.py. generate.py parses its arguments at
+import time, so variants are rendered out of process rather than imported.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent.resolve()
+PROJECT_ROOT = SCRIPT_DIR.parent
+GENERATOR = SCRIPT_DIR / "generate.py"
+STRICTNESS_LEVELS = ["soft", "regular", "semistrict", "strict", "verystrict", "uber", "uberplus"]
+
+
+def render_variants(mode: str, language: str, out_dir: Path) -> dict:
+    """strictness -> path of every level, from one generate.py --all-strictness run."""
+    subprocess.run([sys.executable, str(GENERATOR), "--all-strictness", "--mode", mode,
+                    "--language", language, "--output", str(out_dir / f"{mode}_{language}.filter")],
+                   check=True, cwd=PROJECT_ROOT, capture_output=True, text=True)
+    return {s: out_dir / f"{mode}_{language}_{s}.filter" for s in STRICTNESS_LEVELS}
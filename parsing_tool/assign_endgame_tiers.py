@@ -11,11 +11,12 @@ Tier rules:
   - Armour + Weapons: DropLevel thresholds from BaseTypes.csv
 
 Preservation: items already at T0 are never downgraded.
+
+Works on a DataTree (parsing_tool/data_tree.py): changed mapping files are
+written once at the end, or by pipeline.py when run as a pipeline step.
 """
 
 import csv
-import json
-import os
 import re
 import sys
 from pathlib import Path
@@ -25,11 +26,14 @@ from pathlib import Path
 # ---------------------------------------------------------------------------
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from parsing_tool.data_tree import DataTree  # noqa: E402
 
 CSV_PATH = PROJECT_ROOT / "data" / "from_filter_blade" / "3.28" / "BaseTypes.csv"
 
-BASE_MAPPING_ROOT = PROJECT_ROOT / "filter_generation" / "data" / "base_mapping" / "Equipment"
-TIER_DEF_ROOT     = PROJECT_ROOT / "filter_generation" / "data" / "tier_definition"  / "Equipment"
+# DataTree paths (relative to filter_generation/data)
+BASE_MAPPING_ROOT = "base_mapping/Equipment"
+TIER_DEF_ROOT     = "tier_definition/Equipment"
 
 # Subdirectories to process
 EQUIPMENT_SUBDIRS = ["Armour", "Weapons", "Jewellery"]
@@ -99,15 +103,14 @@ def load_csv(path: Path) -> dict[str, int]:
     return result
 
 
-def load_tier_def(tier_def_path: Path) -> dict[str, str]:
+def load_tier_def(tree: DataTree, tier_def_rel: str) -> dict[str, str]:
     """
     Return a mapping {numeric_tier_str: tier_key} by reading the tier_definition file.
     E.g. {"0": "Tier 0 Body Armours", "1": "Tier 1 Body Armours", ...}
     Only includes tiers 0-4.
     The tier_def JSON has a single top-level key (category name) with _meta.tier_order inside.
     """
-    with open(tier_def_path, encoding="utf-8") as f:
-        data = json.load(f)
+    data = tree.read(tier_def_rel)
 
     # The file has exactly one top-level key (the category name)
     category_key = next(iter(data))
@@ -135,33 +138,32 @@ def get_current_numeric_tier(tier_key: str) -> int | None:
 # Core logic: assign tiers for a single base_mapping file
 # ---------------------------------------------------------------------------
 def process_file(
-    mapping_path: Path,
+    tree: DataTree,
+    mapping_rel: str,
     drop_levels: dict[str, int],
     is_jewellery: bool,
 ) -> int:
     """
     Processes one base_mapping file. Returns count of items re-tiered.
     """
-    with open(mapping_path, encoding="utf-8") as f:
-        data = json.load(f)
+    data = tree.read(mapping_rel)
 
     mapping: dict[str, str] = data.get("mapping", {})
     if not mapping:
         return 0
 
-    filename = mapping_path.name
+    filename = mapping_rel.rsplit("/", 1)[-1]
 
     # Derive the corresponding tier_definition path
-    # mapping_path:  .../base_mapping/Equipment/Armour/Body Armours.json
-    # tier_def_path: .../tier_definition/Equipment/Armour/Body Armours.json
-    rel_parts = mapping_path.relative_to(BASE_MAPPING_ROOT).parts  # e.g. ("Armour", "Body Armours.json")
-    tier_def_path = TIER_DEF_ROOT.joinpath(*rel_parts)
+    # mapping_rel:  base_mapping/Equipment/Armour/Body Armours.json
+    # tier_def_rel: tier_definition/Equipment/Armour/Body Armours.json
+    tier_def_rel = TIER_DEF_ROOT + mapping_rel[len(BASE_MAPPING_ROOT):]
 
-    if not tier_def_path.exists():
-        print(f"  WARNING: tier_definition not found at {tier_def_path}, skipping {filename}")
+    if not tree.exists(tier_def_rel):
+        print(f"  WARNING: tier_definition not found at {tier_def_rel}, skipping {filename}")
         return 0
 
-    tier_map = load_tier_def(tier_def_path)  # {"0": "Tier 0 X", "1": "Tier 1 X", ...}
+    tier_map = load_tier_def(tree, tier_def_rel)  # {"0": "Tier 0 X", "1": "Tier 1 X", ...}
 
     def resolve_tier_key(numeric: int) -> str | None:
         """Return the tier key for a numeric tier, falling back T4→T3 if T4 not defined."""
@@ -242,22 +244,16 @@ def process_file(
                 mapping[item_name] = desired_key
                 changes += 1
 
-    if changes > 0:
-        data["mapping"] = mapping
-        with open(mapping_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-            f.write("\n")
-
     return changes
 
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
-def main():
+def run(tree: DataTree):
+    """Re-tier every endgame equipment mapping in `tree`; the caller flushes it."""
     if not CSV_PATH.exists():
-        print(f"ERROR: BaseTypes.csv not found at {CSV_PATH}")
-        sys.exit(1)
+        raise FileNotFoundError(f"BaseTypes.csv not found at {CSV_PATH}")
 
     print(f"Loading DropLevel data from: {CSV_PATH}")
     drop_levels = load_csv(CSV_PATH)
@@ -267,23 +263,32 @@ def main():
     total_files = 0
 
     for subdir in EQUIPMENT_SUBDIRS:
-        mapping_dir = BASE_MAPPING_ROOT / subdir
-        if not mapping_dir.exists():
+        mapping_dir = f"{BASE_MAPPING_ROOT}/{subdir}"
+        # direct children only, like the old glob("*.json")
+        json_files = [rel for rel in tree.files(mapping_dir) if "/" not in rel[len(mapping_dir) + 1:]]
+        if not json_files:
             print(f"WARNING: Directory not found: {mapping_dir}")
             continue
 
         is_jewellery = (subdir == "Jewellery")
-        json_files = sorted(mapping_dir.glob("*.json"))
 
-        for mapping_path in json_files:
-            changes = process_file(mapping_path, drop_levels, is_jewellery)
-            rel = mapping_path.relative_to(PROJECT_ROOT)
-            print(f"  {rel}: {changes} items re-tiered")
+        for mapping_rel in json_files:
+            changes = process_file(tree, mapping_rel, drop_levels, is_jewellery)
+            print(f"  filter_generation/data/{mapping_rel}: {changes} items re-tiered")
             total_changes += changes
             total_files += 1
 
     print(f"\nDone. {total_files} files processed, {total_changes} total items re-tiered.")
 
 
+def main():
+    if not CSV_PATH.exists():
+        print(f"ERROR: BaseTypes.csv not found at {CSV_PATH}")
+        sys.exit(1)
+    tree = DataTree()
+    run(tree)
+    tree.flush()
+
+
 if __name__ == "__main__":
     main()
@@ -23,6 +23,9 @@ Fix policy (--fix):
     shared one — zero visual change, but the tier becomes independently
     styleable and the duplicate label/style disappears.
 
+Fixes are applied to a DataTree (parsing_tool/data_tree.py) and written once
+at the end; pipeline.py runs the --fix pass as one of its steps.
+
 Usage:
   python parsing_tool/audit_fix_tier_ladders.py          # report only
   python parsing_tool/audit_fix_tier_ladders.py --fix
@@ -34,11 +37,13 @@ import re
 import sys
 from pathlib import Path
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
-
 PROJECT_ROOT = Path(__file__).parent.parent.resolve()
-TIER_DIR = PROJECT_ROOT / "filter_generation" / "data" / "tier_definition"
-THEME_FILE = PROJECT_ROOT / "filter_generation" / "data" / "theme" / "sharket" / "sharket_theme.json"
+sys.path.insert(0, str(PROJECT_ROOT))
+from parsing_tool.data_tree import DataTree  # noqa: E402
+
+# DataTree paths (relative to filter_generation/data)
+TIER_DIR = "tier_definition"
+THEME_FILE = "theme/sharket/sharket_theme.json"
 
 HIDE_NUM = 9
 KEY_NUM_RE = re.compile(r"^Tier (\d+)\b")
@@ -58,12 +63,12 @@ def tier_entries(cat_data):
         yield key, val
 
 
-def audit_file(path, theme_data, fix=False):
-    data = json.loads(path.read_text(encoding="utf-8"))
+def audit_file(rel, data, theme_data, fix=False):
+    """Issues of tier_definition doc `data` (`rel` relative to TIER_DIR); with
+    fix, `data` and `theme_data` are corrected in place."""
     cat_key = next((k for k in data if not k.startswith("//")), None)
     if not cat_key:
         return [], False, False
-    rel = path.relative_to(TIER_DIR).as_posix()
     report_only = rel.startswith(REPORT_ONLY_PREFIXES)
     do_fix = fix and not report_only
 
@@ -144,10 +149,11 @@ def audit_file(path, theme_data, fix=False):
             changed = True
     else:
         for k in hide_keys:
-            loc = cat[k].setdefault("localization", {})
+            loc = cat[k].get("localization", {})
             if loc.get("en") != "Hide" or loc.get("ch") != "隐藏":
                 issues.append(f"{tag}D hide tier '{k}' localization {loc}")
                 if do_fix:
+                    loc = cat[k].setdefault("localization", {})
                     loc["en"] = "Hide"
                     loc["ch"] = "隐藏"
                     changed = True
@@ -178,31 +184,26 @@ def audit_file(path, theme_data, fix=False):
                     }
                     changed = True
 
-    if do_fix and changed:
-        path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
-
     return [(rel, i) for i in issues], changed, theme_changed
 
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--fix", action="store_true")
-    args = ap.parse_args()
-
-    theme_data = json.loads(THEME_FILE.read_text(encoding="utf-8"))
+def run(tree, fix=False):
+    """Audit every tier_definition file of `tree`, fixing in place with fix
+    (the caller flushes the tree)."""
+    theme_data = tree.read(THEME_FILE)
     all_issues = []
     changed_files = []
     theme_dirty = False
-    for path in sorted(TIER_DIR.rglob("*.json")):
-        issues, changed, theme_changed = audit_file(path, theme_data, fix=args.fix)
+    for path in tree.files(TIER_DIR):
+        rel = path[len(TIER_DIR) + 1:]
+        issues, changed, theme_changed = audit_file(rel, tree.read(path), theme_data, fix=fix)
         all_issues.extend(issues)
         theme_dirty = theme_dirty or theme_changed
         if changed:
-            changed_files.append(path.relative_to(TIER_DIR).as_posix())
+            changed_files.append(rel)
 
-    if args.fix and theme_dirty:
-        THEME_FILE.write_text(json.dumps(theme_data, indent=2, ensure_ascii=False), encoding="utf-8")
-        print(f"theme updated: {THEME_FILE.name}")
+    if fix and theme_dirty:
+        print(f"theme updated: {THEME_FILE.rsplit('/', 1)[-1]}")
 
     if not all_issues:
         print("Clean: no tier-ladder issues found.")
@@ -213,11 +214,22 @@ def main():
                 print(f"\n{rel}")
                 cur = rel
             print(f"  {issue}")
-    if args.fix:
+    if fix:
         print(f"\nFixed {len(changed_files)} file(s):")
         for f in changed_files:
             print(f"  {f}")
 
 
+def main():
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--fix", action="store_true")
+    args = ap.parse_args()
+
+    tree = DataTree()
+    run(tree, fix=args.fix)
+    tree.flush(dry_run=not args.fix)
+
+
 if __name__ == "__main__":
     main()
@@ -5,23 +5,34 @@ Builds data/items_db.json from GGPK-extracted source files, making the project
 league-day independent (no reliance on FilterBlade's BaseTypes.csv for core data).
 
 Usage:
-    python build_items_db.py [--no-filterblade] [--output PATH]
+    python build_items_db.py [--no-filterblade] [--output PATH] [--force]
 
-Inputs (from data/from_ggpk/):
-    baseitemtypes.json                  – all English base items
-    itemclasses.json                    – item class definitions (_rid → Name)
-    componentattributerequirements.json – Str/Dex/Int requirements per item
-    ch_simplified/baseitemtypes.json    – Chinese name translations
+Inputs (from data/from_ggpk/, .datc64 where present else .json, only the
+columns used — see filter_generation/ggpk_data.py):
+    baseitemtypes                  – all English base items
+    itemclasses                    – item class definitions (_rid → Name)
+    componentattributerequirements – Str/Dex/Int requirements per item
+    ch_simplified/baseitemtypes    – Chinese name translations
 
 Optional supplement:
     data/from_filter_blade/3.28/BaseTypes.csv – Game:* stat columns
 
 Output:
     data/items_db.json
+    data/items_db.columns.json – the same build, columnar and compact, one
+                                 list per field plus the GGPK Id of each item,
+                                 and the digest of the inputs it was built from
+    data/items_db.changes.json – items added / removed / changed (by GGPK Id)
+                                 and translation changes since the previous build
+
+The build is skipped when the inputs (the GGPK source files, the CSV, this
+script and the HELPERS modules) and items_db.json still match the digests
+recorded in items_db.columns.json; --force rebuilds anyway.
 """
 
 import argparse
 import csv
+import hashlib
 import json
 import sys
 import warnings
@@ -33,11 +44,26 @@ from pathlib import Path
 # ---------------------------------------------------------------------------
 SCRIPT_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = SCRIPT_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation import ggpk_data, translations  # noqa: E402
+
 DATA_DIR = PROJECT_ROOT / "data"
 GGPK_DIR = DATA_DIR / "from_ggpk"
 FILTERBLADE_CSV = DATA_DIR / "from_filter_blade" / "3.28" / "BaseTypes.csv"
 DEFAULT_OUTPUT = DATA_DIR / "items_db.json"
 
+# (table, columns, lang) of every GGPK read below: their source files are build inputs
+GGPK_READS = [
+    ("itemclasses", ["Name"], "en"),
+    ("componentattributerequirements", ["BaseItemTypesKey", "ReqStr", "ReqDex", "ReqInt"], "en"),
+    ("baseitemtypes", ["Id", "Name"], "ch"),
+    ("baseitemtypes", ["Id", "Name", "ItemClassesKey", "DropLevel", "Width", "Height"], "en"),
+]
+COLUMNS_FORMAT = 1
+# Project modules the build runs through: their source is a build input
+# (pipeline.py's skip key hashes the same list).
+HELPERS = ("filter_generation/ggpk_data.py", "filter_generation/datc64.py", "filter_generation/translations.py")
+
 # Item classes that carry armour sub-type information
 ARMOUR_CLASSES = {"Body Armours", "Gloves", "Boots", "Helmets", "Shields"}
 
@@ -46,14 +72,14 @@ ARMOUR_CLASSES = {"Body Armours", "Gloves", "Boots", "Helmets", "Shields"}
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _load_json(path: Path) -> list | dict | None:
-    """Load a JSON file, returning None and printing a warning on failure."""
+def _load_table(table: str, names: list[str], lang: str = "en") -> list[dict] | None:
+    """Rows ({"_rid", *names}) of a GGPK table, or None with a warning on failure."""
+    path = ggpk_data.source(table, names, lang)
     if not path.exists():
         print(f"  WARNING: file not found: {path}", file=sys.stderr)
         return None
     try:
-        with open(path, "r", encoding="utf-8") as fh:
-            return json.load(fh)
+        return ggpk_data.rows(table, names, lang)
     except Exception as exc:
         print(f"  WARNING: could not parse {path}: {exc}", file=sys.stderr)
         return None
@@ -89,12 +115,12 @@ def _safe_float(v) -> float:
 
 
 # ---------------------------------------------------------------------------
-# Step 1: Load itemclasses.json  →  {_rid: "Name string"}
+# Step 1: Load itemclasses  →  {_rid: "Name string"}
 # ---------------------------------------------------------------------------
 
 def load_item_classes() -> dict[int, str]:
     """Return a dict mapping _rid (integer row index) to the class Name string."""
-    data = _load_json(GGPK_DIR / "itemclasses.json")
+    data = _load_table(*GGPK_READS[0])
     if data is None:
         return {}
 
@@ -109,12 +135,12 @@ def load_item_classes() -> dict[int, str]:
 
 
 # ---------------------------------------------------------------------------
-# Step 2: Load componentattributerequirements.json  →  {item_id: (s,d,i)}
+# Step 2: Load componentattributerequirements  →  {item_id: (s,d,i)}
 # ---------------------------------------------------------------------------
 
 def load_attr_requirements() -> dict[str, tuple[int, int, int]]:
     """Return a dict mapping BaseItemTypesKey (metadata path) to (Str, Dex, Int)."""
-    data = _load_json(GGPK_DIR / "componentattributerequirements.json")
+    data = _load_table(*GGPK_READS[1])
     if data is None:
         return {}
 
@@ -132,21 +158,17 @@ def load_attr_requirements() -> dict[str, tuple[int, int, int]]:
 
 
 # ---------------------------------------------------------------------------
-# Step 3: Load ch_simplified/baseitemtypes.json  →  {metadata_id: zh_name}
+# Step 3: Load ch_simplified/baseitemtypes  →  {metadata_id: zh_name}
 # ---------------------------------------------------------------------------
 
 def load_chinese_names() -> dict[str, str]:
     """Return a dict mapping metadata Id to Chinese Name."""
-    data = _load_json(GGPK_DIR / "ch_simplified" / "baseitemtypes.json")
-    if data is None:
+    path = ggpk_data.source(*GGPK_READS[2])
+    if not path.exists():
+        print(f"  WARNING: file not found: {path}", file=sys.stderr)
         return {}
 
-    zh_map: dict[str, str] = {}
-    for entry in data:
-        item_id = entry.get("Id", "")
-        name = entry.get("Name", "")
-        if item_id and name:
-            zh_map[item_id] = name
+    zh_map = translations.base_ch_by_id()
     print(f"  Loaded {len(zh_map)} Chinese name entries.")
     return zh_map
 
@@ -176,16 +198,119 @@ def load_filterblade_csv(csv_path: Path) -> dict[str, dict]:
     return fb_map
 
 
+# ---------------------------------------------------------------------------
+# Incremental build: input digest, columnar output, change report
+# ---------------------------------------------------------------------------
+
+def _sidecar(output_path: Path, kind: str) -> Path:
+    """data/items_db.json -> data/items_db.<kind>.json"""
+    return output_path.with_name(f"{output_path.stem}.{kind}.json")
+
+
+def _file_sha1(path: Path) -> str | None:
+    try:
+        return hashlib.sha1(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def input_digest(use_filterblade: bool) -> str:
+    """Hash of everything the build reads: GGPK sources, CSV, the code."""
+    paths = [ggpk_data.source(*read) for read in GGPK_READS]
+    if use_filterblade:
+        paths.append(FILTERBLADE_CSV)
+    paths += [Path(__file__).resolve()] + [PROJECT_ROOT / rel for rel in HELPERS]
+    h = hashlib.sha1(f"filterblade={use_filterblade}".encode("utf-8"))
+    for path in paths:
+        h.update(path.as_posix().encode("utf-8"))
+        h.update((_file_sha1(path) or "missing").encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_columns(columns_path: Path) -> dict | None:
+    """The columnar build at `columns_path`, or None when missing / unreadable
+    / of another format."""
+    try:
+        data = json.loads(columns_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return data if data.get("format") == COLUMNS_FORMAT else None
+
+
+def write_columns(columns_path: Path, digest: str, output_sha1: str,
+                  ids: list[str], items: list[dict], translations: dict[str, str]) -> None:
+    fields = list(items[0]) if items else []
+    data = {
+        "format": COLUMNS_FORMAT,
+        "inputs": digest,
+        "output_sha1": output_sha1,
+        "fields": fields,
+        "id": ids,
+        "columns": {f: [item[f] for item in items] for f in fields},
+        "translations": translations,
+    }
+    with open(columns_path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, ensure_ascii=False, separators=(",", ":"))
+
+
+def _records(columns: dict) -> dict[str, dict]:
+    """GGPK Id -> item record of a columnar build."""
+    fields = columns["fields"]
+    rows = zip(*(columns["columns"][f] for f in fields))
+    return {item_id: dict(zip(fields, row)) for item_id, row in zip(columns["id"], rows)}
+
+
+def diff_builds(previous: dict | None, ids: list[str], items: list[dict],
+                translations: dict[str, str], digest: str) -> dict:
+    """Item-level changes from the previous columnar build to this one."""
+    report = {"inputs": digest, "previous_inputs": None, "full": previous is None,
+              "added": [], "removed": [], "changed": {},
+              "translations": {"added": {}, "removed": [], "changed": {}}}
+    if previous is None:
+        return report
+    report["previous_inputs"] = previous.get("inputs")
+    old = _records(previous)
+    new = dict(zip(ids, items))
+    report["added"] = [{"id": i, "name": new[i]["name"]} for i in ids if i not in old]
+    report["removed"] = [{"id": i, "name": rec["name"]} for i, rec in old.items() if i not in new]
+    for item_id, rec in new.items():
+        before = old.get(item_id)
+        if before is None:
+            continue
+        fields = {f: [before.get(f), v] for f, v in rec.items() if before.get(f) != v}
+        if fields:
+            report["changed"][item_id] = {"name": rec["name"], "fields": fields}
+    old_tr = previous.get("translations", {})
+    tr = report["translations"]
+    tr["added"] = {en: zh for en, zh in translations.items() if en not in old_tr}
+    tr["removed"] = [en for en in old_tr if en not in translations]
+    tr["changed"] = {en: [old_tr[en], zh] for en, zh in translations.items()
+                     if en in old_tr and old_tr[en] != zh}
+    return report
+
+
 # ---------------------------------------------------------------------------
 # Main build function
 # ---------------------------------------------------------------------------
 
-def build_items_db(use_filterblade: bool = True, output_path: Path = DEFAULT_OUTPUT) -> None:
+def build_items_db(use_filterblade: bool = True, output_path: Path = DEFAULT_OUTPUT,
+                   force: bool = False) -> dict | None:
+    """Build output_path and its sidecars; returns the change report, or None
+    when the inputs are unchanged and the build was skipped."""
     print("=== build_items_db.py ===")
     print(f"GGPK source: {GGPK_DIR}")
     print(f"Output:      {output_path}")
     print()
 
+    columns_path = _sidecar(output_path, "columns")
+    changes_path = _sidecar(output_path, "changes")
+    digest = input_digest(use_filterblade)
+    previous = load_columns(columns_path)
+    if (not force and previous is not None and previous.get("inputs") == digest
+            and previous.get("output_sha1") == _file_sha1(output_path)):
+        print(f"Inputs unchanged since the last build ({digest[:12]}); nothing to do (--force to rebuild).")
+        return None
+
     # --- Load auxiliary data ---
     print("[1/4] Loading item classes...")
     rid_to_class = load_item_classes()
@@ -205,20 +330,20 @@ def build_items_db(use_filterblade: bool = True, output_path: Path = DEFAULT_OUT
 
     # --- Load main base item types ---
     print()
-    print("Building item list from baseitemtypes.json...")
-    en_data = _load_json(GGPK_DIR / "baseitemtypes.json")
+    print("Building item list from baseitemtypes...")
+    en_data = _load_table(*GGPK_READS[3])
     if en_data is None:
-        print("ERROR: Cannot proceed without baseitemtypes.json.", file=sys.stderr)
-        sys.exit(1)
+        raise RuntimeError("Cannot proceed without baseitemtypes.")
 
     items: list[dict] = []
+    ids: list[str] = []                     # GGPK Id of each item, for the columnar output
     translations: dict[str, str] = {}
     missing_class_count = 0
     zh_count = 0
 
     for entry in en_data:
         item_id  = entry.get("Id", "")          # metadata path, e.g. "Metadata/Items/..."
-        en_name  = entry.get("Name", "").strip()
+        en_name  = (entry.get("Name") or "").strip()
         class_key = entry.get("ItemClassesKey")  # integer → rid into itemclasses
 
         if not en_name:
@@ -290,6 +415,7 @@ def build_items_db(use_filterblade: bool = True, output_path: Path = DEFAULT_OUT
             "dps":                dps,
         }
         items.append(item_record)
+        ids.append(item_id)
 
         # Chinese translation
         zh_name = zh_map.get(item_id, "")
@@ -303,6 +429,11 @@ def build_items_db(use_filterblade: bool = True, output_path: Path = DEFAULT_OUT
     with open(output_path, "w", encoding="utf-8") as fh:
         json.dump(output_data, fh, ensure_ascii=False, indent=2)
 
+    report = diff_builds(previous, ids, items, translations, digest)
+    write_columns(columns_path, digest, _file_sha1(output_path), ids, items, translations)
+    with open(changes_path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, ensure_ascii=False, indent=2)
+
     # --- Summary ---
     class_names = {item["item_class"] for item in items if item["item_class"] != "Unknown"}
     print()
@@ -312,6 +443,12 @@ def build_items_db(use_filterblade: bool = True, output_path: Path = DEFAULT_OUT
     print(f"  Items missing class mapping:  {missing_class_count}")
     print(f"  Items with zh translation:    {zh_count}")
     print(f"  Output written to:            {output_path}")
+    if report["full"]:
+        print(f"  Changes:                      no previous columnar build, see {changes_path.name}")
+    else:
+        print(f"  Changes since last build:     {len(report['added'])} added, {len(report['removed'])} removed, "
+              f"{len(report['changed'])} changed (details in {changes_path.name})")
+    return report
 
 
 # ---------------------------------------------------------------------------
@@ -334,12 +471,22 @@ def main():
         metavar="PATH",
         help=f"Output JSON path (default: {DEFAULT_OUTPUT})",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild even when the inputs are unchanged since the last build.",
+    )
     args = parser.parse_args()
 
-    build_items_db(
-        use_filterblade=not args.no_filterblade,
-        output_path=args.output,
-    )
+    try:
+        build_items_db(
+            use_filterblade=not args.no_filterblade,
+            output_path=args.output,
+            force=args.force,
+        )
+    except RuntimeError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
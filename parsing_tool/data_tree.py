@@ -0,0 +1,111 @@
+"""The filter_generation/data JSON tree, parsed once and written once.
+
+parsing_tool scripts used to rglob and json.load the tree themselves and
+rewrite each file as they went. Through a DataTree they share one parse
+(pipeline.py runs several steps on the same tree) and every changed file is
+written once, at flush():
+
+    tree = DataTree()
+    for rel in tree.files("base_mapping"):
+        doc = tree.read(rel)          # parsed once, shared: edit it in place
+        doc["_meta"]["x"] = 1
+    tree.write("base_mapping/New.json", {...})   # new / replaced documents
+    tree.flush()                      # writes only the documents that changed
+
+Paths are posix paths relative to filter_generation/data. A rewritten file
+keeps its own layout (indent, trailing newline); new files get indent 2 and
+a trailing newline, the style of the backend's saves.
+"""
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "filter_generation" / "data"
+
+
+def _compact(doc) -> str:
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":"))
+
+
+def _style(text: str) -> tuple[int, bool]:
+    """(indent, trailing newline) of a json.dump'ed file."""
+    lines = text.split("\n", 2)
+    indent = len(lines[1]) - len(lines[1].lstrip(" ")) if len(lines) > 1 else 2
+    return indent or 2, text.endswith("\n")
+
+
+class DataTree:
+    def __init__(self, root: Path = DATA_DIR):
+        self.root = Path(root)
+        self._docs = {}      # rel -> parsed document
+        self._loaded = {}    # rel -> (compact JSON as read, style); absent for new files
+        self._lock = threading.RLock()
+
+    def _path(self, rel: str) -> Path:
+        return self.root / rel
+
+    def files(self, prefix: str) -> list[str]:
+        """Sorted rel paths of the *.json files under `prefix` (a folder or one
+        file), including documents written but not flushed yet."""
+        base = self._path(prefix)
+        if base.suffix == ".json":
+            found = {prefix} if base.exists() else set()
+        else:
+            found = {p.relative_to(self.root).as_posix() for p in base.rglob("*.json")}
+        with self._lock:
+            found.update(rel for rel in self._docs if rel == prefix or rel.startswith(prefix.rstrip("/") + "/"))
+        return sorted(found)
+
+    def exists(self, rel: str) -> bool:
+        with self._lock:
+            return rel in self._docs or self._path(rel).exists()
+
+    def read(self, rel: str):
+        """The parsed document at `rel` (raises like json.loads / open)."""
+        with self._lock:
+            if rel not in self._docs:
+                text = self._path(rel).read_text(encoding="utf-8")
+                doc = json.loads(text)
+                self._docs[rel] = doc
+                self._loaded[rel] = (_compact(doc), _style(text))
+            return self._docs[rel]
+
+    def write(self, rel: str, doc):
+        """Replace (or create) the document at `rel`; written at flush()."""
+        with self._lock:
+            if rel not in self._loaded and self._path(rel).exists():
+                self.read(rel)
+            self._docs[rel] = doc
+
+    def changed(self) -> list[str]:
+        """Rel paths whose document differs from the file (or is new)."""
+        with self._lock:
+            return sorted(rel for rel, doc in self._docs.items()
+                          if rel not in self._loaded or _compact(doc) != self._loaded[rel][0])
+
+    def digest(self, prefix: str) -> str:
+        """Content hash of every document under `prefix`, as the tree holds it now."""
+        h = hashlib.sha1()
+        for rel in self.files(prefix):
+            h.update(rel.encode("utf-8"))
+            h.update(_compact(self.read(rel)).encode("utf-8"))
+        return h.hexdigest()
+
+    def flush(self, dry_run: bool = False) -> list[str]:
+        """Write every changed document once; returns their rel paths."""
+        out = self.changed()
+        if dry_run:
+            return out
+        for rel in out:
+            indent, newline = self._loaded[rel][1] if rel in self._loaded else (2, True)
+            doc = self._docs[rel]
+            path = self._path(rel)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(json.dumps(doc, indent=indent, ensure_ascii=False) + ("\n" if newline else ""),
+                           encoding="utf-8")
+            os.replace(tmp, path)
+            self._loaded[rel] = (_compact(doc), (indent, newline))
+        return out
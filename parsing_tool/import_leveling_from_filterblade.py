@@ -30,9 +30,9 @@ picker's "Hide Unselected Gear Aggressively" toggle (`hide_unselected`), applied
 generation time, not baked in here. DROP the RGB/chromatic blocks (deferred until
 GGG confirms the 3.29 chromatic change).
 
-Scanner note: FilterBlade emits the `Class ==` line at COLUMN 0 (unindented) in
-some blocks. A block body runs until the next blank line / comment / Show|Hide
-header — NOT until the first unindented line.
+Parsing goes through the shared filter_generation/filter_parser.py (game block
+semantics: FilterBlade emits the `Class ==` line at COLUMN 0 in some blocks, and
+those lines still belong to the block).
 
 Idempotent: imported tiers carry `_lv: true`; a re-run removes the old ones and
 re-adds fresh, preserving any hand-authored (non-`_lv`) tiers + `_meta`.
@@ -42,26 +42,20 @@ Run from the project root:  python parsing_tool/import_leveling_from_filterblade
 import csv
 import json
 import re
+import sys
 from collections import OrderedDict
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation.filter_parser import parse_file  # noqa: E402
+
 FILTER_PATH = PROJECT_ROOT / "data" / "FilterBlade.filter"
 CSV_PATH = PROJECT_ROOT / "data" / "from_filter_blade" / "BaseTypes.csv"
 TIER_DIR = PROJECT_ROOT / "filter_generation" / "data" / "tier_definition" / "_campaign"
 
-# A block header: Show/Hide + $type->leveling->... + $tier->X. Only active
-# (Show/Hide) lines match; commented `#Show` never matches (starts with '#').
-BLOCK_RE = re.compile(r'^(?P<cmd>Show|Hide)\b.*\$type->(?P<path>leveling->\S+)\s.*\$tier->(?P<tier>\S+)')
 QUOTED_RE = re.compile(r'"([^"]+)"')
 
-# Style/action lines to strip (theme table owns colours/sounds/icons).
-STYLE_PREFIXES = (
-    "SetFontSize", "SetTextColor", "SetBorderColor", "SetBackgroundColor",
-    "PlayAlertSound", "PlayEffect", "MinimapIcon", "CustomAlertSound",
-    "DisableDropSound", "EnableDropSound", "Continue",
-)
-
 # subtype substring (after `leveling->`) -> (target file under _campaign, theme.Tier).
 # Ordered; first match wins. Loud highlights get low Tier numbers; generic gets high.
 ROUTING = [
@@ -117,34 +111,16 @@ SOUND_BY_TIER = {2: (2, None), 3: (2, None), 4: (-1, None), 5: (-1, None),
                  6: (-1, None), 7: (-1, None)}
 
 
-def parse_blocks(text):
-    """Ordered list of active leveling blocks. Body = header .. next blank/comment/header."""
-    lines = text.splitlines()
-    blocks, i, n = [], 0, len(lines)
-    while i < n:
-        m = BLOCK_RE.match(lines[i])
-        if not m:
-            i += 1
+def parse_blocks(path):
+    """Ordered list of active (Show/Hide) `$type->leveling->...` blocks with a
+    `$tier->` tag. Actions are dropped — the theme table owns colours/sounds/icons."""
+    blocks = []
+    for b in parse_file(path):
+        if b.command not in ("Show", "Hide") or not b.tier \
+                or not (b.type or "").startswith("leveling->") or b.type == "leveling->":
             continue
-        conds = OrderedDict()
-        j = i + 1
-        while j < n:
-            s = lines[j].strip()
-            if s == "" or s.startswith("#") or re.match(r'^(Show|Hide|Minimal)\b', s):
-                break
-            j += 1
-            if any(s.startswith(p) for p in STYLE_PREFIXES):
-                continue
-            key, _, val = s.partition(" ")
-            val = val.strip()
-            if key in conds:  # repeated key = AND
-                prev = conds[key]
-                conds[key] = (prev if isinstance(prev, list) else [prev]) + [val]
-            else:
-                conds[key] = val
-        blocks.append({"cmd": m.group("cmd"), "path": m.group("path"),
-                       "tier": m.group("tier"), "conds": conds, "order": len(blocks)})
-        i = j
+        blocks.append({"cmd": b.command, "path": b.type, "tier": b.tier,
+                       "conds": b.condition_map(), "order": len(blocks)})
     return blocks
 
 
@@ -291,8 +267,7 @@ def emit_armour_defense(per_file):
 
 
 def main():
-    text = FILTER_PATH.read_text(encoding="utf-8")
-    blocks = parse_blocks(text)
+    blocks = parse_blocks(FILTER_PATH)
 
     dropped_rgb, skipped_hide, unrouted = [], [], []
     per_file = {}  # relpath -> list of (order, theme_tier, key, tier_dict)
@@ -32,37 +32,30 @@ only see a unique's *base type*, never its name. We mirror that faithfully:
     valuable replicas/foulborns.
 
   * The mapping `_meta.localization.ch` is filled for every mapped base via the
-    GGPK EN->CH join (baseitemtypes.json x ch_simplified/baseitemtypes.json),
-    mirroring the backend's load_translations().
+    GGPK EN->CH join of filter_generation/translations.py (shared with the
+    backend's load_translations()).
 
 Idempotent: re-running fully regenerates both files. Run from the project root:
     python parsing_tool/import_uniques_from_filterblade.py
 """
 
 import json
-import re
+import sys
 from collections import OrderedDict, defaultdict
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation import translations  # noqa: E402
+from filter_generation.filter_parser import parse_file  # noqa: E402
+
 FILTER_PATH = PROJECT_ROOT / "data" / "from_filter_blade" / "3.28" / "FilterBlade_2_Semi-Strict.filter"
 BONUS_PATH = PROJECT_ROOT / "data" / "from_filter_blade" / "3.28" / "bonusItemInfo.json"
-GGPK_EN = PROJECT_ROOT / "data" / "from_ggpk" / "baseitemtypes.json"
-GGPK_CH = PROJECT_ROOT / "data" / "from_ggpk" / "ch_simplified" / "baseitemtypes.json"
 TIER_OUT = PROJECT_ROOT / "filter_generation" / "data" / "tier_definition" / "Uniques" / "General.json"
 MAP_OUT = PROJECT_ROOT / "filter_generation" / "data" / "base_mapping" / "Uniques" / "General.json"
 
 BASETYPES_CSV = PROJECT_ROOT / "data" / "from_filter_blade" / "3.28" / "BaseTypes.csv"
 
-# Style/action lines (everything else inside a block is a CONDITION — no
-# whitelist: an early whitelist silently dropped HasInfluence/SynthesisedItem
-# and made several detections over-match).
-STYLE_PREFIXES = (
-    "SetFontSize", "SetTextColor", "SetBorderColor", "SetBackgroundColor",
-    "PlayAlertSound", "PlayEffect", "MinimapIcon", "CustomAlertSound",
-    "DisableDropSound", "EnableDropSound", "Continue",
-)
-
 # Bases of these classes are stripped from the unique mapping/rules: they are
 # caught wholesale by class-level tiers in their own categories ("Unique Maps"
 # in Maps/Base Maps.json, "Unique Contracts" in Heist/Contracts.json).
@@ -164,40 +157,24 @@ SOUND_BY_TIER = {
 # the Maps/Heist sections come BEFORE Uniques, so those catches live as
 # class_condition tiers in their own ladders ("Unique Maps" in Maps/Base Maps.json,
 # "Unique Contracts" in Heist/Contracts.json).
-BLOCK_RE = re.compile(r"^(Show|Hide)\b.*\$type->uniques(?:->(?:replicas|foulborn))?\s.*\$tier->(\S+)")
-QUOTED_RE = re.compile(r'"([^"]+)"')
+UNIQUE_TYPES = {"uniques", "uniques->replicas", "uniques->foulborn"}
 
 
-def parse_blocks(text):
-    """Return ordered list of unique rule blocks parsed from the filter."""
-    lines = text.splitlines()
+def parse_blocks(path):
+    """Return ordered list of unique rule blocks parsed from the filter.
+
+    Every non-action line of a block is a CONDITION (no whitelist: an early
+    whitelist silently dropped HasInfluence/SynthesisedItem and made several
+    detections over-match); the BaseType list is split out as `bases`.
+    """
     blocks = []
-    i = 0
-    while i < len(lines):
-        m = BLOCK_RE.match(lines[i])
-        if not m:
-            i += 1
+    for b in parse_file(path):
+        if b.command not in ("Show", "Hide") or b.type not in UNIQUE_TYPES or not b.tier:
             continue
-        cmd, token = m.group(1), m.group(2)
-        conds = OrderedDict()
-        bases = []
-        j = i + 1
-        while j < len(lines) and (lines[j].startswith("\t") or lines[j].startswith("    ")):
-            s = lines[j].strip()
-            if s and not s.startswith("#") and not any(s.startswith(p) for p in STYLE_PREFIXES):
-                key, _, val = s.partition(" ")
-                val = val.strip()
-                if key == "BaseType":
-                    bases = QUOTED_RE.findall(s)
-                elif key in conds:
-                    # Repeated condition key (e.g. two HasInfluence lines = AND)
-                    prev = conds[key]
-                    conds[key] = (prev if isinstance(prev, list) else [prev]) + [val]
-                else:
-                    conds[key] = val
-            j += 1
-        blocks.append({"cmd": cmd, "token": token, "conds": conds, "bases": bases, "order": len(blocks)})
-        i = j
+        base_types = [c for c in b.conditions if c.key == "BaseType"]
+        bases = [v for v in base_types[-1].values if v] if base_types else []
+        blocks.append({"cmd": b.command, "token": b.tier, "conds": b.condition_map(skip=("BaseType",)),
+                       "bases": bases, "order": len(blocks)})
     return blocks
 
 
@@ -224,18 +201,9 @@ def load_base_classes():
 
 
 def load_zh_basetype_map():
-    """GGPK EN->CH base type name join (mirrors backend load_translations)."""
+    """GGPK EN->CH base type name join (shared with backend load_translations)."""
     try:
-        en_map = {}
-        for item in json.loads(GGPK_EN.read_text(encoding="utf-8")):
-            if "Id" in item and "Name" in item:
-                en_map[item["Id"]] = item["Name"]
-        zh = {}
-        for item in json.loads(GGPK_CH.read_text(encoding="utf-8")):
-            en_name = en_map.get(item.get("Id"))
-            if en_name and item.get("Name"):
-                zh[en_name] = item["Name"]
-        return zh
+        return translations.base_en2ch()
     except Exception as e:
         print(f"[warn] GGPK zh join unavailable: {e}")
         return {}
@@ -412,8 +380,7 @@ def load_multi_unique_bases():
 
 
 def main():
-    text = FILTER_PATH.read_text(encoding="utf-8")
-    blocks = parse_blocks(text)
+    blocks = parse_blocks(FILTER_PATH)
     multi = load_multi_unique_bases()
     zh_map = load_zh_basetype_map()
     base_classes = load_base_classes()
@@ -0,0 +1,264 @@
+"""Run the data-refresh steps of parsing_tool as one dependency-ordered pipeline.
+
+Each step declares the project-relative paths it reads (inputs) and writes
+(outputs). A step depends on every earlier step whose outputs overlap its
+inputs or outputs, or whose inputs overlap its outputs; steps with no path in
+common run in parallel. All steps share one DataTree (parsing_tool/data_tree.py),
+so filter_generation/data is parsed once, and every changed tree file is
+written once, after the last step — nothing is written when a step fails.
+build_items_db writes data/items_db.json itself (it is not part of the tree).
+
+A step is skipped when its script is unchanged and its inputs and outputs hash
+the same as at the end of the last successful run that included it (state in
+parsing_tool/.pipeline_state.json): re-running a finished refresh does nothing.
+
+Not steps, on purpose: update_mappings_3_28 rewrites _legacy/Legacy.json
+wholesale from one patch's CSV, and the older one-off fixup scripts
+(resort_tiers, update_hideable, ensure_t0_and_locks, ...) are historical
+migrations that are not idempotent against the current data.
+
+Usage:
+    python parsing_tool/pipeline.py             # run what is out of date
+    python parsing_tool/pipeline.py --force     # run every step
+    python parsing_tool/pipeline.py --only sync_base_translations --dry-run
+    python parsing_tool/pipeline.py --list
+"""
+import argparse
+import hashlib
+import io
+import json
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from parsing_tool import build_items_db  # noqa: E402
+from parsing_tool.data_tree import DataTree  # noqa: E402
+
+STATE_FILE = PROJECT_ROOT / "parsing_tool" / ".pipeline_state.json"
+TREE_PREFIX = "filter_generation/data/"
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    script: str                      # parsing_tool/<script>.py: its source is part of the skip key
+    run: Callable[[DataTree], None]
+    inputs: tuple[str, ...]          # project-relative files / folders
+    outputs: tuple[str, ...]
+    helpers: tuple[str, ...] = ()    # project-relative modules the script imports, also in the skip key
+
+
+def _build_items_db(tree):
+    build_items_db.build_items_db()
+
+
+def _sync_base_translations(tree):
+    from parsing_tool import sync_base_translations
+    sync_base_translations.run(tree)
+
+
+def _assign_endgame_tiers(tree):
+    from parsing_tool import assign_endgame_tiers
+    assign_endgame_tiers.run(tree)
+
+
+def _audit_fix_tier_ladders(tree):
+    from parsing_tool import audit_fix_tier_ladders
+    audit_fix_tier_ladders.run(tree, fix=True)
+
+
+STEPS = [
+    Step("build_items_db", "build_items_db", _build_items_db,
+         inputs=("data/from_ggpk", "data/from_filter_blade/3.28/BaseTypes.csv"),
+         outputs=("data/items_db.json", "data/items_db.columns.json"),
+         helpers=build_items_db.HELPERS),
+    Step("sync_base_translations", "sync_base_translations", _sync_base_translations,
+         inputs=("data/from_ggpk",),
+         outputs=("filter_generation/data/base_mapping",),
+         helpers=("parsing_tool/data_tree.py", "filter_generation/ggpk_data.py", "filter_generation/datc64.py",
+                  "filter_generation/translations.py")),
+    Step("assign_endgame_tiers", "assign_endgame_tiers", _assign_endgame_tiers,
+         inputs=("filter_generation/data/tier_definition/Equipment", "data/from_filter_blade/3.28/BaseTypes.csv"),
+         outputs=("filter_generation/data/base_mapping/Equipment",),
+         helpers=("parsing_tool/data_tree.py",)),
+    Step("audit_fix_tier_ladders", "audit_fix_tier_ladders", _audit_fix_tier_ladders,
+         inputs=(),
+         outputs=("filter_generation/data/tier_definition", "filter_generation/data/theme/sharket/sharket_theme.json"),
+         helpers=("parsing_tool/data_tree.py",)),
+]
+
+
+def _overlap(a: str, b: str) -> bool:
+    return a == b or a.startswith(b + "/") or b.startswith(a + "/")
+
+
+def _touches(xs, ys) -> bool:
+    return any(_overlap(x, y) for x in xs for y in ys)
+
+
+def dependencies(steps: list[Step]) -> dict[str, list[str]]:
+    """step name -> names of the earlier steps it must wait for."""
+    deps = {}
+    for j, later in enumerate(steps):
+        deps[later.name] = [
+            earlier.name for earlier in steps[:j]
+            if _touches(earlier.outputs, later.inputs + later.outputs)
+            or _touches(earlier.inputs, later.outputs)
+        ]
+    return deps
+
+
+def _file_digest(path: Path) -> str:
+    """Hash of the bytes of a file, or of every non-dot file under a folder."""
+    h = hashlib.sha1()
+    files = [path] if path.is_file() else sorted(
+        p for p in path.rglob("*")
+        if p.is_file() and not any(part.startswith(".") for part in p.relative_to(path).parts))
+    for p in files:
+        h.update(p.relative_to(PROJECT_ROOT).as_posix().encode("utf-8"))
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+def step_digest(step: Step, tree: DataTree) -> str:
+    """Hash of the step's script, its helper modules, and its inputs and outputs
+    as they are now (tree paths as the shared tree holds them, other paths from disk)."""
+    h = hashlib.sha1((PROJECT_ROOT / "parsing_tool" / f"{step.script}.py").read_bytes())
+    for rel in step.helpers:
+        h.update(rel.encode("utf-8"))
+        h.update(_file_digest(PROJECT_ROOT / rel).encode("utf-8"))
+    for rel in step.inputs + step.outputs:
+        h.update(rel.encode("utf-8"))
+        if rel.startswith(TREE_PREFIX):
+            h.update(tree.digest(rel[len(TREE_PREFIX):]).encode("utf-8"))
+        else:
+            h.update(_file_digest(PROJECT_ROOT / rel).encode("utf-8"))
+    return h.hexdigest()
+
+
+class _ThreadStdout(io.TextIOBase):
+    """sys.stdout replacement that sends each worker thread's prints to its own buffer."""
+
+    def __init__(self, real):
+        self.real = real
+        self.local = threading.local()
+
+    def write(self, s):
+        return getattr(self.local, "buf", self.real).write(s)
+
+    def flush(self):
+        getattr(self.local, "buf", self.real).flush()
+
+
+def _load_state() -> dict:
+    try:
+        return json.loads(STATE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def run_pipeline(steps: list[Step], force: bool = False, dry_run: bool = False, jobs: int = 4) -> int:
+    """Run `steps` over one shared DataTree; returns the process exit code."""
+    try:
+        sys.stdout.reconfigure(encoding="utf-8")
+    except Exception:
+        pass
+    deps = dependencies(steps)
+    names = {s.name for s in steps}
+    state = _load_state()
+    tree = DataTree()
+    out = _ThreadStdout(sys.stdout)
+    results = {}  # name -> "ran" | "skipped" | "failed" | "blocked"
+
+    def work(step: Step):
+        out.local.buf = buf = io.StringIO()
+        t0 = time.perf_counter()
+        try:
+            before = step_digest(step, tree)
+            if not force and state.get(step.name) == before:
+                return "skipped", buf.getvalue(), time.perf_counter() - t0
+            step.run(tree)
+            return "ran", buf.getvalue(), time.perf_counter() - t0
+        except Exception:
+            traceback.print_exc(file=buf)
+            return "failed", buf.getvalue(), time.perf_counter() - t0
+        finally:
+            del out.local.buf
+
+    pending = list(steps)
+    running = {}
+    sys.stdout = out
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            while pending or running:
+                for step in list(pending):
+                    waits = [d for d in deps[step.name] if d in names]
+                    if any(results.get(d) in ("failed", "blocked") for d in waits):
+                        results[step.name] = "blocked"
+                        pending.remove(step)
+                        out.real.write(f"=== {step.name}: not run (a step it depends on failed)\n")
+                    elif all(d in results for d in waits):
+                        running[pool.submit(work, step)] = step
+                        pending.remove(step)
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step = running.pop(future)
+                    status, log, seconds = future.result()
+                    results[step.name] = status
+                    out.real.write(f"=== {step.name}: {status} ({seconds:.2f}s)\n")
+                    if status != "skipped":
+                        out.real.write(log)
+    finally:
+        sys.stdout = out.real
+
+    if "failed" in results.values():
+        print("\n[FAILED] nothing written to filter_generation/data")
+        return 1
+    written = tree.flush(dry_run=dry_run)
+    verb = "would write" if dry_run else "wrote"
+    print(f"\n{verb} {len(written)} file(s)")
+    for rel in written:
+        print(f"  {rel}")
+    if not dry_run:
+        # digests of the final tree: a later step may have touched an earlier one's paths
+        state.update({step.name: step_digest(step, tree) for step in steps})
+        STATE_FILE.write_text(json.dumps(state, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return 0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the parsing_tool data-refresh steps in dependency order.")
+    ap.add_argument("--force", action="store_true", help="run steps even when their inputs are unchanged")
+    ap.add_argument("--dry-run", action="store_true", help="run the steps but write nothing")
+    ap.add_argument("--only", action="append", metavar="STEP", help="run only this step (repeatable)")
+    ap.add_argument("--jobs", type=int, default=4, help="steps run in parallel at most (default: 4)")
+    ap.add_argument("--list", action="store_true", help="list the steps and their dependencies")
+    args = ap.parse_args()
+
+    if args.list:
+        for step, waits in zip(STEPS, dependencies(STEPS).values()):
+            print(f"{step.name}" + (f"  (after {', '.join(waits)})" if waits else ""))
+            print(f"    in:  {', '.join(step.inputs) or '-'}")
+            print(f"    out: {', '.join(step.outputs)}")
+        return
+
+    steps = STEPS
+    if args.only:
+        unknown = set(args.only) - {s.name for s in STEPS}
+        if unknown:
+            ap.error(f"unknown step(s): {', '.join(sorted(unknown))}")
+        steps = [s for s in STEPS if s.name in args.only]
+    sys.exit(run_pipeline(steps, force=args.force, dry_run=args.dry_run, jobs=args.jobs))
+
+
+if __name__ == "__main__":
+    main()
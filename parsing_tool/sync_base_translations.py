@@ -6,11 +6,12 @@ The editor displays item base types via each base_mapping file's
 seeded from a third-party source (items_db.json) and are unreliable. This script
 rebuilds them from the authoritative GGPK dump:
 
-    data/from_ggpk/baseitemtypes.json              (English)
-    data/from_ggpk/ch_simplified/baseitemtypes.json (Simplified Chinese)
+    data/from_ggpk/baseitemtypes.json                (English)
+    data/from_ggpk/ch_simplified/baseitemtypes.datc64 (Simplified Chinese)
 
-Both are lists of rows keyed by the ``Id`` metadata path; joining on ``Id`` gives
-the canonical English-name -> Chinese-name map.
+joined on the ``Id`` metadata path by filter_generation/translations.py, which
+gives the canonical English-name -> Chinese-name map (first row wins when
+several rows share an English name).
 
 Rules:
   * Only mapping keys that exist in the GGPK EN->CH map are touched (fills missing,
@@ -22,16 +23,18 @@ Rules:
   * ``__class_name__`` and any non-mapping keys in localization.ch are preserved.
 
 A second pass syncs each file's ``_meta.item_class.ch`` and
-``localization.ch.__class_name__`` from itemclasses.json (joined on ``Id``).
+``localization.ch.__class_name__`` from the itemclasses tables (joined on ``Id``,
+translations.class_en2ch()).
 
-Idempotent: re-running after a successful run reports zero changes.
+Idempotent: re-running after a successful run reports zero changes. The
+passes work on a shared DataTree (parsing_tool/data_tree.py); each changed
+file is written once at the end — or by pipeline.py, which runs this step.
 
 Usage:
     python parsing_tool/sync_base_translations.py [--dry-run] [--no-class]
 """
 
 import argparse
-import json
 import sys
 from pathlib import Path
 
@@ -42,45 +45,29 @@ except Exception:
     pass
 
 ROOT = Path(__file__).resolve().parents[1]
-GGPK = ROOT / "data" / "from_ggpk"
-BASE_MAPPING = ROOT / "filter_generation" / "data" / "base_mapping"
+sys.path.insert(0, str(ROOT))
+from filter_generation import translations  # noqa: E402
+from parsing_tool.data_tree import DataTree  # noqa: E402
 
+BASE_MAPPING = "base_mapping"
 
-def load_json(path):
-    with open(path, encoding="utf-8") as fh:
-        return json.load(fh)
 
-
-def build_en2ch(en_rows, ch_rows, name_key="Name"):
-    """Join two GGPK tables on Id and return {en_name: ch_name}."""
-    id2en = {r["Id"]: r.get(name_key) for r in en_rows}
-    id2ch = {r["Id"]: r.get(name_key) for r in ch_rows}
-    en2ch = {}
-    for _id, en_name in id2en.items():
-        ch_name = id2ch.get(_id)
-        if en_name and ch_name:
-            # First write wins; GGPK Names are effectively unique per Id.
-            en2ch.setdefault(en_name, ch_name)
-    return en2ch
-
-
-def iter_mapping_files():
-    for path in sorted(BASE_MAPPING.rglob("*.json")):
-        if "_archived" in path.parts:
+def iter_mapping_files(tree):
+    """(display path, parsed doc) of every non-archived base_mapping file."""
+    for rel in tree.files(BASE_MAPPING):
+        if "_archived" in rel.split("/"):
             continue
-        yield path
+        yield rel[len(BASE_MAPPING) + 1:], tree.read(rel)
 
 
-def sync_base_types(en2ch, dry_run):
+def sync_base_types(tree, en2ch):
     total_filled = 0
     total_corrected = 0
     not_found = {}  # key -> [files]
     skipped_string = []
     changed_files = []
 
-    for path in iter_mapping_files():
-        rel = path.relative_to(BASE_MAPPING).as_posix()
-        data = load_json(path)
+    for rel, data in iter_mapping_files(tree):
         loc = data.get("_meta", {}).get("localization", {}).get("ch")
         if not isinstance(loc, dict):
             skipped_string.append(rel)
@@ -115,10 +102,6 @@ def sync_base_types(en2ch, dry_run):
                 print(f"      ~ {key}: {old} -> {new}")
             if len(corrections) > 6:
                 print(f"      ... +{len(corrections) - 6} more corrections")
-            if not dry_run:
-                with open(path, "w", encoding="utf-8") as fh:
-                    json.dump(data, fh, ensure_ascii=False, indent=2)
-                    fh.write("\n")
 
     return {
         "filled": total_filled,
@@ -129,12 +112,10 @@ def sync_base_types(en2ch, dry_run):
     }
 
 
-def sync_classes(cls_en2ch, dry_run):
+def sync_classes(tree, cls_en2ch):
     """Secondary pass: sync the canonical class label _meta.item_class.ch."""
     changed = 0
-    for path in iter_mapping_files():
-        rel = path.relative_to(BASE_MAPPING).as_posix()
-        data = load_json(path)
+    for rel, data in iter_mapping_files(tree):
         meta = data.get("_meta", {})
         ic = meta.get("item_class")
         if not isinstance(ic, dict):
@@ -152,27 +133,16 @@ def sync_classes(cls_en2ch, dry_run):
 
         if touched:
             changed += 1
-            if not dry_run:
-                with open(path, "w", encoding="utf-8") as fh:
-                    json.dump(data, fh, ensure_ascii=False, indent=2)
-                    fh.write("\n")
     return changed
 
 
-def main():
-    ap = argparse.ArgumentParser(description=__doc__)
-    ap.add_argument("--dry-run", action="store_true", help="report only; write nothing")
-    ap.add_argument("--no-class", action="store_true", help="skip the item_class sync pass")
-    args = ap.parse_args()
-
-    en2ch = build_en2ch(
-        load_json(GGPK / "baseitemtypes.json"),
-        load_json(GGPK / "ch_simplified" / "baseitemtypes.json"),
-    )
+def run(tree, sync_class=True):
+    """Both passes over `tree`; the caller flushes it."""
+    en2ch = translations.base_en2ch()
     print(f"Loaded {len(en2ch)} EN->CH base-type pairs from GGPK\n")
 
     print("=== Base-type translation sync ===")
-    res = sync_base_types(en2ch, args.dry_run)
+    res = sync_base_types(tree, en2ch)
 
     print("\n--- Summary ---")
     print(f"Files changed : {len(res['changed_files'])}")
@@ -185,15 +155,22 @@ def main():
     for key in sorted(nf):
         print(f"    {key}")
 
-    if not args.no_class:
-        cls_en2ch = build_en2ch(
-            load_json(GGPK / "itemclasses.json"),
-            load_json(GGPK / "ch_simplified" / "itemclasses.json"),
-        )
+    if sync_class:
+        cls_en2ch = translations.class_en2ch()
         print(f"\n=== Item-class sync ({len(cls_en2ch)} EN->CH class pairs) ===")
-        cls_changed = sync_classes(cls_en2ch, args.dry_run)
+        cls_changed = sync_classes(tree, cls_en2ch)
         print(f"\nItem-class entries changed: {cls_changed}")
 
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__)
+    ap.add_argument("--dry-run", action="store_true", help="report only; write nothing")
+    ap.add_argument("--no-class", action="store_true", help="skip the item_class sync pass")
+    args = ap.parse_args()
+
+    tree = DataTree()
+    run(tree, sync_class=not args.no_class)
+    tree.flush(dry_run=args.dry_run)
     if args.dry_run:
         print("\n[DRY RUN] No files were written.")
 
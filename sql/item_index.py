@@ -0,0 +1,411 @@
+"""Local SQLite index of the base_mapping tree for the backend's item endpoints.
+
+/api/search-items, /api/class-items and /api/tier-items used to rglob and
+parse every base_mapping file on each request. With ITEM_INDEX_DB set the
+backend answers them from this database instead (same response shapes):
+
+  items         the base-type catalog (BaseTypes.csv class / sub-type / stats,
+                GGPK Chinese name), passed in by the backend
+  files         one row per mapping file: rglob order, (mtime, size) stamp,
+                category name
+  occurrences   one row per (file, base) the file names (mapping or rule
+                target): its tiers in that file, per-file sound and CH name
+  tier_entries  one row per (file, base, tier): the mapping tier or the rule
+                (rule_index) that puts the base there, with its match mode
+  search_fts    FTS5 (trigram) over base names, Chinese names, class, tiers
+                and file of every catalog base and every mapping entry
+
+The catalog part is rebuilt when the catalog the backend loaded changes;
+mapping files are re-indexed one by one when their stamp changes (checked
+before each query), so a save is visible on the next request. Several
+backend workers can share one database file: it runs in WAL mode and a
+refresh re-checks the stamps inside its write transaction.
+
+Usage:
+    index = ItemIndex(Path("sql/item_index.db"), CONFIG_DATA_DIR / "base_mapping")
+    index.sync(catalog, category_map)     # catalog: name -> {class, sub_type, name_ch, details}
+    index.search("ring")
+"""
+import hashlib
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation.data_model import load_mapping  # noqa: E402
+
+INDEX_FORMAT = 1
+SEARCH_LIMIT = 50
+SOUND_KEYS = ("CustomAlertSound", "AlertSound", "DropSound", "PlayAlertSound")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS items (
+    name TEXT PRIMARY KEY,
+    item_class TEXT,              -- NULL: translated but not in BaseTypes.csv
+    sub_type TEXT NOT NULL,
+    name_ch TEXT NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_class ON items (item_class);
+CREATE TABLE IF NOT EXISTS files (
+    file TEXT PRIMARY KEY,        -- relative to base_mapping
+    ord INTEGER NOT NULL,
+    mtime_ns INTEGER,
+    size INTEGER,
+    category_ch TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS occurrences (
+    file TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mapping_tiers TEXT,           -- JSON list; NULL: only a rule target
+    tiers TEXT NOT NULL,          -- JSON list: mapping tiers, then rule tiers
+    sound TEXT,
+    name_ch TEXT,                 -- the file's own translation, NULL if none
+    PRIMARY KEY (file, name)
+);
+CREATE INDEX IF NOT EXISTS occurrences_name ON occurrences (name);
+CREATE TABLE IF NOT EXISTS tier_entries (
+    file TEXT NOT NULL,
+    name TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    tier_key TEXT NOT NULL,
+    rule_index INTEGER,
+    match_mode TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tier_entries_tier ON tier_entries (tier_key);
+CREATE INDEX IF NOT EXISTS tier_entries_file ON tier_entries (file, name, pos);
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5 (
+    name, name_ch, item_class, tiers, file, kind UNINDEXED, tokenize = 'trigram'
+);
+"""
+
+
+def _trans_of(meta_loc: dict) -> dict:
+    # same tolerance as the backend's item_trans_of()
+    t = meta_loc.get("ch_items") or meta_loc.get("ch") or {}
+    return t if isinstance(t, dict) else {}
+
+
+def _dedup(xs) -> list:
+    return list(dict.fromkeys(xs))
+
+
+def _file_rows(m) -> tuple[list, list]:
+    """(occurrence rows, tier_entry rows) of one parsed Mapping, in the
+    order the backend's scans produce them."""
+    trans = _trans_of(m.meta.get("localization", {}))
+    occurrences, entries = [], []
+    for name in sorted(m.involved()):
+        found = [(t, None, m.match_mode(name)) for t in m.tiers_of(name)]
+        sound = None
+        for r in m.rules:
+            if name not in r.targets:
+                continue
+            if r.tier:
+                found.append((r.tier, r.index, r.match_mode(name)))
+            if sound is None:
+                key = next((k for k in SOUND_KEYS if k in r.overrides), None)
+                if key:
+                    value = r.overrides[key]
+                    sound = value[0] if isinstance(value, list) and value else value
+        mapping_tiers = json.dumps(m.tiers[name], ensure_ascii=False) if name in m.tiers else None
+        occurrences.append((m.rel_path, name, mapping_tiers,
+                            json.dumps(_dedup(t for t, _, _ in found), ensure_ascii=False),
+                            None if sound is None else json.dumps(sound, ensure_ascii=False),
+                            trans.get(name) if name in trans else None))
+        entries.extend((m.rel_path, name, pos, t, idx, mode) for pos, (t, idx, mode) in enumerate(found))
+    return occurrences, entries
+
+
+class ItemIndex:
+    def __init__(self, db_path: Path, mappings_root: Path):
+        self.db_path = Path(db_path)
+        self.root = Path(mappings_root)
+        self._local = threading.local()
+        self._category_map = {}
+
+    # --- connection / schema ---
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _meta(self, conn, key):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _create(self, conn):
+        conn.executescript(SCHEMA)
+        fmt = self._meta(conn, "format")
+        if fmt is not None and fmt != str(INDEX_FORMAT):
+            conn.executescript("""
+                DROP TABLE IF EXISTS meta; DROP TABLE IF EXISTS items; DROP TABLE IF EXISTS files;
+                DROP TABLE IF EXISTS occurrences; DROP TABLE IF EXISTS tier_entries;
+                DROP TABLE IF EXISTS search_fts;
+            """)
+            conn.executescript(SCHEMA)
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('format', ?)", (str(INDEX_FORMAT),))
+
+    # --- building ---
+
+    def sync(self, catalog: dict, category_map: dict):
+        """Bring the database in line with `catalog` (name -> {"class",
+        "sub_type", "name_ch", "details"}), `category_map` (the backend's
+        CATEGORY_MAP, keyed "base_mapping/<file>") and the mapping files."""
+        self._category_map = dict(category_map)
+        digest = hashlib.sha1(json.dumps([catalog, self._category_map], sort_keys=True,
+                                         ensure_ascii=False).encode("utf-8")).hexdigest()
+        conn = self._conn()
+        self._create(conn)   # executescript() would commit an open transaction
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._meta(conn, "catalog") != digest:
+                conn.execute("DELETE FROM items")
+                conn.execute("DELETE FROM search_fts WHERE kind = 'base'")
+                conn.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?)", (
+                    (name, e.get("class"), e.get("sub_type", "Other"), e.get("name_ch", name),
+                     json.dumps(e.get("details", {}), ensure_ascii=False))
+                    for name, e in catalog.items()))
+                conn.execute("""
+                    INSERT INTO search_fts (name, name_ch, item_class, tiers, file, kind)
+                    SELECT name, name_ch, item_class, '', '', 'base' FROM items WHERE item_class IS NOT NULL
+                """)
+                # category names are stored per file: re-index every file
+                conn.execute("DELETE FROM files")
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('catalog', ?)", (digest,))
+            self._refresh(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _scan(self) -> list[tuple[str, int, int]]:
+        out = []
+        for path in self.root.rglob("*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            out.append((path.relative_to(self.root).as_posix(), st.st_mtime_ns, st.st_size))
+        return out
+
+    def _stale(self, conn, scan) -> bool:
+        indexed = {f: (o, t, s) for f, o, t, s in conn.execute("SELECT file, ord, mtime_ns, size FROM files")}
+        return indexed != {f: (o, t, s) for o, (f, t, s) in enumerate(scan)}
+
+    def _refresh(self, conn):
+        scan = self._scan()
+        indexed = {f: (t, s) for f, t, s in conn.execute("SELECT file, mtime_ns, size FROM files")}
+        current = {f for f, _, _ in scan}
+        gone = [f for f in indexed if f not in current]
+        for ord_, (rel, mtime_ns, size) in enumerate(scan):
+            if indexed.get(rel) == (mtime_ns, size):
+                conn.execute("UPDATE files SET ord = ? WHERE file = ?", (ord_, rel))
+                continue
+            self._drop_file(conn, rel)
+            try:
+                occurrences, entries = _file_rows(load_mapping(self.root / rel, self.root))
+            except (OSError, ValueError, TypeError, AttributeError):
+                occurrences, entries = [], []   # unreadable: indexed empty until it changes
+            conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+                         (rel, ord_, mtime_ns, size, self._category_map.get(f"base_mapping/{rel}", "")))
+            conn.executemany("INSERT INTO occurrences VALUES (?, ?, ?, ?, ?, ?)", occurrences)
+            conn.executemany("INSERT INTO tier_entries VALUES (?, ?, ?, ?, ?, ?)", entries)
+            conn.executemany(
+                "INSERT INTO search_fts (name, name_ch, item_class, tiers, file, kind) VALUES (?, ?, ?, ?, ?, 'mapping')",
+                ((o[1], o[5] or "", "", " ".join(json.loads(o[2])), rel)
+                 for o in occurrences if o[2] is not None))
+        for rel in gone:
+            self._drop_file(conn, rel)
+            conn.execute("DELETE FROM files WHERE file = ?", (rel,))
+
+    def _drop_file(self, conn, rel):
+        conn.execute("DELETE FROM occurrences WHERE file = ?", (rel,))
+        conn.execute("DELETE FROM tier_entries WHERE file = ?", (rel,))
+        conn.execute("DELETE FROM search_fts WHERE file = ? AND kind = 'mapping'", (rel,))
+
+    def refresh(self) -> sqlite3.Connection:
+        """Re-index the mapping files whose stamp changed; returns the
+        thread's connection for the query that follows."""
+        conn = self._conn()
+        scan = self._scan()
+        if not self._stale(conn, scan):
+            return conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._stale(conn, self._scan()):   # another worker may have just done it
+                self._refresh(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return conn
+
+    # --- queries (response shapes of the backend's JSON scans) ---
+
+    def search(self, q: str, limit: int = SEARCH_LIMIT) -> list[dict]:
+        """Bases whose EN or CH name contains `q` (case-insensitive): the
+        mapping entry of the last file (rglob order) that matches, else the
+        catalog entry; sorted by name."""
+        conn = self.refresh()
+        if len(q) >= 3:
+            # trigram MATCH: substring search straight from the index
+            rows = conn.execute("""
+                SELECT name, name_ch, file, kind FROM search_fts WHERE search_fts MATCH ?
+            """, ("{name name_ch} : " + '"' + q.replace('"', '""') + '"',)).fetchall()
+        else:
+            # below one trigram the index cannot help: LIKE scans the table
+            pattern = "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = conn.execute("""
+                SELECT name, name_ch, file, kind FROM search_fts
+                WHERE name LIKE ? ESCAPE '\\' OR name_ch LIKE ? ESCAPE '\\'
+            """, (pattern, pattern)).fetchall()
+
+        q_lower = q.lower()
+        ords = dict(conn.execute("SELECT file, ord FROM files"))
+        mapped, bases = {}, set()
+        for name, name_ch, file, kind in rows:
+            # the index folds case like str.lower() for the names in use; re-check exactly
+            if q_lower not in name.lower() and not (name_ch and q_lower in name_ch.lower()):
+                continue
+            if kind == "base":
+                bases.add(name)
+            elif name not in mapped or ords[file] > ords[mapped[name]]:
+                mapped[name] = file
+
+        results = {}
+        for name, file in mapped.items():
+            mapping_tiers, name_ch, category_ch = conn.execute("""
+                SELECT o.mapping_tiers, o.name_ch, f.category_ch
+                FROM occurrences o JOIN files f ON f.file = o.file WHERE o.file = ? AND o.name = ?
+            """, (file, name)).fetchone()
+            sub_type, details = self._item(conn, name)
+            tiers = json.loads(mapping_tiers)
+            results[name] = {
+                "name": name,
+                "name_ch": name_ch or name,
+                "current_tier": tiers[0] if tiers else None,
+                "current_tiers": tiers,
+                "category_ch": category_ch,
+                "sub_type": sub_type,
+                "source_file": file,
+                **details,
+            }
+        for name in bases - results.keys():
+            name_ch, sub_type, details = conn.execute(
+                "SELECT name_ch, sub_type, details FROM items WHERE name = ?", (name,)).fetchone()
+            results[name] = {
+                "name": name,
+                "name_ch": name_ch,
+                "current_tier": None,
+                "current_tiers": [],
+                "sub_type": sub_type,
+                "source_file": None,
+                **json.loads(details),
+            }
+        return sorted(results.values(), key=lambda x: x["name"])[:limit]
+
+    def _item(self, conn, name) -> tuple[str, dict]:
+        row = conn.execute("SELECT sub_type, details FROM items WHERE name = ? AND item_class IS NOT NULL",
+                           (name,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else ("Other", {})
+
+    def class_items(self, item_class: str) -> list[dict]:
+        """Every base of `item_class` ("All": every base) with its tiers and
+        one occurrence per mapping file naming it; sorted by name."""
+        conn = self.refresh()
+        if item_class == "All":
+            rows = conn.execute("""
+                SELECT name, name_ch, sub_type, details FROM items
+                WHERE item_class IS NOT NULL OR name IN (SELECT name FROM occurrences)
+                UNION
+                SELECT name, name, 'Other', '{}' FROM occurrences
+                WHERE name NOT IN (SELECT name FROM items)
+            """).fetchall()
+            occurrences = conn.execute("""
+                SELECT o.name, o.file, o.tiers, o.sound, o.name_ch
+                FROM occurrences o JOIN files f ON f.file = o.file ORDER BY f.ord
+            """).fetchall()
+        else:
+            rows = conn.execute("SELECT name, name_ch, sub_type, details FROM items WHERE item_class = ?",
+                                (item_class,)).fetchall()
+            occurrences = conn.execute("""
+                SELECT o.name, o.file, o.tiers, o.sound, o.name_ch
+                FROM occurrences o JOIN files f ON f.file = o.file JOIN items i ON i.name = o.name
+                WHERE i.item_class = ? ORDER BY f.ord
+            """, (item_class,)).fetchall()
+
+        item_data = {}
+        for name, name_ch, sub_type, details in sorted(rows):
+            item_data[name] = {
+                "name": name,
+                "name_ch": name_ch,
+                "sub_type": sub_type,
+                **json.loads(details),
+                "current_tier": [],
+                "source_file": None,
+                "occurrences": [],
+            }
+        for name, file, tiers, sound, file_name_ch in occurrences:
+            entry = item_data[name]
+            tiers = json.loads(tiers)
+            for t in tiers:
+                if t not in entry["current_tier"]:
+                    entry["current_tier"].append(t)
+            entry["source_file"] = file
+            entry["occurrences"].append({
+                "file": file,
+                "tiers": tiers,
+                "sound": None if sound is None else json.loads(sound),
+            })
+            if file_name_ch is not None:
+                entry["name_ch"] = file_name_ch
+        return list(item_data.values())
+
+    def tier_items(self, tier_keys: list[str], class_filter: str | None = None) -> dict[str, list]:
+        """tier key -> the (base, file) entries placed in that tier by the
+        mapping or a rule, in file order."""
+        conn = self.refresh()
+        keys = list(dict.fromkeys(tier_keys))
+        result = {k: [] for k in keys}
+        if not keys:
+            return result
+        marks = ", ".join("?" * len(keys))
+        sql = f"""
+            SELECT e.tier_key, e.name, e.file, e.rule_index, e.match_mode, o.tiers, o.name_ch,
+                   i.item_class, i.sub_type, i.details
+            FROM tier_entries e
+            JOIN files f ON f.file = e.file
+            JOIN occurrences o ON o.file = e.file AND o.name = e.name
+            LEFT JOIN items i ON i.name = e.name
+            WHERE e.tier_key IN ({marks}) {"AND i.item_class = ?" if class_filter else ""}
+            ORDER BY f.ord, e.name, e.pos
+        """
+        params = keys + ([class_filter] if class_filter else [])
+        parsed = {}   # (file, name) -> (current tiers, details): shared by the item's entries
+        for (tier_key, name, file, rule_index, match_mode, tiers, name_ch,
+             item_class, sub_type, details) in conn.execute(sql, params):
+            if (file, name) not in parsed:
+                parsed[file, name] = (json.loads(tiers), json.loads(details) if item_class is not None else {})
+            current_tiers, details = parsed[file, name]
+            result[tier_key].append({
+                "name": name,
+                "name_ch": name_ch if name_ch is not None else name,
+                "sub_type": sub_type if item_class is not None else "Other",
+                "current_tiers": list(current_tiers),
+                "source": file,
+                "rule_index": rule_index,
+                "match_mode": match_mode,
+                **details,
+            })
+        return result
@@ -1,9 +1,31 @@
-import json
+"""Sync the GGPK reference tables into the database (item_classes, base_types).
+
+The English dumps are streamed row by row (ggpk_data.stream: the .json dump is
+decoded incrementally, never loaded whole) and compared with the database in
+batches of --batch-size rows keyed by `_rid`: new rows are inserted, changed
+rows updated, unchanged rows not touched, and rows whose `_rid` left the dump
+deleted. Chinese names are joined on the GGPK Id (filter_generation/
+translations.py), not on `_rid`: the two clients' row orders differ.
+
+A row taking an Id still held by another `_rid` (rows inserted mid-table by a
+patch shift the ones after them) would collide with the unique `id` column, so
+only those rows are parked under a placeholder id / held back and get their
+final id after the whole table was streamed and stale rows were deleted.
+Everything else is written batch by batch: memory holds one batch, the seen
+`_rid`s and the (patch-sized) list of collisions.
+
+Usage (from sql/; DATABASE_URL from the environment or .env, e.g. sqlite:///poe_filter.db):
+    python json_to_sql.py                # incremental sync
+    python json_to_sql.py --reset        # drop and recreate the tables first
+"""
+import argparse
 import logging
+import sys
+import time
 from pathlib import Path
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import sessionmaker
 from sql_model import ItemClass, BaseType, ENGINE, Base
-from sqlalchemy import text
 from dotenv import load_dotenv
 
 # --- Load environment and setup logging ---
@@ -21,100 +43,131 @@ logger = logging.getLogger(__name__)
 
 # --- Paths ---
 ROOT = Path(__file__).resolve().parent
-DATA_PATH = ROOT / "../data/from_ggpk/ch"
-DATA_ENG = ROOT / "../data/from_ggpk"
-
-FILES = ["itemclasses.json", "baseitemtypes.json"]
-
-# --- DB setup ---
-Base.metadata.create_all(ENGINE)
-Session = sessionmaker(bind=ENGINE)
-
-# Drop and recreate all tables
-Base.metadata.drop_all(ENGINE)
-Base.metadata.create_all(ENGINE)
-
-# --- English name mapping ---
-with open(DATA_ENG / "baseitemtypes.json", "r", encoding="utf-8") as f:
-    en_data = json.load(f)
-eng_basetype_name = {item["_rid"]: item["Name"] for item in en_data}
-
-# --- Model map ---
-MODEL_MAP = {
-    "itemclasses.json": ItemClass,
-    "baseitemtypes.json": BaseType,
-}
-
-# --- Load data ---
-data = {}
-for filename in FILES:
-    path = DATA_PATH / filename
-    with open(path, "r", encoding="utf-8") as f:
-        data[filename] = json.load(f)
-
-# --- Parsers ---
-def parse_item_classes(data):
-    return [
-        {
-            "id": e["_rid"],
-            "name": e["Id"],
-            "text": e["Name"],
+sys.path.insert(0, str(ROOT.parent))
+from filter_generation import ggpk_data, translations  # noqa: E402
+
+BATCH_SIZE = 500
+
+
+# --- Row builders (one GGPK row + the table's Chinese names -> one table row) ---
+def item_class_row(e, names_ch):
+    name = e["Name"] or ""
+    return {
+        "_rid": e["_rid"],
+        "id": e["Id"],
+        "text": name,
+        "text_ch": names_ch.get(name),
+    }
+
+def base_type_row(e, names_ch):
+    return {
+        "_rid": e["_rid"],
+        "item_class_rid": e["ItemClassesKey"],
+        "id": e["Id"],
+        "text": e["Name"] or "",
+        "text_ch": names_ch.get(e["Id"]),
+    }
+
+# model, GGPK table, columns read, row builder, Chinese-name lookup — in foreign-key order
+TABLES = [
+    (ItemClass, "itemclasses", ["Id", "Name"], item_class_row, translations.class_en2ch),
+    (BaseType, "baseitemtypes", ["Id", "Name", "ItemClassesKey"], base_type_row, translations.base_ch_by_id),
+]
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def sync_table(session, model, rows, batch_size=BATCH_SIZE):
+    """Bring `model`'s table in line with `rows` (dicts with every column).
+    Returns {"inserted", "updated", "unchanged", "deleted", "rows"}."""
+    cols = [c.name for c in model.__table__.columns]
+    rid = model.__table__.c._rid
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0, "rows": 0}
+    seen = set()
+    deferred_inserts, deferred_ids = [], []
+    id_col = model.__table__.c.id
+
+    for batch in _batches(rows, batch_size):
+        stats["rows"] += len(batch)
+        seen.update(r["_rid"] for r in batch)
+        current = {
+            row["_rid"]: row
+            for row in session.execute(
+                select(*model.__table__.columns).where(rid.in_([r["_rid"] for r in batch]))
+            ).mappings()
         }
-        for e in data
-    ]
-
-def parse_base_item_types(data):
-    return [
-        {
-            "id": e["_rid"],
-            "name": eng_basetype_name.get(e["_rid"], f"Unknown_{e['_rid']}"),
-            "text": e["Name"],
-            "item_class_id": e.get("ItemClassesKey"),
-            "width": e.get("Width"),
-            "height": e.get("Height"),
-        }
-        for e in data
-    ]
-
-PARSERS = {
-    "itemclasses.json": parse_item_classes,
-    "baseitemtypes.json": parse_base_item_types,
-}
-
-# --- Parse all files ---
-parsed_results = {}
-for filename, json_data in data.items():
-    parser = PARSERS.get(filename)
-    if parser:
-        parsed_results[filename] = parser(json_data)
-    else:
-        logger.warning(f"No parser defined for {filename}")
-
-# --- Clean old data safely ---
-with ENGINE.begin() as conn:
-    logger.info("Clearing old data...")
-    conn.execute(text("DELETE FROM base_types;"))
-    conn.execute(text("DELETE FROM item_classes;"))
-    logger.info("Tables cleared.")
-
-# --- Insert data ---
-try:
-    with Session.begin() as session:
-        for filename in ["itemclasses.json", "baseitemtypes.json"]:
-            rows = parsed_results.get(filename)
-            model = MODEL_MAP.get(filename)
-            if not rows or not model:
-                logger.warning(f"Skipping {filename} — no rows or model.")
-                continue
-
-            logger.info(f"Inserting {len(rows)} rows into {model.__tablename__}...")
-            try:
-                session.bulk_insert_mappings(model, rows)
-                logger.info(f"Inserted {filename}")
-            except Exception as e:
-                logger.error(f"Error inserting {filename}: {e}")
-                session.rollback()
-                raise #end process
-    logger.info("All inserts committed successfully.")
-except Exception as e:
-    logger.exception("Critical failure during insert process:")
\ No newline at end of file
+        holders = dict(session.execute(select(id_col, rid).where(id_col.in_([r["id"] for r in batch]))).all())
+        inserts, updates = [], []
+        for row in batch:
+            old = current.get(row["_rid"])
+            taken = holders.get(row["id"], row["_rid"]) != row["_rid"]
+            if old is None:
+                (deferred_inserts if taken else inserts).append(row)
+            elif any(old[c] != row[c] for c in cols):
+                if taken:
+                    # park under a placeholder until the holder moved on
+                    deferred_ids.append({"_rid": row["_rid"], "id": row["id"]})
+                    row = {**row, "id": f"~{row['_rid']}"}
+                updates.append(row)
+            else:
+                stats["unchanged"] += 1
+        if updates:
+            session.execute(update(model), updates)
+        if inserts:
+            session.execute(insert(model), inserts)
+        stats["updated"] += len(updates)
+        stats["inserted"] += len(inserts)
+
+    stale = [r for (r,) in session.execute(select(rid)) if r not in seen]
+    for start in range(0, len(stale), batch_size):
+        session.execute(delete(model).where(rid.in_(stale[start:start + batch_size])))
+    stats["deleted"] = len(stale)
+
+    for start in range(0, len(deferred_ids), batch_size):
+        session.execute(update(model), deferred_ids[start:start + batch_size])
+    for start in range(0, len(deferred_inserts), batch_size):
+        session.execute(insert(model), deferred_inserts[start:start + batch_size])
+    stats["inserted"] += len(deferred_inserts)
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sync the GGPK reference tables into the database.")
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE, help=f"rows per statement (default: {BATCH_SIZE})")
+    ap.add_argument("--reset", action="store_true", help="drop and recreate the tables before the import")
+    args = ap.parse_args()
+
+    if args.reset:
+        Base.metadata.drop_all(ENGINE)
+    Base.metadata.create_all(ENGINE)
+    Session = sessionmaker(bind=ENGINE)
+
+    try:
+        with Session.begin() as session:
+            for model, table, columns, build, lookup in TABLES:
+                t0 = time.perf_counter()
+                names_ch = lookup()  # once per table: each call re-checks the source files
+                rows = (build(e, names_ch) for e in ggpk_data.stream(table, columns))
+                stats = sync_table(session, model, rows, args.batch_size)
+                elapsed = time.perf_counter() - t0
+                logger.info(
+                    f"{model.__tablename__}: {stats['rows']} rows, {stats['inserted']} inserted, "
+                    f"{stats['updated']} updated, {stats['deleted']} deleted, {stats['unchanged']} unchanged "
+                    f"({elapsed:.2f}s, {stats['rows'] / elapsed if elapsed else 0:.0f} rows/s)")
+        logger.info("Sync committed successfully.")
+    except Exception:
+        logger.exception("Critical failure during sync, nothing committed:")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,54 +1,130 @@
 # load_items.py
+"""Load the scraped unique items (data/out/items.csv) into unique_items.
+
+Each row names a unique and its base type (English); the base must already be
+in base_types (json_to_sql.py). Rows whose base is unknown are reported and
+skipped, rows already in the table are left alone.
+
+Two modes, same result:
+  * default: row by row, one SELECT (and INSERT) per row through the ORM;
+  * --bulk:  preloads the base-name and existing-unique key maps with one
+    SELECT each, computes the missing rows in memory and inserts them in
+    batched executemany statements (native insert-or-ignore on SQLite /
+    MySQL) inside one transaction.
+
+Usage (from sql/; DATABASE_URL from the environment or .env):
+    DATABASE_URL=sqlite:///poe_filter.db python load_items.py --bulk
+"""
 from __future__ import annotations
+import argparse
+import time
 import pandas as pd
-from sqlalchemy import select
-from sql_model import get_session, ItemClass, BaseType, Item
+from sqlalchemy import func, insert, select
+from sql_model import get_session, BaseType, UniqueItem
 
 CSV_PATH = "../data/out/items.csv"
+BATCH_SIZE = 1000
+
+def get_base(sess, name: str) -> BaseType | None:
+    # base names repeat across GGPK rows (alternate art, variants): take the first
+    return sess.scalar(select(BaseType).where(BaseType.text == name).order_by(BaseType._rid).limit(1))
 
-def get_or_create_class(sess, name: str) -> ItemClass:
-    ic = sess.scalar(select(ItemClass).where(ItemClass.name == name))
-    if ic: return ic
-    ic = ItemClass(name=name)
-    sess.add(ic); sess.flush()
-    return ic
-
-def get_or_create_base(sess, item_class: ItemClass, name: str) -> BaseType:
-    bt = sess.scalar(select(BaseType).where(
-        BaseType.item_class_id == item_class.id, BaseType.name == name))
-    if bt:
-        return bt
-    bt = BaseType(item_class_id=item_class.id, name=name)
-    sess.add(bt); sess.flush()
-    return bt
-
-def get_or_create_item(sess, base_type: BaseType, rarity: str, unique_name: str|None) -> Item:
-    it = sess.scalar(select(Item).where(
-        Item.base_type_id == base_type.id,
-        Item.rarity == rarity,
-        Item.unique_name == unique_name
+def get_or_create_unique(sess, base_type: BaseType, unique_name: str) -> tuple[UniqueItem, bool]:
+    it = sess.scalar(select(UniqueItem).where(
+        UniqueItem.base_type_id == base_type.id,
+        UniqueItem.unique_name == unique_name
     ))
     if it:
-        return it
-    it = Item(base_type_id=base_type.id, rarity=rarity, unique_name=unique_name)
+        return it, False
+    next_rid = (sess.scalar(select(func.max(UniqueItem._rid))) or 0) + 1
+    it = UniqueItem(_rid=next_rid, base_type_id=base_type.id, unique_name=unique_name)
     sess.add(it); sess.flush()
-    return it
+    return it, True
 
-def main():
-    df = pd.read_csv(CSV_PATH)
-    required = {"rarity","unique_name","base_type","item_class"}
+def read_rows(csv_path: str) -> list[tuple[str, str]]:
+    """(unique_name, base_type) of every unique row of the CSV."""
+    df = pd.read_csv(csv_path)
+    required = {"rarity", "unique_name", "base_type"}
     missing = required - set(df.columns)
     if missing:
         raise SystemExit(f"CSV missing columns: {missing}")
+    df = df[df["rarity"] == "Unique"].dropna(subset=["unique_name", "base_type"])
+    return list(zip(df["unique_name"], df["base_type"]))
+
+def load_row_by_row(sess, rows) -> tuple[int, list[str]]:
+    inserted, unknown = 0, []
+    for unique_name, base_name in rows:
+        base = get_base(sess, base_name)
+        if base is None:
+            unknown.append(base_name)
+            continue
+        _, created = get_or_create_unique(sess, base, unique_name)
+        inserted += created
+    return inserted, unknown
+
+def _insert_ignore(sess):
+    """INSERT for unique_items that skips rows hitting uniq_item, where the dialect has one.
 
+    SQLite targets uniq_item only, so a _rid collision still raises. MySQL's
+    INSERT IGNORE cannot be narrowed to one key; load_bulk counts what it
+    actually inserted from the statement rowcounts instead."""
+    dialect = sess.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(UniqueItem.__table__).on_conflict_do_nothing(index_elements=["base_type_id", "unique_name"])
+    if dialect == "mysql":
+        return insert(UniqueItem.__table__).prefix_with("IGNORE")
+    return insert(UniqueItem.__table__)
+
+def load_bulk(sess, rows, batch_size: int = BATCH_SIZE) -> tuple[int, list[str]]:
+    base_ids = {}
+    for text, base_id in sess.execute(select(BaseType.text, BaseType.id).order_by(BaseType._rid)):
+        base_ids.setdefault(text, base_id)
+    existing = {tuple(row) for row in sess.execute(select(UniqueItem.base_type_id, UniqueItem.unique_name))}
+    next_rid = (sess.scalar(select(func.max(UniqueItem._rid))) or 0) + 1
+
+    new_rows, unknown = [], []
+    for unique_name, base_name in rows:
+        base_id = base_ids.get(base_name)
+        if base_id is None:
+            unknown.append(base_name)
+            continue
+        key = (base_id, unique_name)
+        if key in existing:
+            continue
+        existing.add(key)
+        new_rows.append({"_rid": next_rid, "base_type_id": base_id, "unique_name": unique_name})
+        next_rid += 1
+
+    stmt = _insert_ignore(sess)
+    inserted = 0
+    for start in range(0, len(new_rows), batch_size):
+        batch = new_rows[start:start + batch_size]
+        rowcount = sess.execute(stmt, batch).rowcount
+        inserted += rowcount if rowcount >= 0 else len(batch)
+    return inserted, unknown
+
+def main():
+    ap = argparse.ArgumentParser(description="Load data/out/items.csv into unique_items.")
+    ap.add_argument("--csv", default=CSV_PATH, help=f"items CSV (default: {CSV_PATH})")
+    ap.add_argument("--bulk", action="store_true", help="preload keys and insert in batches, one transaction")
+    ap.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = ap.parse_args()
+
+    rows = read_rows(args.csv)
+    t0 = time.perf_counter()
     with get_session() as sess:
-        for row in df.itertuples(index=False):
-            item_class = get_or_create_class(sess, row.item_class)
-            base = get_or_create_base(sess, item_class, row.base_type)
-            unique_name = row.unique_name if row.rarity == "Unique" else None
-            _ = get_or_create_item(sess, base, row.rarity or "Other", unique_name)
+        if args.bulk:
+            inserted, unknown = load_bulk(sess, rows, args.batch_size)
+        else:
+            inserted, unknown = load_row_by_row(sess, rows)
         sess.commit()
-    print("Import complete ✅")
+    elapsed = time.perf_counter() - t0
+
+    if unknown:
+        print(f"Skipped {len(unknown)} rows with a base type not in base_types, e.g. {sorted(set(unknown))[:5]}")
+    print(f"Import complete ✅ {len(rows)} rows, {inserted} inserted in {elapsed:.2f}s "
+          f"({len(rows) / elapsed if elapsed else 0:.0f} rows/s)")
 
 if __name__ == "__main__":
     main()
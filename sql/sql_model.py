@@ -18,9 +18,11 @@ class Base(DeclarativeBase): pass
 class ItemClass(Base):
     __tablename__ = "item_classes"
     _rid: Mapped[int] = mapped_column(INTEGER(unsigned=True), primary_key=True,autoincrement=False)
+    id: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
 
-    text: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
-    text_ch:Mapped[str] = mapped_column(String(128), unique=True, nullable=True)
+    # not unique: the client has duplicate class names (Maps, Incubators, "")
+    text: Mapped[str] = mapped_column(String(128), nullable=False)
+    text_ch:Mapped[str] = mapped_column(String(128), nullable=True)
 
     base_types: Mapped[list["BaseType"]] = relationship(back_populates="item_class")
 
@@ -28,7 +30,7 @@ class BaseType(Base):
     __tablename__ = "base_types"
     _rid: Mapped[int] = mapped_column(INTEGER(unsigned=True), primary_key=True,autoincrement=False)
     item_class_rid: Mapped[int] = mapped_column(ForeignKey("item_classes._rid"), nullable=False)
-    id = Mapped[str] = mapped_column(String(128), nullable=False)
+    id: Mapped[str] = mapped_column(String(128), unique=True, nullable=False)
 
     text: Mapped[str] = mapped_column(String(128), nullable=False)
     text_ch: Mapped[str] = mapped_column(String(128), nullable=True)
@@ -43,7 +45,7 @@ class BaseType(Base):
 class UniqueItem(Base):
     __tablename__ = "unique_items"
     _rid: Mapped[int] = mapped_column(BIGINT(unsigned=True), primary_key=True,autoincrement=False)
-    base_type_id: Mapped[int] = mapped_column(ForeignKey("base_types.id"), nullable=False)
+    base_type_id: Mapped[str] = mapped_column(String(128), ForeignKey("base_types.id"), nullable=False)
 
     unique_name: Mapped[str] = mapped_column(String(128), nullable=False)
     unique_name_ch:Mapped[str] = mapped_column(String(128), nullable=True)
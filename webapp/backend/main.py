@@ -1,7 +1,7 @@
-from fastapi import FastAPI, HTTPException, Body, Request
+from fastapi import FastAPI, HTTPException, Body, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 import os
 import json
 import shutil
@@ -10,7 +10,13 @@ import sys
 import time
 import re
 import csv
+import hashlib
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 from typing import List, Dict, Optional
 from pydantic import BaseModel
@@ -43,9 +49,20 @@ CONFIG_DATA_DIR = (FILTER_GEN_DIR / "data").resolve()
 SOUND_FILES_DIR = (PROJECT_ROOT / "sound_files").resolve()
 DATA_DIR = PROJECT_ROOT / "data"
 
+sys.path.insert(0, str(PROJECT_ROOT))
+from filter_generation import ggpk_data  # noqa: E402
+from filter_generation import simulate as drop_sim  # noqa: E402
+from filter_generation import translations  # noqa: E402
+from filter_generation import validate as data_validate  # noqa: E402
+from filter_generation.data_model import load_mappings  # noqa: E402
+from sql.item_index import ItemIndex  # noqa: E402
+
 VENV_PYTHON = PROJECT_ROOT / ".venv" / "Scripts" / "python.exe" if sys.platform == "win32" else PROJECT_ROOT / ".venv" / "bin" / "python"
 PYTHON_EXECUTABLE = str(VENV_PYTHON) if VENV_PYTHON.exists() else sys.executable
 
+# SQLite index answering the item endpoints (sql/item_index.py); unset: scan the JSON tree
+ITEM_INDEX_DB = os.environ.get("ITEM_INDEX_DB")
+
 # --- Globals ---
 ITEM_CLASSES = []
 CLASS_TO_ITEMS = {} # Class -> Set(BaseTypes)
@@ -65,6 +82,7 @@ UNIQUE_BASE_INFO = {}         # base_type -> [{unique, text, priority, ruleLink,
 
 FILTER_CONDITIONS = []        # resolved condition schema (flat, with `classes`)
 RULE_TEMPLATE_CATEGORIES = [] # grouped condition templates for /api/rule-templates
+ITEM_INDEX = None             # ItemIndex when ITEM_INDEX_DB is set
 
 # --- Middleware ---
 app.add_middleware(
@@ -92,6 +110,23 @@ def safe_join(base: Path, path: str):
         raise HTTPException(status_code=400, detail="Invalid path traversal")
     return full_path
 
+def validate_save(file_path: Path, content: dict) -> list:
+    """Validator diagnostics for one base_mapping / tier_definition file as it
+    would be after saving `content` (the rest of the tree read from disk).
+    Reported alongside the save; saves are not blocked."""
+    try:
+        rel = file_path.relative_to(CONFIG_DATA_DIR).as_posix()
+    except ValueError:
+        return []
+    head, _, file_rel = rel.partition("/")
+    if head not in ("base_mapping", "tier_definition") or not rel.endswith(".json"):
+        return []
+    try:
+        return [d for d in data_validate.validate_tree(overlay={rel: content}) if d["file"] == file_rel]
+    except Exception as e:
+        print(f"Validator failed on {rel}: {e}")
+        return []
+
 def load_base_types():
     global ITEM_CLASSES, CLASS_TO_ITEMS, ITEM_TO_CLASS, ITEM_SUBTYPES
     csv_path = DATA_DIR / "from_filter_blade" / "3.28" / "BaseTypes.csv"
@@ -164,34 +199,12 @@ def load_base_types():
         print(f"Error loading BaseTypes.csv: {e}")
 
 def load_translations():
-    global ITEM_TRANSLATIONS
     print("Loading translations...")
-    en_map = {}
-    try:
-        en_path = DATA_DIR / "from_ggpk" / "baseitemtypes.json"
-        if en_path.exists():
-            with open(en_path, "r", encoding="utf-8") as f:
-                en_data = json.load(f)
-                for item in en_data:
-                    if "Id" in item and "Name" in item:
-                        en_map[item["Id"]] = item["Name"]
-    except Exception as e: 
-        print(f"Error loading EN base types: {e}")
-        return
-
     try:
-        ch_path = DATA_DIR / "from_ggpk" / "ch_simplified" / "baseitemtypes.json"
-        if ch_path.exists():
-            with open(ch_path, "r", encoding="utf-8") as f:
-                ch_data = json.load(f)
-                for item in ch_data:
-                    if "Id" in item and "Name" in item:
-                        en_name = en_map.get(item["Id"])
-                        if en_name:
-                            ITEM_TRANSLATIONS[en_name] = item["Name"]
+        ITEM_TRANSLATIONS.update(translations.base_en2ch())
         print(f"Loaded {len(ITEM_TRANSLATIONS)} translations.")
     except Exception as e:
-        print(f"Error loading CH base types: {e}")
+        print(f"Error loading base type translations: {e}")
 
 def item_trans_of(meta_loc: dict) -> dict:
     """Per-item zh dict from a mapping file's _meta.localization, tolerating both
@@ -203,6 +216,26 @@ def item_trans_of(meta_loc: dict) -> dict:
     return t if isinstance(t, dict) else {}
 
 
+def load_item_index():
+    """Build / refresh the SQLite item index from the catalog loaded above and
+    the base_mapping tree (only with ITEM_INDEX_DB set)."""
+    global ITEM_INDEX
+    if not ITEM_INDEX_DB:
+        return
+    print(f"Loading item index {ITEM_INDEX_DB}...")
+    catalog = {name: {"class": None, "sub_type": "Other", "name_ch": name_ch, "details": {}}
+               for name, name_ch in ITEM_TRANSLATIONS.items()}
+    for name, cls in ITEM_TO_CLASS.items():
+        catalog[name] = {"class": cls, "sub_type": ITEM_SUBTYPES.get(name, "Other"),
+                         "name_ch": ITEM_TRANSLATIONS.get(name, name), "details": ITEM_DETAILS.get(name, {})}
+    try:
+        index = ItemIndex(Path(ITEM_INDEX_DB), CONFIG_DATA_DIR / "base_mapping")
+        index.sync(catalog, CATEGORY_MAP)
+        ITEM_INDEX = index
+        print(f"Item index ready ({len(catalog)} bases).")
+    except Exception as e:
+        print(f"Error loading item index, scanning JSON instead: {e}")
+
 def load_category_map():
     global CATEGORY_MAP
     print("Loading category map...")
@@ -390,54 +423,21 @@ def load_filter_conditions():
         print(f"Error loading filter_conditions.yaml: {e}")
 
 
-def _norm_unique_name(name: str) -> str:
-    """Join key for unique names: the GGPK Words rows differ from trade-data
-    names by curly apostrophes (Tasalio’s), casing (Jack, The Axe) and stray
-    whitespace (Demigod's Immortality<space>)."""
-    return " ".join(name.replace("’", "'").split()).lower()
-
-
 def load_unique_name_translations():
-    """EN->CH unique item names, normalized-keyed (see _norm_unique_name).
+    """EN->CH unique item names, keyed by translations.norm_unique_name().
 
     Sources: GGPK `words` dump (ch_simplified alone suffices: "Text"=EN,
     "Text2"=zh, Wordlist 6 = unique names) + the hand-maintained supplement
     data/unique_name_zh_extra.json for names absent from the dump (fill the
     empty values there as translations are found). Fails soft if absent.
     """
-    trans = {}
-    ch_path = DATA_DIR / "from_ggpk" / "ch_simplified" / "words.json"
-    if ch_path.exists():
-        try:
-            with open(ch_path, "r", encoding="utf-8") as f:
-                ch_data = json.load(f)
-            for row in ch_data:
-                if row.get("Wordlist") != 6:
-                    continue
-                en_name = row.get("Text")
-                ch_name = row.get("Text2")
-                if en_name and ch_name and ch_name.strip() != en_name.strip():
-                    trans[_norm_unique_name(en_name)] = ch_name.strip()
-            print(f"Loaded {len(trans)} unique-name translations from words.json.")
-        except Exception as e:
-            print(f"Error loading words.json translations: {e}")
-
-    extra_path = DATA_DIR / "unique_name_zh_extra.json"
-    if extra_path.exists():
-        try:
-            with open(extra_path, "r", encoding="utf-8") as f:
-                extra = json.load(f)
-            n = 0
-            for en_name, ch_name in extra.items():
-                if en_name.startswith("_") or not ch_name:
-                    continue  # meta keys / not-yet-filled entries
-                trans[_norm_unique_name(en_name)] = ch_name
-                n += 1
-            if n:
-                print(f"Merged {n} supplemental unique-name translations.")
-        except Exception as e:
-            print(f"Error loading unique_name_zh_extra.json: {e}")
-    return trans
+    try:
+        trans = translations.unique_en2ch()
+        print(f"Loaded {len(trans)} unique-name translations.")
+        return trans
+    except Exception as e:
+        print(f"Error loading unique-name translations: {e}")
+        return {}
 
 
 def load_bonus_item_info():
@@ -490,7 +490,7 @@ def load_bonus_item_info():
                                 "ruleLink": uinfo.get("ruleLink"),
                                 "hideInHoverBox": uinfo.get("hideInHoverBox", False),
                             }
-                            uname_key = _norm_unique_name(uname)
+                            uname_key = translations.norm_unique_name(uname)
                             if uname_key in unique_trans:
                                 cand["name_ch"] = unique_trans[uname_key]
                             candidates.append(cand)
@@ -570,7 +570,7 @@ def load_bonus_item_info():
                         "ruleLink": None,
                         "hideInHoverBox": False,
                     }
-                    name_key = _norm_unique_name(name)
+                    name_key = translations.norm_unique_name(name)
                     if name_key in unique_trans:
                         cand["name_ch"] = unique_trans[name_key]
                     entry["uniques"].append(cand)
@@ -589,25 +589,19 @@ def load_bonus_item_info():
             print(f"Error merging unique_base_db.json: {e}")
 
 def load_stack_sizes():
-    """Patch ITEM_DETAILS with max_stack_size from currencyitems.json."""
+    """Patch ITEM_DETAILS with max_stack_size from the GGPK currencyitems table."""
     try:
-        base_path = DATA_DIR / "from_ggpk" / "baseitemtypes.json"
-        currency_path = DATA_DIR / "from_ggpk" / "currencyitems.json"
-        if not base_path.exists() or not currency_path.exists():
+        try:
+            base = ggpk_data.columns("baseitemtypes", ["Id", "Name"])
+            currency = ggpk_data.columns("currencyitems", ["BaseItemTypesKey", "StackSize"])
+        except FileNotFoundError:
             print("Warning: stack size source files not found, skipping.")
             return
 
-        with open(base_path, "r", encoding="utf-8") as f:
-            base_data = json.load(f)
-        rid_to_name = {item["_rid"]: item["Name"] for item in base_data if "_rid" in item and "Name" in item}
-
-        with open(currency_path, "r", encoding="utf-8") as f:
-            currency_data = json.load(f)
+        rid_to_name = {rid: name for rid, name in zip(base["_rid"], base["Name"]) if name is not None}
 
         count = 0
-        for entry in currency_data:
-            rid = entry.get("BaseItemTypesKey")
-            stack_size = entry.get("StackSize")
+        for rid, stack_size in zip(currency["BaseItemTypesKey"], currency["StackSize"]):
             if rid is None or stack_size is None:
                 continue
             name = rid_to_name.get(rid)
@@ -751,6 +745,8 @@ def get_filter_conditions():
 @app.get("/api/search-items")
 def search_items(q: str):
     if not q: return {"results": []}
+    if ITEM_INDEX is not None:
+        return {"results": ITEM_INDEX.search(q)}
     q_lower = q.lower()
     results_map = {} # name -> result_obj (to deduplicate)
 
@@ -815,6 +811,8 @@ def get_item_classes():
 
 @app.get("/api/class-items/{item_class}")
 def get_items_by_class(item_class: str):
+    if ITEM_INDEX is not None:
+        return {"items": ITEM_INDEX.class_items(item_class)}
     # Items to explicitly include (based on class filter)
     if item_class == "All":
         requested_items = set(ITEM_TO_CLASS.keys())
@@ -837,81 +835,69 @@ def get_items_by_class(item_class: str):
         }
 
     # Scan all mappings to find current tiers AND include tiered items from other classes
-    mappings_dir = CONFIG_DATA_DIR / "base_mapping"
-    for file_path in mappings_dir.rglob("*.json"):
+    # (parsed models are cached per file and re-read only after a save).
+    for m in load_mappings(CONFIG_DATA_DIR / "base_mapping"):
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                mapping = data.get("mapping", {})
-                rules = data.get("rules", [])
-                trans = item_trans_of(data.get("_meta", {}).get("localization", {}))
-                
-                # Items specifically in this category
-                all_possible_items = set(mapping.keys())
-                for r in rules:
-                    all_possible_items.update(r.get("targets", []))
-
-                for item_name in all_possible_items:
-                    # If item is not in requested_items but is in a mapping/rule, we still want it!
-                    if item_name not in item_data:
-                        # ...but only when viewing "All". For a specific class, don't inject
-                        # tiered items that belong to other classes (e.g. Corpses tiered in
-                        # Currency/Corpses.json must not leak into every class's list).
-                        if item_class != "All" and ITEM_TO_CLASS.get(item_name) != item_class:
-                            continue
-                        details = ITEM_DETAILS.get(item_name, {})
-                        item_data[item_name] = {
-                            "name": item_name,
-                            "name_ch": ITEM_TRANSLATIONS.get(item_name, item_name),
-                            "sub_type": ITEM_SUBTYPES.get(item_name, "Other"),
-                            **details,
-                            "current_tier": [],
-                            "source_file": None,
-                            "occurrences": []
-                        }
+            trans = item_trans_of(m.meta.get("localization", {}))
+
+            # Items specifically in this category
+            for item_name in m.involved():
+                # If item is not in requested_items but is in a mapping/rule, we still want it!
+                if item_name not in item_data:
+                    # ...but only when viewing "All". For a specific class, don't inject
+                    # tiered items that belong to other classes (e.g. Corpses tiered in
+                    # Currency/Corpses.json must not leak into every class's list).
+                    if item_class != "All" and ITEM_TO_CLASS.get(item_name) != item_class:
+                        continue
+                    details = ITEM_DETAILS.get(item_name, {})
+                    item_data[item_name] = {
+                        "name": item_name,
+                        "name_ch": ITEM_TRANSLATIONS.get(item_name, item_name),
+                        "sub_type": ITEM_SUBTYPES.get(item_name, "Other"),
+                        **details,
+                        "current_tier": [],
+                        "source_file": None,
+                        "occurrences": []
+                    }
 
-                    current_list = item_data[item_name]["current_tier"]
-                    rel_file = file_path.relative_to(mappings_dir).as_posix()
-                    # Tiers this item occupies WITHIN this specific file (for the occurrence).
-                    file_tiers: list[str] = []
-
-                    # Add base mapping tier
-                    if item_name in mapping:
-                        t_val = mapping[item_name]
-                        tiers = t_val if isinstance(t_val, list) else [t_val]
-                        for t in tiers:
-                            if t not in current_list:
-                                current_list.append(t)
-                            if t not in file_tiers:
-                                file_tiers.append(t)
-
-                    # Add rule tiers + detect an existing per-file sound rule for this item
-                    file_sound = None
-                    for r in rules:
-                        r_targets = r.get("targets", [])
-                        if r_targets and item_name in r_targets:
-                            r_over = r.get("overrides", {})
-                            tier_override = r_over.get("Tier")
-                            if tier_override and tier_override not in current_list:
-                                current_list.append(tier_override)
-                            if tier_override and tier_override not in file_tiers:
-                                file_tiers.append(tier_override)
-                            if file_sound is None:
-                                sound_key = next((k for k in ("CustomAlertSound", "AlertSound", "DropSound", "PlayAlertSound") if k in r_over), None)
-                                if sound_key:
-                                    sval = r_over[sound_key]
-                                    file_sound = sval[0] if isinstance(sval, list) and sval else sval
-
-                    item_data[item_name]["source_file"] = rel_file
-                    # Record one occurrence per (item, file) so the editor can target each
-                    # repeated basetype independently (per-file rule overrides).
-                    item_data[item_name]["occurrences"].append({
-                        "file": rel_file,
-                        "tiers": file_tiers,
-                        "sound": file_sound
-                    })
-                    if item_name in trans:
-                        item_data[item_name]["name_ch"] = trans[item_name]
+                current_list = item_data[item_name]["current_tier"]
+                rel_file = m.rel_path
+                # Tiers this item occupies WITHIN this specific file (for the occurrence).
+                file_tiers: list[str] = []
+
+                # Add base mapping tier
+                for t in m.tiers_of(item_name):
+                    if t not in current_list:
+                        current_list.append(t)
+                    if t not in file_tiers:
+                        file_tiers.append(t)
+
+                # Add rule tiers + detect an existing per-file sound rule for this item
+                file_sound = None
+                for r in m.rules:
+                    if item_name in r.targets:
+                        r_over = r.overrides
+                        tier_override = r.tier
+                        if tier_override and tier_override not in current_list:
+                            current_list.append(tier_override)
+                        if tier_override and tier_override not in file_tiers:
+                            file_tiers.append(tier_override)
+                        if file_sound is None:
+                            sound_key = next((k for k in ("CustomAlertSound", "AlertSound", "DropSound", "PlayAlertSound") if k in r_over), None)
+                            if sound_key:
+                                sval = r_over[sound_key]
+                                file_sound = sval[0] if isinstance(sval, list) and sval else sval
+
+                item_data[item_name]["source_file"] = rel_file
+                # Record one occurrence per (item, file) so the editor can target each
+                # repeated basetype independently (per-file rule overrides).
+                item_data[item_name]["occurrences"].append({
+                    "file": rel_file,
+                    "tiers": file_tiers,
+                    "sound": file_sound
+                })
+                if item_name in trans:
+                    item_data[item_name]["name_ch"] = trans[item_name]
         except: continue
         
     return {"items": list(item_data.values())}
@@ -995,8 +981,9 @@ def update_item_tier(request: UpdateItemTierRequest):
                 mapping[request.item_name] = request.new_tier
             
         data["mapping"] = mapping
+        diagnostics = validate_save(file_path, data)
         with open(file_path, "w", encoding="utf-8") as f: json.dump(data, f, indent=2, ensure_ascii=False)
-        return {"message": "Success"}
+        return {"message": "Success", "diagnostics": diagnostics}
     except Exception as e: raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/update-item-override")
@@ -1016,76 +1003,63 @@ def update_item_override(request: UpdateItemOverrideRequest):
         if not found:
             rules.append({"targets": [request.item_name], "conditions": {}, "overrides": request.overrides, "comment": f"Override for {request.item_name}"})
         data["rules"] = rules
+        diagnostics = validate_save(file_path, data)
         with open(file_path, "w", encoding="utf-8") as f: json.dump(data, f, indent=2, ensure_ascii=False)
-        return {"message": "Success"}
+        return {"message": "Success", "diagnostics": diagnostics}
     except Exception as e: raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/tier-items")
 def get_items_by_tier(request: TierItemsRequest):
+    if ITEM_INDEX is not None:
+        return {"items": ITEM_INDEX.tier_items(request.tier_keys, request.class_filter)}
     tier_keys_set = set(request.tier_keys)
     result = {k: [] for k in tier_keys_set}
-    mappings_dir = CONFIG_DATA_DIR / "base_mapping"
-    for file_path in mappings_dir.rglob("*.json"):
+    for m in load_mappings(CONFIG_DATA_DIR / "base_mapping"):
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                mapping = data.get("mapping", {})
-                rules = data.get("rules", [])
-                meta = data.get("_meta", {})
-                trans = item_trans_of(meta.get("localization", {}))
-                match_modes = meta.get("match_modes", {})
-                
-                # Evaluate all possible items in this file context
-                all_involved = set(mapping.keys())
-                for r in rules: all_involved.update(r.get("targets", []))
-
-                for item_name in all_involved:
-                    if request.class_filter:
-                        item_class = ITEM_TO_CLASS.get(item_name)
-                        if item_class != request.class_filter:
-                            continue
-                    
-                    # Calculate final tiers for this item
-                    final_tier_entries = [] # List of (tier_key, rule_index or None)
-
-                    if item_name in mapping:
-                        t_val = mapping[item_name]
-                        base_tiers = t_val if isinstance(t_val, list) else [t_val]
-                        for t in base_tiers:
-                            final_tier_entries.append((t, None))
+            trans = item_trans_of(m.meta.get("localization", {}))
+
+            # Evaluate all possible items in this file context
+            for item_name in m.involved():
+                if request.class_filter:
+                    item_class = ITEM_TO_CLASS.get(item_name)
+                    if item_class != request.class_filter:
+                        continue
                     
-                    for idx, r in enumerate(rules):
-                        r_t = r.get("targets", [])
-                        # ONLY match if targets is a non-empty list
-                        if isinstance(r_t, list) and len(r_t) > 0 and item_name in r_t:
-                            t_over = r.get("overrides", {}).get("Tier")
-                            if t_over:
-                                final_tier_entries.append((t_over, idx))
-
-                    # Distribute to results
-                    for tier_key, rule_idx in final_tier_entries:
-                        if tier_key in tier_keys_set:
-                            details = ITEM_DETAILS.get(item_name, {})
-                            # Determine current_tiers list for frontend display
-                            current_tiers_list = list(set(t for t, _ in final_tier_entries))
+                # Calculate final tiers for this item
+                final_tier_entries = [] # List of (tier_key, rule_index or None)
+
+                for t in m.tiers_of(item_name):
+                    final_tier_entries.append((t, None))
+
+                for r in m.rules:
+                    # targets is always a list on the model; empty never matches
+                    if item_name in r.targets and r.tier:
+                        final_tier_entries.append((r.tier, r.index))
+
+                # Distribute to results
+                for tier_key, rule_idx in final_tier_entries:
+                    if tier_key in tier_keys_set:
+                        details = ITEM_DETAILS.get(item_name, {})
+                        # Determine current_tiers list for frontend display
+                        current_tiers_list = list(set(t for t, _ in final_tier_entries))
                             
-                            # Resolve match mode: from rule or from base mapping meta
-                            item_mode = "exact"
-                            if rule_idx is not None:
-                                item_mode = rules[rule_idx].get("targetMatchModes", {}).get(item_name, "exact")
-                            else:
-                                item_mode = match_modes.get(item_name, "exact")
-
-                            result[tier_key].append({
-                                "name": item_name, 
-                                "name_ch": trans.get(item_name, item_name), 
-                                "sub_type": ITEM_SUBTYPES.get(item_name, "Other"),
-                                "current_tiers": current_tiers_list,
-                                "source": file_path.relative_to(mappings_dir).as_posix(),
-                                "rule_index": rule_idx,
-                                "match_mode": item_mode,
-                                **details
-                            })
+                        # Resolve match mode: from rule or from base mapping meta
+                        item_mode = "exact"
+                        if rule_idx is not None:
+                            item_mode = m.rules[rule_idx].match_mode(item_name)
+                        else:
+                            item_mode = m.match_mode(item_name)
+
+                        result[tier_key].append({
+                            "name": item_name, 
+                            "name_ch": trans.get(item_name, item_name), 
+                            "sub_type": ITEM_SUBTYPES.get(item_name, "Other"),
+                            "current_tiers": current_tiers_list,
+                            "source": m.rel_path,
+                            "rule_index": rule_idx,
+                            "match_mode": item_mode,
+                            **details
+                        })
         except: continue
     
     return {"items": result}
@@ -1106,13 +1080,31 @@ def generate_filter_file(request: GenerateRequest = Body(default=GenerateRequest
         "--strictness", request.strictness,
         "--leveling-selection", json.dumps(request.leveling_selection or {}),
     ]
+    # Cross-reference check of the data tree first: data the generator would
+    # silently skip is reported with the result (generation still runs).
+    try:
+        diagnostics = data_validate.validate_tree()
+        validation = {"counts": data_validate.summarize(diagnostics),
+                      "errors": [d for d in diagnostics if d["severity"] == "error"]}
+    except Exception as e:
+        print(f"Validator failed before generation: {e}")
+        validation = None
     try:
         result = subprocess.run(cmd, check=True, cwd=PROJECT_ROOT,
                                 capture_output=True, text=True)
-        return {"message": "Success", "output": result.stdout}
+        return {"message": "Success", "output": result.stdout, "validation": validation}
     except subprocess.CalledProcessError as e:
         raise HTTPException(status_code=500, detail=(e.stdout or "") + (e.stderr or ""))
 
+@app.get("/api/validate")
+def validate_data(file: Optional[str] = None):
+    """Whole-tree validator diagnostics (filter_generation/validate.py); `file`
+    narrows them to one base_mapping / tier_definition relative path."""
+    diagnostics = data_validate.validate_tree()
+    if file:
+        diagnostics = [d for d in diagnostics if d["file"] == file]
+    return {"diagnostics": diagnostics, "counts": data_validate.summarize(diagnostics)}
+
 @app.get("/api/class-hierarchy")
 def get_class_hierarchy():
     return {"hierarchy": CLASS_HIERARCHY_TREE}
@@ -1162,6 +1154,28 @@ def get_simulator_bundle():
 
     return {"mappings": mappings, "tiers": tier_defs}
 
+class SimulateRequest(BaseModel):
+    items: List[dict]                 # ItemProps-shaped dicts (see simulatorEngine.ts)
+    area_level: Optional[int] = None
+    source: str = "tree"              # "tree" = data tree, "filter" = generated complete_filter.filter
+
+@app.post("/api/simulate")
+def simulate_items(request: SimulateRequest):
+    """Batch drop simulation (filter_generation/simulate.py). `tree` results match
+    simulatorEngine.ts evaluateItem; `filter` evaluates the last generated filter."""
+    if request.source == "tree":
+        sim = drop_sim.load_tree(CONFIG_DATA_DIR)
+    elif request.source == "filter":
+        path = FILTER_GEN_DIR / "complete_filter.filter"
+        if not path.exists(): raise HTTPException(status_code=404, detail="Not generated")
+        sim = drop_sim.FilterSimulator.from_file(path)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown source: {request.source}")
+    if any(not isinstance(it.get("name"), str) for it in request.items):
+        raise HTTPException(status_code=400, detail="Every item needs a string 'name'")
+    # Plain JSON already; skip jsonable_encoder, which dominates on large batches.
+    return JSONResponse({"results": sim.run(drop_sim.ItemBatch(request.items), request.area_level)})
+
 # --- Snapshot Export / Import (lossless filter round-trip) ---
 
 SNAPSHOT_FORMAT = "sharket-filter-snapshot"
@@ -1170,6 +1184,99 @@ SNAPSHOT_VERSION = 1
 SNAPSHOT_DIR_ROOTS = ("tier_definition", "base_mapping", "theme")
 IMPORT_BACKUP_DIR = CONFIG_DATA_DIR / "_import_backup"
 
+# Content-addressed import backups. Every file version an import overwrites or
+# deletes is stored ONCE under objects/<aa>/<sha256> (raw bytes, so a restore is
+# byte-exact); each import adds a small manifest mapping the paths it touched to
+# their pre-import object (null = the file did not exist yet). Identical versions
+# across imports share one object, so disk use and backup time grow with the
+# number of distinct changes, not with the number of imports. Legacy
+# `_import_backup/<timestamp>/` copy folders are left as they are.
+BACKUP_OBJECTS_DIR = IMPORT_BACKUP_DIR / "objects"
+BACKUP_MANIFESTS_DIR = IMPORT_BACKUP_DIR / "manifests"
+IMPORT_BACKUP_KEEP = 50          # newest manifests always kept...
+IMPORT_BACKUP_MAX_AGE_DAYS = 90  # ...older-than-this ones beyond that are pruned
+_BACKUP_ID_RE = re.compile(r"^\d{8}_\d{6}_\d{6}$")
+# Object stores, manifest writes, GC and restores run under this lock: GC must
+# never see an object whose manifest is not written yet, nor a chain being restored.
+_backup_lock = threading.RLock()
+
+def _backup_object_path(digest: str) -> Path:
+    return BACKUP_OBJECTS_DIR / digest[:2] / digest
+
+def _backup_manifest_path(backup_id: str) -> Path:
+    return BACKUP_MANIFESTS_DIR / f"{backup_id}.json"
+
+def _list_backup_ids() -> list:
+    """Manifest ids, oldest first (ids are zero-padded timestamps)."""
+    if not BACKUP_MANIFESTS_DIR.is_dir():
+        return []
+    return sorted(p.stem for p in BACKUP_MANIFESTS_DIR.glob("*.json") if _BACKUP_ID_RE.match(p.stem))
+
+def _read_backup_manifest(backup_id: str) -> dict:
+    try:
+        return json.loads(_backup_manifest_path(backup_id).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def _store_backup_object(rel_path: str):
+    """Store the current bytes of a data file; returns its digest, or None if absent."""
+    path = CONFIG_DATA_DIR / rel_path
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    digest = hashlib.sha256(raw).hexdigest()
+    obj = _backup_object_path(digest)
+    if not obj.exists():
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        tmp = obj.with_name(f"{digest}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(raw)
+        os.replace(tmp, obj)
+    return digest
+
+def _write_backup_manifest(rel_paths: list, kind: str, extra: Optional[dict] = None, prune: bool = True):
+    """Snapshot the current state of `rel_paths` into the object store and record
+    it as one manifest. Returns the manifest id (None when nothing was touched)."""
+    if not rel_paths:
+        return None
+    with _backup_lock:
+        with ThreadPoolExecutor(SNAPSHOT_WORKERS) as pool:
+            digests = list(pool.map(_store_backup_object, rel_paths))
+        backup_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        manifest = {
+            "id": backup_id,
+            "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "kind": kind,
+            **(extra or {}),
+            "files": dict(sorted(zip(rel_paths, digests))),
+        }
+        BACKUP_MANIFESTS_DIR.mkdir(parents=True, exist_ok=True)
+        _backup_manifest_path(backup_id).write_text(
+            json.dumps(manifest, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        if prune:
+            _prune_import_backups()
+    return backup_id
+
+def _prune_import_backups(protect: frozenset = frozenset()):
+    """Retention + GC: drop manifests beyond the newest IMPORT_BACKUP_KEEP that are
+    older than IMPORT_BACKUP_MAX_AGE_DAYS (always the oldest first, so the kept
+    history stays contiguous and restorable; stops at an id in `protect`), then
+    delete unreferenced objects."""
+    with _backup_lock:
+        ids = _list_backup_ids()
+        cutoff = (datetime.now().timestamp() - IMPORT_BACKUP_MAX_AGE_DAYS * 86400)
+        for backup_id in ids[:max(0, len(ids) - IMPORT_BACKUP_KEEP)]:
+            if backup_id in protect or datetime.strptime(backup_id, "%Y%m%d_%H%M%S_%f").timestamp() >= cutoff:
+                break
+            _backup_manifest_path(backup_id).unlink(missing_ok=True)
+        referenced = set()
+        for backup_id in _list_backup_ids():
+            referenced.update(d for d in _read_backup_manifest(backup_id).get("files", {}).values() if d)
+        if BACKUP_OBJECTS_DIR.is_dir():
+            for obj in BACKUP_OBJECTS_DIR.glob("*/*"):
+                if obj.suffix != ".tmp" and obj.name not in referenced:
+                    obj.unlink(missing_ok=True)
+
 class ImportSnapshotRequest(BaseModel):
     files: Dict[str, dict]
     # Directory prefixes within which local files absent from `files` are deleted,
@@ -1177,37 +1284,171 @@ class ImportSnapshotRequest(BaseModel):
     # base_mapping/ only — theme presets added locally are never deleted.
     sync_prefixes: List[str] = []
 
-@app.get("/api/export-snapshot")
-def export_snapshot():
-    """Full user-editable data tree as a versioned bundle, used by the export
-    sidecar/embedded snapshot. Walks the real directories so future additions
-    (e.g. variant overlay folders) are captured automatically."""
-    files = {}
+# Persisted per-file canonical-hash index: rel_path -> [mtime_ns, size, sha256].
+# A file whose stat still matches its entry is known-unchanged (and known-valid
+# JSON) without being opened, so export can stream its raw bytes and import can
+# diff by hash instead of re-parsing the whole tree. Stale entries are simply
+# recomputed - edits made by other endpoints never need to touch the index.
+SNAPSHOT_HASH_INDEX = CONFIG_DATA_DIR / "_snapshot_index.json"
+SNAPSHOT_WORKERS = min(8, (os.cpu_count() or 1) + 4)
+_hash_index = None
+_hash_index_lock = threading.Lock()
+
+def _canonical_hash(content) -> str:
+    """Order-insensitive content hash: equal iff the parsed JSON compares equal
+    (the semantics of the old `json.load(f) == content` check)."""
+    blob = json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def _get_hash_index() -> dict:
+    global _hash_index
+    with _hash_index_lock:
+        if _hash_index is None:
+            try:
+                _hash_index = json.loads(SNAPSHOT_HASH_INDEX.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                _hash_index = {}
+        return _hash_index
+
+def _save_hash_index():
+    index = _get_hash_index()
+    with _hash_index_lock:
+        tmp = SNAPSHOT_HASH_INDEX.with_suffix(".tmp")
+        tmp.write_text(json.dumps(index, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, SNAPSHOT_HASH_INDEX)
+
+def _record_hash(rel_path: str, path: Path, digest: str):
+    st = path.stat()
+    index = _get_hash_index()
+    with _hash_index_lock:
+        index[rel_path] = [st.st_mtime_ns, st.st_size, digest]
+
+def _forget_hash(rel_path: str):
+    index = _get_hash_index()
+    with _hash_index_lock:
+        index.pop(rel_path, None)
+
+def _local_hash(rel_path: str, read_raw: bool = False):
+    """(sha256, raw bytes or None) of a local data file; (None, None) if absent.
+    Only files whose stat no longer matches the index are read and parsed.
+    Raises ValueError/OSError for unreadable or unparsable files."""
+    path = CONFIG_DATA_DIR / rel_path
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None, None
+    entry = _get_hash_index().get(rel_path)
+    if entry and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+        return entry[2], (path.read_bytes() if read_raw else None)
+    raw = path.read_bytes()
+    digest = _canonical_hash(json.loads(raw.decode("utf-8")))
+    _record_hash(rel_path, path, digest)
+    return digest, (raw if read_raw else None)
+
+def _snapshot_relpaths() -> list:
+    rels = []
     for root in SNAPSHOT_DIR_ROOTS:
         root_dir = CONFIG_DATA_DIR / root
         if not root_dir.is_dir():
             continue
         for file_path in sorted(root_dir.rglob("*.json")):
-            try:
-                rel_path = file_path.relative_to(CONFIG_DATA_DIR).as_posix()
-                with open(file_path, "r", encoding="utf-8") as f:
-                    files[rel_path] = json.load(f)
-            except Exception as e:
-                print(f"WARN: snapshot skipped {file_path}: {e}")
-    settings_path = CONFIG_DATA_DIR / "settings.json"
-    if settings_path.exists():
+            rels.append(file_path.relative_to(CONFIG_DATA_DIR).as_posix())
+    if (CONFIG_DATA_DIR / "settings.json").exists():
+        rels.append("settings.json")
+    return rels
+
+def _iter_snapshot_files():
+    """(rel_path, raw bytes) for every snapshot file in export order, read in
+    parallel. Unparsable files are skipped with a warning, as before.
+
+    At most 2 * SNAPSHOT_WORKERS reads run ahead of the consumer, so a slow
+    client does not pull the whole tree into memory; when the consumer stops
+    early (client disconnect) the reads not yet started are cancelled."""
+    def read(rel):
         try:
-            with open(settings_path, "r", encoding="utf-8") as f:
-                files["settings.json"] = json.load(f)
+            return _local_hash(rel, read_raw=True)[1]
         except Exception as e:
-            print(f"WARN: snapshot skipped settings.json: {e}")
+            print(f"WARN: snapshot skipped {rel}: {e}")
+            return None
+    rels = iter(_snapshot_relpaths())
+    pool = ThreadPoolExecutor(SNAPSHOT_WORKERS)
+    window = deque()
+    try:
+        for rel in islice(rels, 2 * SNAPSHOT_WORKERS):
+            window.append((rel, pool.submit(read, rel)))
+        while window:
+            rel, future = window.popleft()
+            for nxt in islice(rels, 1):
+                window.append((nxt, pool.submit(read, nxt)))
+            raw = future.result()
+            if raw is not None:
+                yield rel, raw
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    _save_hash_index()
+
+def _snapshot_header() -> dict:
     return {
         "format": SNAPSHOT_FORMAT,
         "version": SNAPSHOT_VERSION,
         "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "files": files,
     }
 
+def _stream_snapshot_json():
+    # Same document as before ({format, version, created, files}), but each file's
+    # bytes are spliced in verbatim instead of being parsed and re-serialized.
+    head = json.dumps(_snapshot_header(), ensure_ascii=False)
+    yield (head[:-1] + ', "files": {').encode("utf-8")
+    sep = b""
+    for rel, raw in _iter_snapshot_files():
+        yield sep + json.dumps(rel, ensure_ascii=False).encode("utf-8") + b": " + raw.strip()
+        sep = b", "
+    yield b"}}"
+
+class _ZipSink:
+    """Write-only target for zipfile. Not seekable, so zipfile emits data
+    descriptors and the archive can be drained entry by entry."""
+    def __init__(self):
+        self._chunks = []
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    def flush(self):
+        pass
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+def _stream_snapshot_zip():
+    # One deflated entry per data file (same relative paths as the JSON `files`
+    # keys) plus a manifest.json carrying the format header + file list.
+    sink = _ZipSink()
+    names = []
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for rel, raw in _iter_snapshot_files():
+            zf.writestr(rel, raw)
+            names.append(rel)
+            yield sink.drain()
+        zf.writestr("manifest.json", json.dumps({**_snapshot_header(), "files": names}, ensure_ascii=False, indent=2))
+    yield sink.drain()
+
+@app.get("/api/export-snapshot")
+def export_snapshot(fmt: str = Query("json", alias="format")):
+    """Full user-editable data tree as a versioned bundle, used by the export
+    sidecar/embedded snapshot. Walks the real directories so future additions
+    (e.g. variant overlay folders) are captured automatically. Streamed:
+    `?format=json` (default) is the {format, version, created, files} document,
+    `?format=zip` a deflated archive with one entry per file."""
+    if fmt == "json":
+        return StreamingResponse(_stream_snapshot_json(), media_type="application/json")
+    if fmt == "zip":
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return StreamingResponse(
+            _stream_snapshot_zip(), media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="snapshot_{stamp}.zip"'})
+    raise HTTPException(status_code=400, detail=f"Unknown snapshot format: {fmt}")
+
 def _validate_snapshot_relpath(relpath: str, allow_settings: bool = True) -> str:
     rel = relpath.replace("\\", "/").strip()
     if allow_settings and rel == "settings.json":
@@ -1251,46 +1492,106 @@ def import_snapshot(request: ImportSnapshotRequest):
             if rel_path not in files:
                 to_delete.append(rel_path)
 
-    # Files whose parsed content already matches are skipped entirely, so a
-    # restore only touches (and only backs up) what actually changed.
-    to_write = {}
-    unchanged = []
-    for rel_path, content in files.items():
-        path = CONFIG_DATA_DIR / rel_path
+    # Files whose canonical hash already matches are skipped entirely, so a
+    # restore only touches (and only backs up) what actually changed. Local hashes
+    # come from the persisted index (a stat per unchanged file, no parse).
+    def local_hash(rel_path):
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                if json.load(f) == content:
-                    unchanged.append(rel_path)
-                    continue
+            return _local_hash(rel_path)[0]
         except Exception:
-            pass
-        to_write[rel_path] = content
-
-    backup_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    backup_dir = IMPORT_BACKUP_DIR / backup_stamp
-    backed_up = False
-    for rel_path in list(to_write.keys()) + to_delete:
-        src = CONFIG_DATA_DIR / rel_path
-        if src.exists():
-            dest = backup_dir / rel_path
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            shutil.copy2(src, dest)
-            backed_up = True
+            return None  # unreadable/unparsable local file -> always rewritten
+    rels = list(files.keys())
+    with ThreadPoolExecutor(SNAPSHOT_WORKERS) as pool:
+        local_hashes = list(pool.map(local_hash, rels))
+        incoming_hashes = list(pool.map(lambda r: _canonical_hash(files[r]), rels))
+    to_write = {}
+    new_hashes = {}
+    unchanged = []
+    for rel_path, local, incoming in zip(rels, local_hashes, incoming_hashes):
+        if local == incoming:
+            unchanged.append(rel_path)
+            continue
+        to_write[rel_path] = files[rel_path]
+        new_hashes[rel_path] = incoming
+
+    backup_id = _write_backup_manifest(list(to_write.keys()) + to_delete, "import")
 
     for rel_path in to_delete:
         (CONFIG_DATA_DIR / rel_path).unlink(missing_ok=True)
-    for rel_path, content in to_write.items():
+        _forget_hash(rel_path)
+
+    def write(rel_path):
         path = CONFIG_DATA_DIR / rel_path
         path.parent.mkdir(parents=True, exist_ok=True)
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(content, f, indent=2, ensure_ascii=False)
+            json.dump(to_write[rel_path], f, indent=2, ensure_ascii=False)
             f.write("\n")
+        _record_hash(rel_path, path, new_hashes[rel_path])
+    with ThreadPoolExecutor(SNAPSHOT_WORKERS) as pool:
+        list(pool.map(write, to_write))
+    _save_hash_index()
 
     return {
         "written": sorted(to_write.keys()),
         "unchanged": sorted(unchanged),
         "deleted": sorted(to_delete),
-        "backed_up_to": backup_dir.relative_to(CONFIG_DATA_DIR).as_posix() if backed_up else None,
+        "backup_id": backup_id,
+        "backed_up_to": _backup_manifest_path(backup_id).relative_to(CONFIG_DATA_DIR).as_posix() if backup_id else None,
+    }
+
+@app.get("/api/import-backups")
+def list_import_backups():
+    """Import history, newest first. Restoring an entry reconstructs the data
+    tree as it was right before that import (or restore) ran."""
+    backups = []
+    for backup_id in reversed(_list_backup_ids()):
+        manifest = _read_backup_manifest(backup_id)
+        backups.append({
+            "id": backup_id,
+            "created": manifest.get("created"),
+            "kind": manifest.get("kind", "import"),
+            "files": len(manifest.get("files", {})),
+        })
+    return {"backups": backups}
+
+@app.post("/api/import-backups/{backup_id}/restore")
+def restore_import_backup(backup_id: str):
+    with _backup_lock:
+        ids = _list_backup_ids()
+        if backup_id not in ids:
+            raise HTTPException(status_code=404, detail=f"Unknown backup: {backup_id}")
+        # The pre-`backup_id` version of a path is the pre-image recorded by the
+        # OLDEST manifest at or after it that touched that path; paths no later
+        # import touched are already in that state.
+        chain = ids[ids.index(backup_id):]
+        target = {}
+        for later_id in chain:
+            for rel_path, digest in _read_backup_manifest(later_id).get("files", {}).items():
+                target.setdefault(_validate_snapshot_relpath(rel_path), digest)
+        missing = [d for d in set(target.values()) if d and not _backup_object_path(d).exists()]
+        if missing:
+            raise HTTPException(status_code=409, detail=f"Backup objects missing (pruned?): {len(missing)}")
+
+        # A restore is itself backed up, so it can be undone from the history too.
+        # Retention runs once the tree is restored, and never drops the restored chain.
+        undo_id = _write_backup_manifest(list(target.keys()), "restore", {"restored": backup_id}, prune=False)
+        written, deleted = [], []
+        for rel_path, digest in target.items():
+            path = CONFIG_DATA_DIR / rel_path
+            if digest is None:
+                if path.exists():
+                    path.unlink()
+                    deleted.append(rel_path)
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(_backup_object_path(digest), path)
+            written.append(rel_path)
+        _prune_import_backups(protect=frozenset(chain))
+    return {
+        "restored": backup_id,
+        "written": sorted(written),
+        "deleted": sorted(deleted),
+        "backup_id": undo_id,
     }
 
 # --- Generic Path Endpoints (Bottom Priority) ---
@@ -1412,11 +1713,12 @@ def get_config_content(config_path: str):
     except Exception as e: raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/config/{config_path:path}")
-async def save_config_file_v2(config_path: str, content: dict = Body(...)):
+def save_config_file_v2(config_path: str, content: dict = Body(...)):
     path = safe_join(CONFIG_DATA_DIR, config_path)
+    diagnostics = validate_save(path, content)
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, "w", encoding="utf-8") as f: json.dump(content, f, indent=2, ensure_ascii=False)
-    return {"message": "Success"}
+    return {"message": "Success", "diagnostics": diagnostics}
 
 # --- Mounts ---
 if SOUND_FILES_DIR.exists():
@@ -1429,6 +1731,7 @@ async def startup_event():
     load_translations()
     load_stack_sizes()
     load_category_map()
+    load_item_index()
     load_class_hierarchy()
     load_filter_conditions()
     load_bonus_item_info()
\ No newline at end of file
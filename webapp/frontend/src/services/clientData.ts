@@ -39,14 +39,84 @@ const fetchStatic = async (name: string): Promise<any> => {
 };
 
 // --- lazy static caches ---
+//
+// create_demo_bundle.py splits the data into content-addressed chunks listed in
+// demo_data/manifest.json. Everything else is fetched on demand: one category
+// chunk for a single config file, the shared chunk for settings/theme/sounds,
+// all category chunks (in parallel) only when the whole tree is needed.
+
+interface Manifest {
+  version: number;
+  categories: Record<string, string>; // top-level folder ("" = root) -> chunk
+  shared: string;    // theme, soundMap, settings, customOverrides, footer
+  itemsDb: string;
+  bonusInfo: string;
+}
+
+interface CategoryChunk {
+  mappings: Record<string, any>;
+  tiers: Record<string, any>;
+}
 
+let _manifest: Promise<Manifest> | null = null;
+const _chunks = new Map<string, Promise<any>>();
 let _bundle: any = null;
 let _itemsDb: ItemsDb | null = null;
 let _bonusInfo: any = null;
 
+export const loadManifest = (): Promise<Manifest> => {
+  if (!_manifest) {
+    _manifest = fetchStatic('manifest.json');
+    _manifest.catch(() => { _manifest = null; });
+  }
+  return _manifest;
+};
+
+// chunks are immutable (named by content hash) - cache the promise per name
+const loadChunk = (name: string): Promise<any> => {
+  let p = _chunks.get(name);
+  if (!p) {
+    p = fetchStatic(name);
+    p.catch(() => _chunks.delete(name));
+    _chunks.set(name, p);
+  }
+  return p;
+};
+
+/** Top-level category folder of a base_mapping/ or tier_definition/ relpath. */
+const categoryOf = (rel: string) => (rel.includes('/') ? rel.slice(0, rel.indexOf('/')) : '');
+
+/** Baked mappings + tiers of one top-level category (empty if unknown). */
+export const loadCategory = async (category: string): Promise<CategoryChunk> => {
+  const manifest = await loadManifest();
+  const name = manifest.categories[category];
+  return name ? loadChunk(name) : { mappings: {}, tiers: {} };
+};
+
+const loadShared = async (): Promise<any> => {
+  try { return await loadChunk((await loadManifest()).shared); }
+  catch (e) { console.error('Failed to load shared data', e); return {}; }
+};
+
+/** The full bundle ({mappings, tiers, theme, soundMap, settings,
+ *  customOverrides, footer}) assembled from every chunk. Prefer loadCategory /
+ *  the shared accessors when only part of it is needed. */
 export const loadBundle = async (): Promise<any> => {
   if (!_bundle) {
-    try { _bundle = await fetchStatic('bundle.json'); }
+    try {
+      const manifest = await loadManifest();
+      const [shared, ...chunks] = await Promise.all([
+        loadChunk(manifest.shared),
+        ...Object.values(manifest.categories).map(loadChunk),
+      ]);
+      // category order in the manifest == the exporter's sorted file order
+      const bundle = { ...shared, mappings: {} as Record<string, any>, tiers: {} as Record<string, any> };
+      for (const chunk of chunks as CategoryChunk[]) {
+        Object.assign(bundle.mappings, chunk.mappings);
+        Object.assign(bundle.tiers, chunk.tiers);
+      }
+      _bundle = bundle;
+    }
     catch (e) { console.error('Failed to load data bundle', e); return null; }
   }
   return _bundle;
@@ -54,7 +124,7 @@ export const loadBundle = async (): Promise<any> => {
 
 export const loadItemsDb = async (): Promise<ItemsDb> => {
   if (!_itemsDb) {
-    try { _itemsDb = await fetchStatic('items_db.json'); }
+    try { _itemsDb = await loadChunk((await loadManifest()).itemsDb); }
     catch (e) { console.error('Failed to load items db', e); _itemsDb = { classes: [], items: {}, categoryMap: {} }; }
   }
   return _itemsDb!;
@@ -62,7 +132,7 @@ export const loadItemsDb = async (): Promise<ItemsDb> => {
 
 export const loadBonusInfo = async (): Promise<any> => {
   if (!_bonusInfo) {
-    try { _bonusInfo = await fetchStatic('bonus_info.json'); }
+    try { _bonusInfo = await loadChunk((await loadManifest()).bonusInfo); }
     catch { _bonusInfo = { items: {}, uniques: {} }; }
   }
   return _bonusInfo;
@@ -104,6 +174,15 @@ export const getMergedState = async (): Promise<MergedState> => {
   return _merged;
 };
 
+/** One mapping/tier file, VFS edit first, else its baked category chunk -
+ *  avoids pulling the whole tree for single-file lookups. */
+export const getMergedFile = async (section: 'mappings' | 'tiers', rel: string): Promise<any> => {
+  if (_merged) return _merged[section][rel];
+  const vfs = readVfs((section === 'mappings' ? 'base_mapping/' : 'tier_definition/') + rel);
+  if (vfs !== null) return vfs;
+  return (await loadCategory(categoryOf(rel)))[section][rel];
+};
+
 // codepoint order, matching Python's sorted() on the backend
 const cmp = (a: string, b: string) => (a < b ? -1 : a > b ? 1 : 0);
 
@@ -325,13 +404,12 @@ export const searchItems = async (q: string) => {
 
 /** GET /api/mapping-info/{file} (main.py get_mapping_info) */
 export const mappingInfo = async (fileName: string) => {
-  const { mappings, tiers } = await getMergedState();
-  const mappingContent = mappings[fileName];
+  const mappingContent = await getMergedFile('mappings', fileName);
   if (!mappingContent) throw new Error(`Mapping not found: ${fileName}`);
   const themeCategory = mappingContent?._meta?.theme_category;
 
   const availableTiers: any[] = [];
-  const tierDefs = tiers[fileName];
+  const tierDefs = await getMergedFile('tiers', fileName);
   if (tierDefs) {
     const categoryKey = Object.keys(tierDefs).find(k => !k.startsWith('//'));
     if (categoryKey) {
@@ -522,8 +600,8 @@ export const updateItemOverride = async (req: UpdateItemOverrideRequest) => {
 /** GET /api/settings (main.py get_settings) - VFS shadow over bundle seed */
 export const getSettings = async () => {
   const vfs = readVfs('settings.json');
-  const bundle = await loadBundle();
-  const data = vfs ?? bundle?.settings ?? {};
+  const shared = await loadShared();
+  const data = vfs ?? shared.settings ?? {};
   if (!data || Object.keys(data).length === 0) return { base_theme: 'sharket' };
   if (data.active_theme && !data.base_theme) data.base_theme = data.active_theme;
   return data;
@@ -539,8 +617,8 @@ export const saveSettings = async (content: Record<string, any>) => {
 export const getCustomOverrides = async () => {
   const saved = localStorage.getItem('demo_custom_overrides');
   if (saved) { try { return JSON.parse(saved); } catch { /* fall through */ } }
-  const bundle = await loadBundle();
-  return bundle?.customOverrides ?? {};
+  const shared = await loadShared();
+  return shared.customOverrides ?? {};
 };
 
 /** GET /api/themes - static list + presets saved/imported in this browser */
@@ -557,8 +635,8 @@ export const themesList = async () => {
 export const getSoundMap = async () => {
   const vfs = readVfs('theme/sharket/Sharket_sound_map.json');
   if (vfs) return vfs;
-  const bundle = await loadBundle();
-  return bundle?.soundMap ?? {};
+  const shared = await loadShared();
+  return shared.soundMap ?? {};
 };
 
 /** GET /api/themes/{name} - locally saved preset shadows the static one */
@@ -605,17 +683,18 @@ export const itemInfo = async (baseType: string) => {
 export const getConfig = async (configPath: string) => {
   const vfs = readVfs(configPath);
   if (vfs !== null) return { content: vfs };
-  const bundle = await loadBundle();
   if (configPath.startsWith('base_mapping/')) {
-    const content = bundle?.mappings?.[configPath.slice('base_mapping/'.length)];
+    const rel = configPath.slice('base_mapping/'.length);
+    const content = (await loadCategory(categoryOf(rel))).mappings[rel];
     if (content !== undefined) return { content };
   } else if (configPath.startsWith('tier_definition/')) {
-    const content = bundle?.tiers?.[configPath.slice('tier_definition/'.length)];
+    const rel = configPath.slice('tier_definition/'.length);
+    const content = (await loadCategory(categoryOf(rel))).tiers[rel];
     if (content !== undefined) return { content };
   } else if (configPath === 'theme/sharket/sharket_theme.json') {
-    return { content: bundle?.theme ?? {} };
+    return { content: (await loadShared()).theme ?? {} };
   } else if (configPath === 'theme/sharket/Sharket_sound_map.json') {
-    return { content: bundle?.soundMap ?? {} };
+    return { content: (await loadShared()).soundMap ?? {} };
   } else if (configPath === 'theme/custom_overrides.json') {
     return { content: await getCustomOverrides() };
   } else if (configPath === 'settings.json') {
@@ -6,7 +6,7 @@
 //   2. uvicorn main:app --port 8765                     (in webapp/backend)
 //   3. node test_parity.mjs                             (in webapp/frontend)
 import { build } from 'esbuild';
-import { mkdtempSync, writeFileSync, rmSync, readFileSync } from 'fs';
+import { mkdtempSync, writeFileSync, rmSync } from 'fs';
 import { tmpdir } from 'os';
 import { join, dirname } from 'path';
 import { fileURLToPath, pathToFileURL } from 'url';
@@ -128,7 +128,7 @@ for (const cls of ['All', 'Stackable Currency', 'Body Armours', 'Divination Card
 }
 
 console.log('tier-items parity:');
-const bundle = JSON.parse(readFileSync(join(HERE, 'public/demo_data/bundle.json'), 'utf-8'));
+const bundle = await client.loadBundle();
 const tierKeys = new Set();
 for (const content of Object.values(bundle.tiers)) {
   const catKey = Object.keys(content).find(k => !k.startsWith('//'));